@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+from nomes_municipios import para_codigo6
+from rais_tabela4 import COLUNAS_SETORES
+
+# --- Visão Geral do Módulo ---
+# Motor de alinhamento entre a matriz econômica local (empregos por setor, RAIS) e a
+# oferta de cursos técnicos (eixos tecnológicos, Sistec), calculado de uma só vez para
+# todos os municípios. O mapeamento setor -> eixos vira uma matriz de pesos setor × eixo;
+# multiplicada pela matriz município × setor de empregos, ela dá a demanda de cada eixo
+# em cada município. A Fase 4 do dashboard passa a apenas consultar o resultado.
+
+# Eixos tecnológicos com maior sinergia com cada setor econômico. As chaves seguem os
+# nomes dos setores da Tabela 4 da RAIS (ver rais_tabela4.COLUNAS_SETORES).
+SETOR_PARA_EIXOS = {
+    'Servicos': ['TURISMO, HOSPITALIDADE E LAZER', 'GESTÃO E NEGÓCIOS', 'INFORMAÇÃO E COMUNICAÇÃO', 'AMBIENTE E SAÚDE'],
+    'Comercio': ['GESTÃO E NEGÓCIOS'],
+    'Agropecuaria': ['RECURSOS NATURAIS', 'PRODUÇÃO ALIMENTÍCIA'],
+    'Industria': ['CONTROLE E PROCESSOS INDUSTRIAIS', 'PRODUÇÃO INDUSTRIAL'],
+    'Construcao': ['INFRAESTRUTURA'],
+}
+
+# Quantidade de setores principais usados nas recomendações de eixos.
+N_SETORES_PRINCIPAIS = 3
+
+COLUNA_EIXO = 'EIXO TECNOLÓGICO'
+COLUNA_CODIGO_CURSOS = 'CÓDIGO MUNICÍPIO'
+
+
+def matriz_pesos(mapeamento=SETOR_PARA_EIXOS, setores=COLUNAS_SETORES):
+    """
+    Objetivo: Converter o mapeamento setor -> eixos em uma matriz de pesos setor × eixo.
+
+    Detalhes:
+    - Os empregos de um setor são divididos igualmente entre os seus eixos (cada linha
+      soma 1); assim a demanda de um município, somada sobre os eixos, também soma 1.
+    - Setores sem eixo mapeado ficam com a linha zerada.
+    """
+    eixos = sorted({eixo for setor in setores for eixo in mapeamento.get(setor, [])})
+    posicao = {eixo: j for j, eixo in enumerate(eixos)}
+
+    pesos = np.zeros((len(setores), len(eixos)))
+    for i, setor in enumerate(setores):
+        eixos_setor = mapeamento.get(setor, [])
+        for eixo in eixos_setor:
+            pesos[i, posicao[eixo]] = 1 / len(eixos_setor)
+    return pd.DataFrame(pesos, index=setores, columns=eixos)
+
+
+def _contar_cursos(df_cursos, codigos, eixos):
+    """Conta os cursos de cada município (linhas de `codigos`) por eixo, e no total."""
+    linhas = pd.Index(codigos).get_indexer(para_codigo6(df_cursos[COLUNA_CODIGO_CURSOS]).to_numpy())
+    colunas = pd.Categorical(df_cursos[COLUNA_EIXO], categories=eixos).codes
+
+    encontrados = linhas >= 0
+    total = np.bincount(linhas[encontrados], minlength=len(codigos))
+
+    mapeados = encontrados & (colunas >= 0)
+    contagem = np.zeros((len(codigos), len(eixos)))
+    np.add.at(contagem, (linhas[mapeados], colunas[mapeados]), 1)
+    return contagem, total
+
+
+def calcular_alinhamento(df_rais, df_cursos, mapeamento=SETOR_PARA_EIXOS,
+                         n_setores=N_SETORES_PRINCIPAIS):
+    """
+    Objetivo: Calcular demanda, oferta e descompasso por eixo tecnológico para todos os
+    municípios da RAIS.
+
+    Detalhes:
+    - `df_rais` é a Tabela 4 "wide" (ver rais_tabela4.carregar_rais_tabela4) e
+      `df_cursos` a base de cursos encontrados; a junção é feita pelo código IBGE de
+      6 dígitos, sem comparar nomes.
+    - Demanda: participação de cada setor nos empregos do município × matriz de pesos.
+    - Eixos recomendados: os eixos dos `n_setores` setores que mais empregam (apenas
+      setores com empregos), como na recomendação original da Fase 4.
+    - Oferta: participação de cada eixo nos cursos do município; cursos de eixos sem
+      setor mapeado contam no total, mas não em nenhum eixo.
+    - Descompasso: soma das diferenças positivas demanda − oferta, de 0 (oferta cobre a
+      demanda) a 1 (nenhum curso nos eixos demandados).
+    - 'desalinhado' marca os municípios com eixos recomendados e nenhum curso neles (o
+      "Alerta de Desalinhamento" da Fase 4).
+    - Retorna (resumo, matrizes): `resumo` tem uma linha por município, indexada pelo
+      código de 6 dígitos; `matrizes` traz os DataFrames 'demanda', 'oferta' e
+      'recomendado' (município × eixo), com o mesmo índice.
+    """
+    pesos = matriz_pesos(mapeamento)
+    eixos = pesos.columns
+    codigos = pd.Index(df_rais['id_mundv'].to_numpy(), name='codigo6')
+
+    vagas = df_rais[[f"{setor}_2024" for setor in COLUNAS_SETORES]].to_numpy(dtype=float)
+    total_vagas = vagas.sum(axis=1, keepdims=True)
+    participacao = np.divide(vagas, total_vagas, out=np.zeros_like(vagas), where=total_vagas > 0)
+    demanda = participacao @ pesos.to_numpy()
+
+    # Setores principais: posições dos maiores valores de cada linha (empates pela ordem
+    # das colunas), descartando setores sem empregos.
+    ordem = np.argsort(-vagas, axis=1, kind='stable')[:, :n_setores]
+    principais = np.take_along_axis(vagas, ordem, axis=1) > 0
+    mascara = np.zeros(vagas.shape, dtype=bool)
+    np.put_along_axis(mascara, ordem, principais, axis=1)
+    recomendado = (mascara @ (pesos.to_numpy() > 0)) > 0
+
+    contagem, total_cursos = _contar_cursos(df_cursos, codigos, eixos)
+    oferta = np.divide(contagem, total_cursos[:, None], out=np.zeros_like(contagem),
+                       where=total_cursos[:, None] > 0)
+    lacuna = np.clip(demanda - oferta, 0, None)
+
+    cursos_alinhados = (contagem * recomendado).sum(axis=1).astype(int)
+    resumo = pd.DataFrame({
+        'municipio': df_rais['ds_mun'].to_numpy(),
+        'uf': df_rais['sg_uf'].to_numpy(),
+        'total_vagas': total_vagas[:, 0].astype(int),
+        'cursos_total': total_cursos,
+        'cursos_alinhados': cursos_alinhados,
+        'eixo_maior_lacuna': np.where(lacuna.max(axis=1) > 0, np.asarray(eixos)[lacuna.argmax(axis=1)], None),
+        'descompasso': lacuna.sum(axis=1),
+        'desalinhado': recomendado.any(axis=1) & (cursos_alinhados == 0),
+    }, index=codigos)
+    nomes_setores = np.asarray(COLUNAS_SETORES, dtype=object)
+    for k in range(ordem.shape[1]):
+        resumo[f'setor_{k + 1}'] = np.where(principais[:, k], nomes_setores[ordem[:, k]], None)
+
+    matrizes = {
+        'demanda': pd.DataFrame(demanda, index=codigos, columns=eixos),
+        'oferta': pd.DataFrame(oferta, index=codigos, columns=eixos),
+        'recomendado': pd.DataFrame(recomendado, index=codigos, columns=eixos),
+    }
+    return resumo, matrizes
+
+
+def setores_principais(linha_resumo):
+    """Lista os setores principais de uma linha do resumo, do que mais emprega ao que menos emprega."""
+    return [setor for chave, setor in linha_resumo.items()
+            if chave.startswith('setor_') and isinstance(setor, str)]
+
+
+def ranking_descompasso(resumo, codigos=None):
+    """
+    Objetivo: Ordenar os municípios do maior para o menor descompasso entre demanda e oferta.
+
+    Detalhes:
+    - `codigos` (opcional) restringe o ranking a um conjunto de municípios (códigos IBGE
+      de 6 ou 7 dígitos), como a abrangência escolhida no dashboard.
+    - Municípios sem empregos registrados na RAIS ficam de fora.
+    """
+    if codigos is not None:
+        resumo = resumo[resumo.index.isin(para_codigo6(codigos).dropna())]
+    resumo = resumo[resumo['total_vagas'] > 0]
+    return resumo.sort_values(['descompasso', 'total_vagas'], ascending=False, kind='stable')
@@ -1,18 +1,24 @@
+import time
+
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
+from joblib import Parallel, delayed, effective_n_jobs
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.preprocessing import StandardScaler
 from scipy.stats import ttest_ind
+from threadpoolctl import threadpool_limits
 import matplotlib.pyplot as plt
 import seaborn as sns
 import matplotlib.ticker as mticker
 
+from ive_nacional import calcular_ive
+
 # ===================================================================
 # --- FUNÇÕES DE ANÁLISE (FASES 1 a 4) ---
 # ===================================================================
 
-def carregar_e_preparar_dados(file_path, municipios_list):
-    """Carrega e limpa o dataset principal da EJA."""
+def carregar_e_preparar_dados(file_path, municipios_list=None):
+    """Carrega e limpa o dataset principal da EJA (todos os municípios se `municipios_list` for None)."""
     print("Iniciando carregamento e preparação dos dados...")
     try:
         df_full = pd.read_excel(file_path, header=6)
@@ -33,9 +39,11 @@ def carregar_e_preparar_dados(file_path, municipios_list):
     df_full.rename(columns=rename_map, inplace=True)
 
     df_full['municipio_norm'] = df_full['municipio'].astype(str).str.strip().str.upper()
-    municipios_selecionados_norm = [m.strip().upper() for m in municipios_list]
-
-    df = df_full[df_full['municipio_norm'].isin(municipios_selecionados_norm)].copy()
+    if municipios_list is None:
+        df = df_full.dropna(subset=['municipio']).copy()
+    else:
+        municipios_selecionados_norm = [m.strip().upper() for m in municipios_list]
+        df = df_full[df_full['municipio_norm'].isin(municipios_selecionados_norm)].copy()
 
     if df.empty:
         print("AVISO: Nenhum dos municípios selecionados foi encontrado.")
@@ -49,15 +57,8 @@ def fase1_analise_ive(df):
     """Calcula o IVE e gera as visualizações da Fase 1."""
     print("\n--- Executando Fase 1: Mapeamento de Zonas Críticas (IVE) ---")
 
-    numeric_cols = ['populacao_total_15_mais', 'populacao_nao_alfabetizada', 'matriculas_eja']
-    for col in numeric_cols:
-        df[col] = pd.to_numeric(df[col], errors='coerce')
-    df.dropna(subset=numeric_cols, inplace=True)
-
-    epsilon = 1e-6
-    df['taxa_analfabetismo'] = df['populacao_nao_alfabetizada'] / (df['populacao_total_15_mais'] + epsilon)
-    df['taxa_cobertura_eja'] = (df['matriculas_eja'] / (df['populacao_nao_alfabetizada'] + epsilon)).clip(0, 1)
-    df['ive'] = df['taxa_analfabetismo'] * (1 - df['taxa_cobertura_eja'])
+    # Mesma fórmula usada na tabela nacional do dashboard (ver ive_nacional.py).
+    df = calcular_ive(df)
 
     df_sorted = df.sort_values('ive', ascending=False)
 
@@ -78,8 +79,58 @@ def fase1_analise_ive(df):
     return df_sorted
 
 # --- FASE 2: ANÁLISE DO PERFIL ETÁRIO (CLUSTERIZAÇÃO) ---
-def fase2_analise_perfil_etario(df):
-    """Executa a clusterização K-Means para segmentar os municípios."""
+
+# Acima deste número de municípios, a busca do cotovelo usa o MiniBatchKMeans, que ajusta
+# os centróides em lotes e mantém o tempo por k baixo mesmo com a base nacional.
+LIMITE_MINIBATCH = 1000
+
+def _ajustar_kmeans(X, k, limite_minibatch, threads_internas=None):
+    """
+    Ajusta o K-Means para um valor de k e mede o tempo de parede do ajuste.
+
+    `threads_internas` limita o pool OpenMP do ajuste (o limite do OpenMP vale só para a
+    thread que chama, de modo que ajustes em paralelo não interferem entre si).
+    """
+    inicio = time.perf_counter()
+    if len(X) > limite_minibatch:
+        modelo = MiniBatchKMeans(n_clusters=k, random_state=42, n_init=10, batch_size=1024)
+    else:
+        modelo = KMeans(n_clusters=k, random_state=42, n_init=10)
+    with threadpool_limits(limits=threads_internas, user_api='openmp'):
+        modelo.fit(X)
+    return k, modelo, time.perf_counter() - inicio
+
+def busca_cotovelo(X, k_range=range(1, 10), n_jobs=-1, limite_minibatch=LIMITE_MINIBATCH):
+    """
+    Ajusta um modelo para cada k de `k_range` em paralelo (uma thread por k; o K-Means do
+    scikit-learn libera o GIL, e threads evitam o custo de criar processos). Os núcleos são
+    divididos entre os ajustes simultâneos: cada um usa um pool OpenMP de
+    núcleos // ajustes simultâneos threads, em vez de um pool com todos os núcleos.
+
+    Retorna um DataFrame indexado por k com a inércia e o tempo de cada ajuste, e o
+    dicionário {k: modelo ajustado}, para que o k escolhido não precise ser reajustado.
+    """
+    k_range = [k for k in k_range if k <= len(X)]
+    simultaneos = max(min(effective_n_jobs(n_jobs), len(k_range)), 1)
+    threads_internas = max(effective_n_jobs(-1) // simultaneos, 1)
+    resultados = Parallel(n_jobs=simultaneos, prefer="threads")(
+        delayed(_ajustar_kmeans)(X, k, limite_minibatch, threads_internas) for k in k_range
+    )
+    modelos = {k: modelo for k, modelo, _ in resultados}
+    resumo = pd.DataFrame(
+        [(k, modelo.inertia_, tempo) for k, modelo, tempo in resultados],
+        columns=['k', 'inercia', 'tempo_s']
+    ).set_index('k')
+    return resumo, modelos
+
+def fase2_analise_perfil_etario(df, k_otimo=3, n_jobs=-1, limite_minibatch=LIMITE_MINIBATCH):
+    """
+    Executa a clusterização K-Means para segmentar os municípios.
+
+    A curva do cotovelo é calculada em paralelo (`n_jobs`, como no scikit-learn) e, acima
+    de `limite_minibatch` municípios, com MiniBatchKMeans. O modelo do k escolhido é
+    reaproveitado da própria busca.
+    """
     print("\n--- Executando Fase 2: Análise do Perfil Etário (Clusterização) ---")
 
     cols_perfil = [
@@ -92,25 +143,24 @@ def fase2_analise_perfil_etario(df):
     scaler = StandardScaler()
     X_scaled = scaler.fit_transform(df_perfil)
 
-    inertia = []
-    k_range = range(1, 10)
-    for k in k_range:
-        kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-        kmeans.fit(X_scaled)
-        inertia.append(kmeans.inertia_)
+    inicio = time.perf_counter()
+    resumo_cotovelo, modelos = busca_cotovelo(X_scaled, n_jobs=n_jobs, limite_minibatch=limite_minibatch)
+    algoritmo = 'MiniBatchKMeans' if len(X_scaled) > limite_minibatch else 'KMeans'
+    print(f"\nBusca do cotovelo ({algoritmo}, {len(X_scaled)} municípios) "
+          f"concluída em {time.perf_counter() - inicio:.2f}s. Tempo por k:")
+    print(resumo_cotovelo.round(3).to_string())
 
     plt.figure(figsize=(10, 6))
-    plt.plot(k_range, inertia, marker='o')
+    plt.plot(resumo_cotovelo.index, resumo_cotovelo['inercia'], marker='o')
     plt.title('Método do Cotovelo para Determinação do K Ótimo')
     plt.xlabel('Número de Clusters (k)')
     plt.ylabel('Inércia')
     plt.grid(True)
     plt.show()
 
-    k_otimo = 3
     print(f"\nCom base no método do cotovelo, o k ótimo escolhido foi: {k_otimo}")
-    kmeans = KMeans(n_clusters=k_otimo, random_state=42, n_init=10)
-    df['cluster'] = kmeans.fit_predict(X_scaled)
+    # O modelo do k escolhido já foi ajustado na busca; apenas os rótulos são reaproveitados.
+    df.loc[df_perfil.index, 'cluster'] = modelos[k_otimo].labels_
 
     cluster_profiles = df.groupby('cluster')[cols_perfil].mean()
     cluster_profiles_percent = cluster_profiles.div(cluster_profiles.sum(axis=1), axis=0)
@@ -223,20 +273,20 @@ def fase4_analise_economica(df, file_path_rais):
 if __name__ == "__main__":
 
     # --- ARQUIVOS E PARÂMETROS DA ANÁLISE ---
-    # Edite os caminhos e a lista de municípios aqui.
-    file_path_eja = 'Análise de dados/IVE_DADOS.xlsx'#Análise de dados/IVE_DADOS.xlsx
+    # O arquivo da EJA e a lista de municípios ficam em pipeline.CONFIGURACAO
+    # ('arquivo_eja' e 'municipios_eja'); edite os demais caminhos aqui.
+    from pipeline import executar
+
     file_path_rais = 'Análise de dados/file_path_rais.xlsx - RAIS.csv'
-    file_path_pacto= file_path_eja#'Análise de dados/panorama-da-eja-no-brasil (4).xlsx'
+    file_path_pacto= 'Análise de dados/IVE_DADOS.xlsx'#'Análise de dados/panorama-da-eja-no-brasil (4).xlsx'
  
 
-    municipios_selecionados = [
-        'Alagoa Nova', 'Cabaceiras', 'Campina Grande', 'Caturité', 'Bananeiras',
-        'Guarabira', 'Ingá', 'Itatuba', 'João Pessoa', 'Lagoa Seca', 'Mogeiro',
-        'Queimadas', 'Santa Rita', 'Serra Redonda', 'Carpina', 'Montes Claros'
-    ]
-
     # --- ORQUESTRAÇÃO DAS FASES ---
-    df_base = carregar_e_preparar_dados(file_path_eja, municipios_selecionados)
+    # A leitura da planilha da EJA é a etapa 'eja_base' do pipeline incremental (ver
+    # pipeline.py): só é refeita quando o arquivo, a lista de municípios ou o código mudam.
+    # As fases desenham os gráficos e rodam sempre, a partir da base em cache.
+    resultados, _ = executar(['eja_base'])
+    df_base = resultados['eja_base']
 
     if df_base is not None:
         # Executa cada fase da análise em sequência
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import nomes_municipios
+import snapshot_cache
+from analise_educacional import carregar_e_preparar_dados
+from buscar_cursos import carregar_cursos_encontrados
+from caged_dados import carregar_caged_tabela81
+from gerar_dados_sinteticos import gerar_bases
+from ideb_f import get_ideb_data, getdtb
+from indice_municipal import construir_indice
+from ive_nacional import carregar_ive_nacional
+from rais_tabela4 import carregar_rais_tabela4_longa
+from RAIS import load_ia_projetos
+
+# --- Visão Geral do Script ---
+# Mede o tempo e o pico de memória de cada carregador de dados sobre as bases sintéticas
+# (ver gerar_dados_sinteticos.py), em 16, 500 e 5.570 municípios por padrão.
+#
+# - "Frio": sem snapshots em disco e sem a memória de nomes canônicos (primeira execução).
+# - "Quente": chamadas seguintes, com snapshots e caches já preenchidos (mediana das repetições).
+# - O pico de memória é medido com tracemalloc em uma execução separada, para não
+#   distorcer os tempos.
+#
+# O resultado é um JSON que pode ser comparado entre versões:
+#   python benchmarks/benchmark_loaders.py --saida antes.json
+#   python benchmarks/benchmark_loaders.py --saida depois.json --comparar antes.json
+
+TAMANHOS_PADRAO = [16, 500, 5570]
+VERSAO_FORMATO = 1
+
+
+def _carregadores(bases):
+    """Carregadores medidos: nome -> função sem argumentos (mesmas chamadas do dashboard e dos scripts)."""
+    df_dtb = getdtb(bases['dtb'])
+    return {
+        'load_rais_economic_data': lambda: construir_indice(
+            carregar_rais_tabela4_longa(bases['rais']), ['municipio_upper', 'uf']),
+        'load_courses_data': lambda: construir_indice(
+            carregar_cursos_encontrados(bases['cursos']), ['MUNICÍPIO_UPPER', 'UF']),
+        'getdtb': lambda: getdtb(bases['dtb']),
+        'get_ideb_data': lambda: get_ideb_data(bases['ideb'], df_dtb),
+        'load_ia_projetos': lambda: load_ia_projetos(bases['projetos_ia'], year=2024),
+        'carregar_caged_tabela81': lambda: carregar_caged_tabela81(bases['caged']),
+        'carregar_e_preparar_dados': lambda: carregar_e_preparar_dados(bases['ive']),
+        'carregar_ive_nacional': lambda: carregar_ive_nacional(bases['ive'], bases['atuacao_ia']),
+    }
+
+
+def _limpar_caches():
+    """Volta ao estado "frio": apaga os snapshots e a memória de nomes canônicos."""
+    shutil.rmtree(snapshot_cache.DIRETORIO_SNAPSHOTS, ignore_errors=True)
+    nomes_municipios._MEMO_NOMES.clear()
+
+
+def _executar(funcao, medir_memoria=False):
+    """Executa o carregador em silêncio e devolve (segundos, pico de memória em MB, linhas)."""
+    if medir_memoria:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        resultado = funcao()
+    segundos = time.perf_counter() - inicio
+    pico_mb = None
+    if medir_memoria:
+        pico_mb = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+
+    df = resultado[0] if isinstance(resultado, tuple) else resultado
+    return segundos, pico_mb, len(df) if df is not None else 0
+
+
+def medir_carregador(funcao, repeticoes=3, medir_memoria=True):
+    """Mede um carregador a frio e a quente; devolve um dicionário com os resultados."""
+    _limpar_caches()
+    frio_s, _, linhas = _executar(funcao)
+    quentes = [_executar(funcao)[0] for _ in range(repeticoes)]
+
+    medida = {
+        'linhas': linhas,
+        'frio_s': round(frio_s, 5),
+        'quente_s': round(statistics.median(quentes), 5),
+        'quente_min_s': round(min(quentes), 5),
+    }
+    if medir_memoria:
+        _limpar_caches()
+        medida['pico_memoria_frio_mb'] = round(_executar(funcao, medir_memoria=True)[1], 3)
+        medida['pico_memoria_quente_mb'] = round(_executar(funcao, medir_memoria=True)[1], 3)
+    return medida
+
+
+def _versao_git():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        sujo = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ,
+                                   capture_output=True, text=True, check=True).stdout.strip())
+        return {'commit': commit, 'alteracoes_locais': sujo}
+    except (OSError, subprocess.CalledProcessError):
+        return {'commit': None, 'alteracoes_locais': None}
+
+
+def executar_benchmark(tamanhos, diretorio_dados, repeticoes=3, medir_memoria=True, filtro=None):
+    """Gera (ou reaproveita) as bases de cada tamanho e mede todos os carregadores."""
+    resultados = []
+    for n in tamanhos:
+        bases = gerar_bases(os.path.join(diretorio_dados, str(n)), n)
+        snapshot_cache.DIRETORIO_SNAPSHOTS = os.path.join(diretorio_dados, str(n), 'snapshots')
+        for nome, funcao in _carregadores(bases).items():
+            if filtro and nome not in filtro:
+                continue
+            medida = medir_carregador(funcao, repeticoes, medir_memoria)
+            resultados.append({'carregador': nome, 'municipios': n, **medida})
+            print(f"{nome:28s} {n:>6d} municípios  frio {medida['frio_s']:8.3f}s  "
+                  f"quente {medida['quente_s']:8.3f}s  linhas {medida['linhas']}")
+    return {
+        'versao_formato': VERSAO_FORMATO,
+        'gerado_em': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'git': _versao_git(),
+        'ambiente': {
+            'python': platform.python_version(), 'pandas': pd.__version__, 'numpy': np.__version__,
+            'plataforma': platform.platform(), 'cpus': os.cpu_count(),
+        },
+        'repeticoes': repeticoes,
+        'resultados': resultados,
+    }
+
+
+def comparar(atual, anterior):
+    """Tabela com a razão atual/anterior dos tempos (valores < 1 indicam melhora)."""
+    chave = ['carregador', 'municipios']
+    df_atual = pd.DataFrame(atual['resultados']).set_index(chave)
+    df_anterior = pd.DataFrame(anterior['resultados']).set_index(chave)
+    comuns = df_atual.index.intersection(df_anterior.index)
+
+    colunas = [col for col in ['frio_s', 'quente_s', 'pico_memoria_frio_mb']
+               if col in df_atual.columns and col in df_anterior.columns]
+    return (df_atual.loc[comuns, colunas] / df_anterior.loc[comuns, colunas]).round(3)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark dos carregadores de dados com bases sintéticas.")
+    parser.add_argument('--tamanhos', type=int, nargs='+', default=TAMANHOS_PADRAO,
+                        help="Números de municípios a medir (padrão: 16 500 5570).")
+    parser.add_argument('--repeticoes', type=int, default=3, help="Execuções a quente por carregador.")
+    parser.add_argument('--carregadores', nargs='+', default=None, help="Mede apenas os carregadores indicados.")
+    parser.add_argument('--dados', default=os.path.join(RAIZ, '.cache', 'benchmarks'),
+                        help="Pasta das bases sintéticas (reaproveitadas entre execuções).")
+    parser.add_argument('--sem-memoria', action='store_true', help="Não mede o pico de memória.")
+    parser.add_argument('--saida', default=None,
+                        help="Arquivo JSON de resultados (padrão: .cache/benchmarks/resultados/).")
+    parser.add_argument('--comparar', default=None, help="JSON de uma execução anterior para comparação.")
+    args = parser.parse_args()
+
+    # Os snapshots do benchmark ficam fora da pasta usada pelo dashboard.
+    diretorio_original = snapshot_cache.DIRETORIO_SNAPSHOTS
+    try:
+        relatorio = executar_benchmark(args.tamanhos, args.dados, args.repeticoes,
+                                       not args.sem_memoria, args.carregadores)
+    finally:
+        snapshot_cache.DIRETORIO_SNAPSHOTS = diretorio_original
+
+    saida = args.saida or os.path.join(
+        RAIZ, '.cache', 'benchmarks', 'resultados',
+        f"benchmark-{relatorio['git']['commit'] or 'local'}-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(saida)), exist_ok=True)
+    with open(saida, 'w', encoding='utf-8') as arquivo:
+        json.dump(relatorio, arquivo, ensure_ascii=False, indent=2)
+    print(f"\nResultados gravados em {saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as arquivo:
+            anterior = json.load(arquivo)
+        print(f"\nRazão atual / anterior ({anterior['git'].get('commit')}):")
+        print(comparar(relatorio, anterior).to_string())
@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ive_nacional import PERFIL_ADULTOS, PERFIL_IDOSOS
+from nomes_municipios import UFS
+
+# --- Visão Geral do Script ---
+# Gera planilhas e CSVs sintéticos com o mesmo formato dos arquivos reais usados pelos
+# carregadores (RAIS Tabela 4, cursos do Sistec, IDEB, DTB, CAGED Tabela 8.1, projetos do
+# IA, IVE_DADOS e a lista de municípios de atuação do IA), para um número arbitrário de municípios. Os valores são aleatórios,
+# mas a estrutura (linhas de cabeçalho, posição e nome das colunas, rodapés) é a mesma,
+# de modo que o custo de leitura e limpeza é representativo da base real.
+#
+# Uso: python benchmarks/gerar_dados_sinteticos.py --municipios 5570 --saida pasta/
+
+PREFIXOS = ['São', 'Santa', 'Nova', 'Bom Jesus do', "Olho d'Água do", 'Lagoa', 'Serra',
+            'Campo', 'Riacho', 'Poço', 'Barra do', 'Boa Vista do', 'Conceição do',
+            'Santo Antônio do', 'Itá', 'Ibi', 'Jacaré', 'Pedra', 'Morro', 'Vila', 'Pau-Ferro do']
+SUFIXOS = ['Norte', 'Sul', 'Paraíso', 'Jardim', 'Alegre', 'Grande', 'Seco', 'Verde',
+           'Branco', 'Preto', 'Fundo', 'Redondo', 'Bonito', 'Belo', 'Açu', 'Mirim',
+           'Piranhas', 'Sertão', 'Cariri', 'Agreste', 'Brejo', 'Tabuleiro', 'Oeste',
+           'Leste', 'Velho', 'Novo', 'Formoso', 'Dourado', 'Cajazeiras', 'Catolé']
+COMPLEMENTOS = ['', 'de Minas', 'da Serra', 'do Piauí', 'de Goiás', 'das Flores', 'dos Campos',
+                'da Mata', 'do Livramento', 'de Itaúna']
+
+# A cada HOMONIMOS_A_CADA municípios, um repete o nome do anterior (que está em outra UF),
+# como Santa Rita/PB e Santa Rita/MA na base real.
+HOMONIMOS_A_CADA = 25
+
+EIXOS = ['TURISMO, HOSPITALIDADE E LAZER', 'GESTÃO E NEGÓCIOS', 'INFORMAÇÃO E COMUNICAÇÃO',
+         'AMBIENTE E SAÚDE', 'RECURSOS NATURAIS', 'PRODUÇÃO ALIMENTÍCIA',
+         'CONTROLE E PROCESSOS INDUSTRIAIS', 'PRODUÇÃO INDUSTRIAL', 'INFRAESTRUTURA']
+REDES = ['Estadual', 'Municipal', 'Federal', 'Pública']
+
+# Número de grupos de colunas da Tabela 8.1 do CAGED: as colunas lidas pelo script são
+# 'Admissões.67' e 'Desligamentos.67', isto é, o 68º grupo. Os grupos são os meses de
+# janeiro de 2020 até o mês da publicação, seguidos dos acumulados.
+MESES_CAGED = 68
+ACUMULADOS_CAGED = ['Acumulado no Ano', 'Últimos 12 Meses']
+NOMES_MESES = ['Janeiro', 'Fevereiro', 'Março', 'Abril', 'Maio', 'Junho', 'Julho', 'Agosto',
+               'Setembro', 'Outubro', 'Novembro', 'Dezembro']
+
+
+def gerar_municipios(n, semente=42):
+    """
+    Objetivo: Criar a lista de `n` municípios sintéticos distribuídos entre as UFs.
+
+    Detalhes:
+    - Os nomes são combinações distintas de prefixo, sufixo e complemento (com acentos,
+      apóstrofos e hífens, como os reais); alguns se repetem em outra UF (homônimos).
+    - Os códigos seguem o formato do IBGE: 7 dígitos (com dígito verificador) e 6 dígitos.
+    """
+    rng = np.random.default_rng(semente)
+    ufs = list(UFS.items())
+    nomes = [f"{prefixo} {sufixo} {complemento}".strip()
+             for complemento in COMPLEMENTOS for prefixo in PREFIXOS for sufixo in SUFIXOS]
+
+    linhas = []
+    for i in range(n):
+        sigla, (id_uf, nome_uf) = ufs[i % len(ufs)]
+        ordem_na_uf = i // len(ufs)
+        indice_nome = i - 1 if i % HOMONIMOS_A_CADA == 0 and i > 0 else i
+        nome = nomes[indice_nome % len(nomes)]
+        codigo6 = id_uf * 10_000 + ordem_na_uf * 10 + 1
+        linhas.append((sigla, id_uf, nome_uf, nome, codigo6, codigo6 * 10 + int(rng.integers(0, 10))))
+
+    return pd.DataFrame(linhas, columns=['sg_uf', 'id_uf', 'nome_uf', 'municipio', 'codigo6', 'codigo7'])
+
+
+def _escrever_planilha(caminho, abas):
+    """Grava um XLSX com as abas {nome: lista de linhas}, sem cabeçalho nem índice do pandas."""
+    with pd.ExcelWriter(caminho, engine='openpyxl') as writer:
+        for nome, linhas in abas.items():
+            pd.DataFrame(linhas).to_excel(writer, sheet_name=nome, header=False, index=False)
+
+
+def _linhas_vazias(quantidade, largura):
+    return [[None] * largura for _ in range(quantidade)]
+
+
+def escrever_rais(municipios, caminho, rng):
+    """'TABELA 4' da RAIS: 12 linhas de título, cabeçalho de setores, subcabeçalho de anos e rodapé."""
+    largura = 28
+    linhas = _linhas_vazias(12, largura)
+    linhas[9][1] = 'Ano: 2024'
+
+    cabecalho = [None, 'UF', 'Código', 'Município'] + [None] * 24
+    for i, setor in enumerate(['Agropecuária', 'Indústria', 'Construção', 'Comércio', 'Serviços', 'Total']):
+        cabecalho[4 + 4 * i] = setor
+    subcabecalho = [None] * 4 + ['2023', 2024, 'Variação Absoluta', 'Variação Relativa'] * 6
+    linhas += [cabecalho, subcabecalho, [None] * largura]
+
+    vagas = rng.integers(0, 50_000, size=(len(municipios), 5, 2))
+    for mun, valores in zip(municipios.itertuples(), vagas):
+        linha = [None, mun.sg_uf, mun.codigo6, mun.municipio]
+        for anterior, atual in list(valores) + [tuple(valores.sum(axis=0))]:
+            linha += [int(anterior), int(atual), int(atual - anterior), (atual - anterior) / max(anterior, 1)]
+        linhas.append(linha)
+
+    linhas += [[None] * largura, [None, 'Fonte: RAIS / MTE'] + [None] * (largura - 2)]
+    _escrever_planilha(caminho, {'TABELA 4': linhas})
+
+
+def escrever_cursos(municipios, caminho, rng, cursos_por_municipio=5):
+    """CSV de cursos do Sistec no formato de cursos_encontrados.csv (';' e UTF-8 com BOM)."""
+    repeticoes = np.repeat(np.arange(len(municipios)), cursos_por_municipio)
+    mun = municipios.iloc[repeticoes].reset_index(drop=True)
+    eixos = rng.choice(EIXOS, size=len(mun))
+    df = pd.DataFrame({
+        'NOME SUBTIPO DE CURSOS': 'TÉCNICO',
+        'CÓDIGO CURSO': rng.integers(1, 500, size=len(mun)),
+        'CURSO': ['TÉCNICO EM ' + eixo.split(',')[0] for eixo in eixos],
+        'EIXO TECNOLÓGICO': eixos,
+        'MODALIDADE': rng.choice(['EDUCAÇÃO PRESENCIAL', 'EDUCAÇÃO A DISTÂNCIA'], size=len(mun)),
+        'CARGA HORÁRIA CURSO': rng.choice([800, 1000, 1200], size=len(mun)),
+        'SITUACAO ATIVO': 'ATIVO',
+        'CÓDIGO UNIDADE DE ENSINO': rng.integers(10_000, 99_999, size=len(mun)),
+        'UNIDADE DE ENSINO': 'ESCOLA TÉCNICA ' + mun['municipio'].str.upper(),
+        'MUNICÍPIO': mun['municipio'].str.upper(),
+        'UF': mun['sg_uf'],
+        'CÓDIGO MUNICÍPIO': mun['codigo7'],
+    })
+    df.to_csv(caminho, sep=';', index=False, encoding='utf-8-sig')
+
+
+def escrever_ideb(municipios, caminho, rng):
+    """IDEB do ensino médio por município: 6 linhas de título e dados nas colunas 0, 2, 3, 16 e 17."""
+    largura = 18
+    linhas = _linhas_vazias(6, largura)
+    for mun in municipios.itertuples():
+        for rede in REDES[:int(rng.integers(2, 5))]:
+            linha = [mun.sg_uf, mun.codigo7, mun.municipio, rede] + [None] * (largura - 4)
+            linha[16] = round(float(rng.uniform(2.5, 6.0)), 1)
+            linha[17] = round(float(rng.uniform(2.5, 6.0)), 1) if rng.random() > 0.1 else '-'
+            linhas.append(linha)
+    _escrever_planilha(caminho, {'Municípios': linhas})
+
+
+def escrever_dtb(municipios, caminho):
+    """DTB do IBGE (municípios): 6 linhas de título, cabeçalho e uma linha por município."""
+    cabecalho = ['UF', 'Nome_UF', 'Região Geográfica Intermediária', 'Nome Região Geográfica Intermediária',
+                 'Região Geográfica Imediata', 'Nome Região Geográfica Imediata', 'Município',
+                 'Código Município Completo', 'Nome_Município']
+    linhas = _linhas_vazias(6, len(cabecalho)) + [cabecalho]
+    for mun in municipios.itertuples():
+        rgi = f"{mun.id_uf}{mun.codigo6 % 1000 // 100:02d}"
+        linhas.append([mun.id_uf, mun.nome_uf, f"{mun.id_uf}01", 'Intermediária', rgi, f"Imediata {rgi}",
+                       f"{mun.codigo7 % 100_000:05d}", mun.codigo7, mun.municipio])
+    _escrever_planilha(caminho, {'DTB_2024_Municipio': linhas})
+
+
+def escrever_caged(municipios, caminho, rng, grupos=MESES_CAGED):
+    """
+    'Tabela 8.1' do CAGED: 5 linhas de título (a última com o mês de cada grupo de
+    colunas, como "Janeiro/2020") e cabeçalho com um grupo de colunas por mês.
+    """
+    cabecalho = ['Região', 'UF', 'Código', None] + ['Admissões', 'Desligamentos', 'Saldos'] * grupos
+    linhas = _linhas_vazias(5, len(cabecalho)) + [cabecalho]
+    rotulos = [f"{NOMES_MESES[i % 12]}/{2020 + i // 12}" for i in range(grupos - len(ACUMULADOS_CAGED))]
+    for grupo, rotulo in enumerate(rotulos + ACUMULADOS_CAGED):
+        linhas[4][4 + 3 * grupo] = rotulo
+    valores = rng.integers(0, 5_000, size=(len(municipios), 2 * grupos)).astype(float)
+    for mun, mensal in zip(municipios.itertuples(), valores):
+        linha = ['Nordeste', mun.sg_uf, mun.codigo6, f"{mun.sg_uf}-{mun.municipio}"]
+        for admissoes, desligamentos in mensal.reshape(-1, 2):
+            linha += [admissoes, desligamentos, admissoes - desligamentos]
+        linhas.append(linha)
+    _escrever_planilha(caminho, {'Tabela 8.1': linhas})
+
+
+def escrever_projetos_ia(municipios, caminho, rng):
+    """Planilha de projetos do IA: abas anuais (2020-2025) e de educação profissionalizante (2022-2025)."""
+    abas = {}
+    for ano in range(2020, 2026):
+        coluna_uf = 'UF' if ano % 2 == 0 else 'ESTADO'
+        linhas = _linhas_vazias(5, 5) + [['CIDADES', coluna_uf, 'PROJETOS', 'INSTITUIÇÕES', 'BENEFICIADOS']]
+        for mun in municipios.itertuples():
+            linhas.append([mun.municipio, mun.sg_uf] + rng.integers(1, 200, size=3).tolist())
+        linhas.append(['Obs.: dados sintéticos', None, None, None, None])
+        abas[str(ano)] = linhas
+
+    for ano in range(2022, 2026):
+        coluna_cidade = 0 if ano < 2024 else 1
+        cabecalho = [f'Coluna {i}' for i in range(16)]
+        cabecalho[coluna_cidade] = 'CIDADES'
+        if coluna_cidade == 1:
+            cabecalho[0] = 'UF'
+        linhas = _linhas_vazias(5, 16) + [cabecalho]
+        for mun in municipios.itertuples():
+            linha = rng.integers(0, 100, size=16).tolist()
+            linha[coluna_cidade] = mun.municipio
+            if coluna_cidade == 1:
+                linha[0] = mun.sg_uf
+            linhas.append(linha)
+        # A aba de 2025 tem um espaço no final do nome, como na planilha real.
+        abas[f"{ano}-Ed.Profissionalizante" + (' ' if ano == 2025 else '')] = linhas
+
+    _escrever_planilha(caminho, abas)
+
+
+def escrever_ive(municipios, caminho, rng, total_colunas=136):
+    """IVE_DADOS.xlsx: 6 linhas de título e 136 colunas, com as colunas usadas pela análise."""
+    faixas = ['15 a 19 anos', '20 a 24 anos', '25 a 34 anos', '35 a 44 anos',
+              '45 a 54 anos', '55 a 64 anos', '65 anos ou mais']
+    populacao = rng.integers(2_000, 500_000, size=len(municipios))
+    nao_alfabetizada = (populacao * rng.uniform(0.02, 0.3, size=len(municipios))).astype(int)
+    perfil = rng.dirichlet(np.ones(len(faixas)), size=len(municipios)) * 100
+
+    colunas = {
+        'REGIÃO': 'Nordeste ',
+        'UF': municipios['nome_uf'] + ' ',
+        'MUNICÍPIO': municipios['municipio'],
+        'CÓDIGO\nIBGE': municipios['codigo7'],
+        'ADESÃO AO PACTO\n(SIMEC) ': rng.choice(['Aderiu ao Pacto (2024)', 'Aderiu ao Pacto (2025)', 'Não aderiu'],
+                                                size=len(municipios)),
+        'POPULAÇÃO TOTAL DO MUNICÍPIO +15 anos \n(CENSO IBGE 2022)': populacao,
+        'POPULAÇÃO NÃO ALFABETIZADA (nº de pessoas)\n(CENSO IBGE 2022)': nao_alfabetizada,
+        'Nº de matrículas de EJA - Fundamental + Médio \n(incluindo particulares)\n(CENSO ESCOLAR 2024)':
+            (nao_alfabetizada * rng.uniform(0, 0.5, size=len(municipios))).astype(int),
+    }
+    for i, faixa in enumerate(faixas):
+        colunas[f'{faixa}\n(% da população não alfabetizada)'] = perfil[:, i]
+    for i in range(total_colunas - len(colunas)):
+        colunas[f'Indicador {i}'] = rng.integers(0, 1_000, size=len(municipios))
+
+    df = pd.DataFrame(colunas)
+    linhas = _linhas_vazias(6, len(df.columns)) + [list(df.columns)] + df.to_numpy().tolist()
+    _escrever_planilha(caminho, {'IVE': linhas})
+
+
+def escrever_atuacao_ia(municipios, caminho, rng, quantidade=16):
+    """
+    Lista de municípios de atuação do IA no formato de municipios_atuacao_ia.csv: uma
+    amostra de `quantidade` municípios, com coordenadas, perfil e aderência curados.
+    """
+    amostra = municipios.iloc[np.sort(rng.choice(len(municipios), size=min(quantidade, len(municipios)),
+                                                 replace=False))]
+    df = pd.DataFrame({
+        'codigo_ibge': amostra['codigo7'].to_numpy(),
+        'municipio': amostra['municipio'].to_numpy(),
+        'uf': amostra['sg_uf'].to_numpy(),
+        'lat': rng.uniform(-33.0, 5.0, size=len(amostra)).round(2),
+        'lon': rng.uniform(-73.0, -35.0, size=len(amostra)).round(2),
+        'perfil_cluster': rng.choice([PERFIL_ADULTOS, PERFIL_IDOSOS], size=len(amostra)),
+        'aderente_politica': rng.random(size=len(amostra)) > 0.3,
+    })
+    df.to_csv(caminho, sep=';', index=False)
+
+
+# Arquivo gerado para cada base: nome -> (nome do arquivo, função de escrita).
+BASES = {
+    'rais': ('tabelas-rais-sintetica.xlsx', escrever_rais),
+    'cursos': ('cursos_encontrados.csv', escrever_cursos),
+    'ideb': ('ideb_sintetico.xlsx', escrever_ideb),
+    'dtb': ('dtb_sintetica.xlsx', lambda municipios, caminho, rng: escrever_dtb(municipios, caminho)),
+    'caged': ('caged_sintetico.xlsx', escrever_caged),
+    'projetos_ia': ('projetos_ia_sintetico.xlsx', escrever_projetos_ia),
+    'ive': ('IVE_DADOS_sintetico.xlsx', escrever_ive),
+    'atuacao_ia': ('municipios_atuacao_ia_sintetico.csv', escrever_atuacao_ia),
+}
+
+
+def gerar_bases(diretorio, n_municipios, semente=42, bases=None):
+    """
+    Objetivo: Gerar todas as bases sintéticas para `n_municipios` em `diretorio`.
+
+    Detalhes:
+    - Arquivos já existentes são reaproveitados (a geração é determinística para a
+      mesma semente e o mesmo número de municípios).
+    - Retorna o dicionário {base: caminho do arquivo}.
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    municipios = gerar_municipios(n_municipios, semente)
+    caminhos = {}
+    for nome in bases or BASES:
+        arquivo, escrever = BASES[nome]
+        caminho = os.path.join(diretorio, arquivo)
+        if not os.path.exists(caminho):
+            escrever(municipios, caminho, np.random.default_rng(semente))
+        caminhos[nome] = caminho
+    return caminhos
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera bases sintéticas no formato dos arquivos reais.")
+    parser.add_argument('--municipios', type=int, default=500, help="Número de municípios (ex.: 16, 500, 5570).")
+    parser.add_argument('--saida', default=None, help="Pasta de saída (padrão: .cache/benchmarks/<municipios>).")
+    parser.add_argument('--semente', type=int, default=42)
+    args = parser.parse_args()
+
+    saida = args.saida or os.path.join('.cache', 'benchmarks', str(args.municipios))
+    for nome, caminho in gerar_bases(saida, args.municipios, args.semente).items():
+        print(f"{nome:12s} {caminho}")
@@ -1,5 +1,10 @@
+import os
+
 import pandas as pd
 
+from memoria import compactar_tipos, mapear_categorias
+from nomes_municipios import canonicalizar_nomes
+
 # 1. Lista de cidades e UFs para a busca
 cidades_alvo = [
     ('Itatuba', 'PB'),
@@ -27,56 +32,113 @@ arquivo_entrada = 'Sistec_Cursos_Tecnicos_ativos_120922.csv'
 arquivo_saida_csv = 'cursos_encontrados.csv'
 arquivo_saida_excel = 'cursos_encontrados.xlsx'
 
-try:
-    # 2. Carregar o arquivo CSV
-    print(f"Lendo o arquivo '{arquivo_entrada}'...")
-    df = pd.read_csv(arquivo_entrada, sep=';', encoding='latin-1')
-    print("Arquivo lido com sucesso. Buscando cursos...")
-
-    # Normaliza as colunas de texto para garantir a correspondência
-    df['MUNICÍPIO'] = df['MUNICÍPIO'].str.strip().str.upper()
-    df['UF'] = df['UF'].str.strip().str.upper()
-
-    # 3. Filtrar os dados
-    resultados = []
-    for cidade, uf in cidades_alvo:
-        cidade_normalizada = cidade.strip().upper()
-        uf_normalizada = uf.strip().upper()
-        
-        filtro_cidade = df[(df['MUNICÍPIO'] == cidade_normalizada) & (df['UF'] == uf_normalizada)]
-        
-        if not filtro_cidade.empty:
-            resultados.append(filtro_cidade)
-
-    # 4. Consolidar e exibir os resultados
-    if resultados:
-        cursos_encontrados = pd.concat(resultados, ignore_index=True)
-        
-        print("\n--- Cursos Técnicos Encontrados ---")
-        colunas_para_exibir = [
-            'CURSO', 'UNIDADE DE ENSINO', 'MUNICÍPIO', 'UF', 
-            'CARGA HORÁRIA CURSO', 'MODALIDADE'
-        ]
-        colunas_existentes = [col for col in colunas_para_exibir if col in cursos_encontrados.columns]
-        print(cursos_encontrados[colunas_existentes].to_string())
-
-        # --- NOVO: SALVANDO OS RESULTADOS EM ARQUIVO ---
-        
-        # Opção 1: Salvar em um arquivo CSV (Recomendado)
-        cursos_encontrados.to_csv(arquivo_saida_csv, index=False, sep=';', encoding='utf-8-sig')
-        print(f"\n✅ Resultados salvos com sucesso no arquivo: '{arquivo_saida_csv}'")
-
-        # Opção 2: Salvar em um arquivo Excel (.xlsx)
-        # Para usar esta opção, primeiro instale a biblioteca necessária: pip install openpyxl
-        # Depois, remova o '#' da linha abaixo para ativá-la.
-        # cursos_encontrados.to_excel(arquivo_saida_excel, index=False, sheet_name='Cursos')
-        # print(f"\n✅ Resultados salvos com sucesso no arquivo: '{arquivo_saida_excel}'")
-
-    else:
-        print("\nNenhum curso técnico encontrado para as cidades e estados especificados.")
-
-except FileNotFoundError:
-    print(f"\nERRO: O arquivo '{arquivo_entrada}' não foi encontrado.")
-    print("Por favor, certifique-se de que o arquivo CSV está na mesma pasta que este script Python.")
-except Exception as e:
-    print(f"\nOcorreu um erro inesperado: {e}")
+# Colunas de texto do Sistec lidas como 'category' (poucos valores distintos, repetidos
+# em muitas linhas); as demais colunas de texto seguem a regra de memoria.compactar_tipos.
+COLUNAS_CATEGORICAS_CURSOS = ['NOME SUBTIPO DE CURSOS', 'CURSO', 'EIXO TECNOLÓGICO', 'MODALIDADE',
+                              'SITUACAO ATIVO', 'UNIDADE DE ENSINO', 'MUNICÍPIO', 'UF']
+
+# Número de linhas do CSV do Sistec lidas por vez. Limita a memória usada,
+# independentemente do tamanho do arquivo nacional.
+tamanho_bloco = 100_000
+
+
+def buscar_cursos(arquivo_entrada, cidades_alvo, arquivo_saida, tamanho_bloco=100_000):
+    """
+    Objetivo: Extrair do CSV do Sistec os cursos das cidades-alvo em uma única passada.
+
+    Detalhes:
+    - O arquivo é lido em blocos de `tamanho_bloco` linhas; a memória usada depende do
+      tamanho do bloco, não do tamanho do arquivo.
+    - As cidades-alvo viram um conjunto de chaves (município, UF); cada bloco é filtrado
+      por pertinência a esse conjunto (semi-join), com custo independente do número de
+      cidades na lista.
+    - Os cursos encontrados são gravados à medida que cada bloco é processado, em um
+      arquivo temporário ao lado do CSV de saída; ele só substitui o CSV de saída (de uma
+      só vez, com os.replace) depois que todos os blocos foram lidos. O CSV de saída é
+      a entrada do dashboard, que o recarrega quando ele muda: um erro no meio da leitura
+      não pode deixar um arquivo truncado no lugar dele.
+    - Sem nenhum curso encontrado, o CSV de saída não é alterado (um arquivo anterior,
+      se existir, continua lá); a contagem vazia permite avisar o usuário.
+    - Retorna a contagem de cursos encontrados por (MUNICÍPIO, UF).
+    """
+    cidades = pd.DataFrame(list(cidades_alvo), columns=['MUNICÍPIO', 'UF'])
+    chaves_alvo = set(zip(canonicalizar_nomes(cidades['MUNICÍPIO']),
+                          cidades['UF'].str.strip().str.upper()))
+
+    contagens = []
+    primeiro_bloco = True
+    temporario = f"{arquivo_saida}.{os.getpid()}.tmp"
+    try:
+        for bloco in pd.read_csv(arquivo_entrada, sep=';', encoding='latin-1', chunksize=tamanho_bloco):
+            # Normaliza as colunas de texto para garantir a correspondência
+            bloco['MUNICÍPIO'] = bloco['MUNICÍPIO'].str.strip().str.upper()
+            bloco['UF'] = bloco['UF'].str.strip().str.upper()
+
+            chaves = pd.MultiIndex.from_arrays([canonicalizar_nomes(bloco['MUNICÍPIO']), bloco['UF']])
+            encontrados = bloco[chaves.isin(chaves_alvo)]
+            if encontrados.empty:
+                continue
+
+            # O BOM (utf-8-sig) só é escrito no início do arquivo.
+            encontrados.to_csv(temporario, index=False, sep=';',
+                               mode='w' if primeiro_bloco else 'a',
+                               header=primeiro_bloco,
+                               encoding='utf-8-sig' if primeiro_bloco else 'utf-8')
+            primeiro_bloco = False
+            contagens.append(encontrados.groupby(['MUNICÍPIO', 'UF']).size())
+
+        if contagens:
+            os.replace(temporario, arquivo_saida)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+    if not contagens:
+        return pd.Series(dtype=int)
+    return pd.concat(contagens).groupby(level=['MUNICÍPIO', 'UF']).sum()
+
+
+def carregar_cursos_encontrados(arquivo=arquivo_saida_csv):
+    """
+    Objetivo: Ler o CSV de cursos gerado por `buscar_cursos`, como usado no dashboard.
+
+    Detalhes:
+    - Acrescenta a coluna 'MUNICÍPIO_UPPER' e padroniza a UF, que formam a chave
+      (município, UF) do índice da Fase 4.
+    - As colunas de texto repetitivas são lidas como 'category' e os códigos inteiros
+      reduzidos ao menor tipo possível (ver memoria.py); as padronizações de texto são
+      aplicadas apenas às categorias distintas.
+    """
+    df = pd.read_csv(arquivo, sep=';', dtype={coluna: 'category' for coluna in COLUNAS_CATEGORICAS_CURSOS})
+    df['MUNICÍPIO_UPPER'] = mapear_categorias(df['MUNICÍPIO'], lambda s: s.str.strip().str.upper())
+    df['UF'] = mapear_categorias(df['UF'], lambda s: s.str.strip().str.upper())
+    return compactar_tipos(df)
+
+
+if __name__ == '__main__':
+    try:
+        # 2. Ler o arquivo CSV em blocos e filtrar os cursos das cidades-alvo
+        print(f"Lendo o arquivo '{arquivo_entrada}' em blocos de {tamanho_bloco} linhas...")
+        cursos_por_cidade = buscar_cursos(arquivo_entrada, cidades_alvo, arquivo_saida_csv, tamanho_bloco)
+
+        # 3. Exibir o resumo dos resultados
+        if not cursos_por_cidade.empty:
+            print("\n--- Cursos Técnicos Encontrados por Município ---")
+            print(cursos_por_cidade.to_string())
+            print(f"\n✅ {cursos_por_cidade.sum()} cursos salvos com sucesso no arquivo: '{arquivo_saida_csv}'")
+
+            # Para gerar também um arquivo Excel (.xlsx), instale o openpyxl e converta o
+            # CSV gerado (remova o '#' das linhas abaixo para ativar).
+            # pd.read_csv(arquivo_saida_csv, sep=';').to_excel(arquivo_saida_excel, index=False, sheet_name='Cursos')
+            # print(f"\n✅ Resultados salvos com sucesso no arquivo: '{arquivo_saida_excel}'")
+
+        else:
+            print("\nNenhum curso técnico encontrado para as cidades e estados especificados.")
+            if os.path.exists(arquivo_saida_csv):
+                print(f"O arquivo '{arquivo_saida_csv}' não foi alterado e contém o resultado de uma busca anterior.")
+
+    except FileNotFoundError:
+        print(f"\nERRO: O arquivo '{arquivo_entrada}' não foi encontrado.")
+        print("Por favor, certifique-se de que o arquivo CSV está na mesma pasta que este script Python.")
+    except Exception as e:
+        print(f"\nOcorreu um erro inesperado: {e}")
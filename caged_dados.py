@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+from contextlib import contextmanager
+from operator import itemgetter
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from nomes_municipios import canonicalizar_nomes
+
+# --- Visão Geral do Módulo ---
+# Leitura da 'Tabela 8.1' do Novo CAGED (admissões e desligamentos por município), usada
+# pelo script caged_f. Fica em um módulo próprio para que possa ser importada e medida
+# (ver benchmarks/) sem executar o restante do script.
+#
+# A tabela tem mais de 200 colunas (três por mês desde 2020), mas só três são usadas. Em
+# vez de montar um DataFrame com a planilha inteira, o cabeçalho é lido primeiro para
+# localizar as colunas necessárias, e as linhas são percorridas em modo somente leitura,
+# guardando apenas essas colunas.
+
+ABA_CAGED = 'Tabela 8.1'
+# Linha do cabeçalho, contada a partir de 0 (o header=5 do pd.read_excel).
+LINHA_CABECALHO = 5
+
+# Nomes de coluna como o pd.read_excel os daria: cabeçalhos vazios viram 'Unnamed: i' e
+# repetidos recebem os sufixos '.1', '.2', ... ('Admissões.67' é o 68º grupo de meses).
+COLUNA_MUNICIPIO = 'Unnamed: 3'
+COLUNA_ADMISSOES = 'Admissões.67'
+COLUNA_DESLIGAMENTOS = 'Desligamentos.67'
+
+
+@contextmanager
+def abrir_aba(file_path, aba=ABA_CAGED):
+    """Abre uma aba do XLSX em modo somente leitura (as linhas são lidas sob demanda)."""
+    planilha = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        yield planilha[aba]
+    finally:
+        planilha.close()
+
+
+def ler_linha(aba, linha):
+    """Devolve os valores de uma linha da aba (contada a partir de 0), sem ler as seguintes."""
+    return next(aba.iter_rows(min_row=linha + 1, max_row=linha + 1, values_only=True), ())
+
+
+def ler_colunas(aba, primeira_linha, posicoes):
+    """
+    Objetivo: Percorrer as linhas da aba guardando apenas as colunas indicadas.
+
+    Detalhes:
+    - `primeira_linha` e `posicoes` são contadas a partir de 0.
+    - A leitura se limita ao intervalo entre a primeira e a última coluna pedida, e cada
+      linha é reduzida às colunas pedidas assim que é lida; a memória usada cresce com o
+      número de colunas selecionadas, não com a largura da planilha.
+    - Retorna uma matriz NumPy de objetos (linhas × colunas pedidas).
+    """
+    inicio, fim = min(posicoes), max(posicoes)
+    selecionar = itemgetter(*[posicao - inicio for posicao in posicoes])
+    linhas = aba.iter_rows(min_row=primeira_linha + 1, min_col=inicio + 1, max_col=fim + 1, values_only=True)
+    valores = [selecionar(linha) for linha in linhas]
+    return np.array(valores, dtype=object).reshape(len(valores), len(posicoes))
+
+
+def nomes_colunas(cabecalho):
+    """Reproduz os nomes de coluna que o pd.read_excel daria a uma linha de cabeçalho."""
+    nomes, repeticoes = [], {}
+    for i, valor in enumerate(cabecalho):
+        nome = f'Unnamed: {i}' if valor is None else str(valor)
+        if nome in repeticoes:
+            repeticoes[nome] += 1
+            nome = f"{nome}.{repeticoes[nome]}"
+        else:
+            repeticoes[nome] = 0
+        nomes.append(nome)
+    return nomes
+
+
+def converter_numeros(valores):
+    """
+    Objetivo: Converter valores lidos da planilha para números, de uma só vez.
+
+    Detalhes:
+    - Números vindos do Excel são usados como estão; textos ("1.234") têm o separador de
+      milhar removido (e a vírgula decimal trocada por ponto). Ausências e traços viram 0.
+    - Aceita uma matriz ou DataFrame de objetos; retorna uma matriz de floats.
+    - O tipo de cada coluna é inferido uma vez (pd.api.types.infer_dtype); só as colunas
+      com texto passam pelo tratamento de texto, feito com o acessor .str, que deixa de
+      fora (NaN) as células numéricas.
+    """
+    colunas = {}
+    for coluna, serie in pd.DataFrame(valores).items():
+        numeros = pd.to_numeric(serie, errors='coerce')
+        if pd.api.types.infer_dtype(serie, skipna=True) in ('string', 'mixed', 'mixed-integer'):
+            texto = serie.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+            numeros = pd.to_numeric(texto, errors='coerce').fillna(numeros)
+        colunas[coluna] = numeros
+    return pd.DataFrame(colunas).fillna(0).to_numpy(dtype=float)
+
+
+def carregar_caged_tabela81(file_path):
+    """
+    Objetivo: Ler e limpar a 'Tabela 8.1' do CAGED, agregando os valores por município.
+
+    Detalhes:
+    - Localiza as colunas pelo cabeçalho e lê somente elas (ver `ler_colunas`).
+    - Extrai o nome do município da coluna 'Unnamed: 3' (formato "Uf-Nome"); o limite de
+      uma divisão preserva nomes com hífen, como "Olho-d'Água".
+    - Converte Admissões e Desligamentos para numérico em uma única passada.
+    - Retorna as colunas 'CIDADES_NORMALIZADAS' (chave canônica do nome), 'CIDADES',
+      'ADMISSOES' e 'DESLIGAMENTOS'.
+    """
+    colunas = [COLUNA_MUNICIPIO, COLUNA_ADMISSOES, COLUNA_DESLIGAMENTOS]
+    with abrir_aba(file_path) as aba:
+        nomes = nomes_colunas(ler_linha(aba, LINHA_CABECALHO))
+        faltantes = [coluna for coluna in colunas if coluna not in nomes]
+        if faltantes:
+            raise ValueError(f"Colunas {faltantes} não encontradas na aba '{ABA_CAGED}' de '{file_path}'.")
+        valores = ler_colunas(aba, LINHA_CABECALHO + 1, [nomes.index(coluna) for coluna in colunas])
+
+    df_caged_limpo = pd.DataFrame({
+        'CIDADES': pd.Series(valores[:, 0]).astype(str).str.split('-', n=1).str[1].str.strip(),
+    })
+    # Trata a formatação numérica. O valor é usado como número sempre que a célula já é
+    # numérica; só textos passam pela remoção do separador de milhar.
+    numeros = converter_numeros(valores[:, 1:]).astype(int)
+    # Realiza a divisão dos valores de emprego por 10, conforme orientação da atividade.
+    df_caged_limpo['ADMISSOES'] = numeros[:, 0] / 10
+    df_caged_limpo['DESLIGAMENTOS'] = numeros[:, 1] / 10
+
+    df_caged_limpo['CIDADES_NORMALIZADAS'] = canonicalizar_nomes(df_caged_limpo['CIDADES'])
+    df_caged_limpo = df_caged_limpo.dropna(subset=['CIDADES_NORMALIZADAS'])
+    return df_caged_limpo.groupby('CIDADES_NORMALIZADAS').sum().reset_index()
@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import glob
+import os
+import re
+import unicodedata
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from caged_dados import ABA_CAGED, LINHA_CABECALHO, abrir_aba, converter_numeros, ler_colunas, ler_linha
+from nomes_municipios import para_codigo6
+from snapshot_cache import escrever_json, fingerprint_arquivo, gravar_atomico, hash_arquivo, ler_metadados
+
+# --- Visão Geral do Módulo ---
+# Ingestão incremental das publicações mensais do Novo CAGED (planilha "Tabela 8.1") em
+# uma base colunar que só cresce. Cada publicação traz a série mensal completa desde 2020;
+# a ingestão procura planilhas novas em uma pasta, lê apenas as que ainda não foram vistas
+# e grava somente os meses que a base ainda não tem, um arquivo Parquet por mês. Análises
+# de séries históricas passam a ler a base, sem reabrir as planilhas antigas.
+#
+#   python caged_ingestao.py --origem data/MT --destino data/caged
+
+DIRETORIO_PUBLICACOES = os.path.join('data', 'MT')
+DIRETORIO_CAGED = os.path.join('data', 'caged')
+PADRAO_ARQUIVOS = '*.xlsx'
+
+# Linha (a partir de 0) com o rótulo do mês de cada grupo de colunas ("Junho/2025"), logo
+# acima do cabeçalho com o nome das medidas ('Admissões', 'Desligamentos', 'Saldos').
+LINHA_MESES = LINHA_CABECALHO - 1
+
+COLUNAS_BASE = ['competencia', 'codigo_municipio', 'admissoes', 'desligamentos', 'saldo']
+
+MESES = {'JAN': 1, 'FEV': 2, 'MAR': 3, 'ABR': 4, 'MAI': 5, 'JUN': 6,
+         'JUL': 7, 'AGO': 8, 'SET': 9, 'OUT': 10, 'NOV': 11, 'DEZ': 12}
+_PADRAO_MES = re.compile(r'(?<![A-Z])(' + '|'.join(MESES) + r')[A-Z]*\W*(?:DE\W+)?(\d{4})\b')
+
+VERSAO_MANIFESTO = 1
+
+
+def _sem_acentos(texto):
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii')
+    return texto.upper()
+
+
+def identificar_competencia(valor):
+    """
+    Objetivo: Extrair o mês de referência (pd.Period mensal) de um rótulo ou nome de arquivo.
+
+    Detalhes:
+    - Aceita "Junho/2025", "Jun/2025", "junho de 2025" e nomes de arquivo como
+      "3-tabelas_Junho de 2025 - Site.xlsx", além de datas lidas do Excel.
+    - Retorna None quando não há mês reconhecível (ex.: "Acumulado no Ano").
+    """
+    if isinstance(valor, (datetime, pd.Timestamp)):
+        return pd.Period(valor, freq='M')
+    if not isinstance(valor, str):
+        return None
+    encontrado = _PADRAO_MES.search(_sem_acentos(valor))
+    if encontrado is None:
+        return None
+    return pd.Period(year=int(encontrado.group(2)), month=MESES[encontrado.group(1)], freq='M')
+
+
+def ler_publicacao(file_path, ignorar=()):
+    """
+    Objetivo: Ler uma planilha do CAGED e devolver as linhas mensais no formato da base.
+
+    Detalhes:
+    - Os meses vêm do rótulo acima de cada grupo de colunas (células mescladas são
+      propagadas para a direita); grupos sem mês, como os acumulados, são ignorados.
+    - Meses em `ignorar` (já presentes na base) são descartados antes da conversão.
+    - O município é identificado pela coluna 'Código' (6 dígitos, como na RAIS).
+    - Só as colunas do código e dos meses novos são lidas (ver caged_dados.ler_colunas).
+    - Retorna um DataFrame com COLUNAS_BASE; o saldo é admissões − desligamentos.
+    """
+    with abrir_aba(file_path) as aba:
+        medidas = pd.Series(ler_linha(aba, LINHA_CABECALHO), dtype=object)
+        rotulos = pd.Series(ler_linha(aba, LINHA_MESES), dtype=object).reindex(medidas.index).ffill()
+        # Cabeçalhos vazios (colunas de separação) ficam de fora; o índice é a posição da coluna.
+        medidas = medidas.dropna().astype(str).str.strip()
+        medidas = medidas[medidas != ''].map(_sem_acentos)
+
+        colunas_codigo = medidas.index[medidas == 'CODIGO']
+        if len(colunas_codigo) == 0:
+            raise ValueError(f"Coluna 'Código' não encontrada na aba '{ABA_CAGED}' de '{file_path}'.")
+
+        grupos = pd.DataFrame({'competencia': rotulos[medidas.index].map(identificar_competencia).to_numpy(),
+                               'medida': medidas.to_numpy(),
+                               'coluna': medidas.index.to_numpy()}).dropna(subset=['competencia'])
+        grupos = grupos[~grupos['competencia'].isin(set(ignorar))]
+        posicoes = grupos.pivot_table(index='competencia', columns='medida', values='coluna', aggfunc='first')
+        if posicoes.empty or not {'ADMISSOES', 'DESLIGAMENTOS'}.issubset(posicoes.columns):
+            return pd.DataFrame(columns=COLUNAS_BASE)
+        posicoes = posicoes[['ADMISSOES', 'DESLIGAMENTOS']].dropna().astype(int)
+
+        n_meses = len(posicoes)
+        valores = ler_colunas(aba, LINHA_CABECALHO + 1, [colunas_codigo[0]] + posicoes['ADMISSOES'].tolist()
+                              + posicoes['DESLIGAMENTOS'].tolist())
+
+    codigos = pd.to_numeric(pd.Series(valores[:, 0]), errors='coerce')
+    valores = valores[codigos.notna().to_numpy()]
+    codigos = para_codigo6(codigos.dropna()).to_numpy(dtype=np.int64)
+    numeros = converter_numeros(valores[:, 1:]).round().astype(np.int64)
+    admissoes, desligamentos = numeros[:, :n_meses], numeros[:, n_meses:]
+
+    # Matriz município × mês -> formato longo (mês, município).
+    n_municipios = len(codigos)
+    return pd.DataFrame({
+        'competencia': np.repeat(pd.PeriodIndex(posicoes.index).to_timestamp().to_numpy(), n_municipios),
+        'codigo_municipio': np.tile(codigos, n_meses).astype('int32'),
+        'admissoes': admissoes.T.ravel().astype('int32'),
+        'desligamentos': desligamentos.T.ravel().astype('int32'),
+        'saldo': (admissoes - desligamentos).T.ravel().astype('int32'),
+    })
+
+
+def _caminho_mes(destino, competencia):
+    return os.path.join(destino, 'mensal', f"{competencia}.parquet")
+
+
+def competencias_gravadas(destino=DIRETORIO_CAGED):
+    """Meses já presentes na base (um arquivo Parquet por mês)."""
+    arquivos = glob.glob(os.path.join(destino, 'mensal', '*.parquet'))
+    return {pd.Period(os.path.basename(arquivo)[:-len('.parquet')], freq='M') for arquivo in arquivos}
+
+
+def _ler_manifesto(destino):
+    manifesto = ler_metadados(os.path.join(destino, 'manifesto.json'))
+    if isinstance(manifesto, dict) and manifesto.get('versao') == VERSAO_MANIFESTO:
+        return manifesto
+    return {'versao': VERSAO_MANIFESTO, 'publicacoes': {}}
+
+
+def _gravar_manifesto(destino, manifesto):
+    gravar_atomico(os.path.join(destino, 'manifesto.json'), lambda caminho: escrever_json(caminho, manifesto))
+
+
+def _ja_ingerida(registro, file_path):
+    """Compara a publicação com o registro do manifesto; o hash só é calculado se o mtime mudou."""
+    if registro is None:
+        return False
+    fingerprint = fingerprint_arquivo(file_path, calcular_hash=False)
+    if fingerprint['mtime_ns'] == registro['mtime_ns'] and fingerprint['tamanho'] == registro['tamanho']:
+        return True
+    return hash_arquivo(file_path) == registro['sha256']
+
+
+def ingerir_publicacoes(origem=DIRETORIO_PUBLICACOES, destino=DIRETORIO_CAGED, padrao=PADRAO_ARQUIVOS):
+    """
+    Objetivo: Incorporar à base as publicações do CAGED ainda não processadas.
+
+    Detalhes:
+    - As planilhas são processadas da mais antiga para a mais nova (pelo mês no nome do
+      arquivo); a base só cresce: um mês já gravado nunca é reescrito.
+    - Uma planilha já registrada no manifesto (mesmo tamanho e mtime, ou mesmo hash) não
+      é reaberta. Também não é aberta a planilha cujo mês de publicação já está na base.
+    - Cada mês novo é gravado em 'mensal/AAAA-MM.parquet' e o manifesto registra, por
+      arquivo, o hash, o mês de publicação e os meses incorporados.
+    - Retorna um dicionário {arquivo: lista de meses incorporados}.
+    """
+    os.makedirs(os.path.join(destino, 'mensal'), exist_ok=True)
+    manifesto = _ler_manifesto(destino)
+    gravadas = competencias_gravadas(destino)
+
+    arquivos = sorted(glob.glob(os.path.join(origem, padrao)),
+                      key=lambda caminho: (identificar_competencia(os.path.basename(caminho)) or pd.Period('1900-01', 'M'),
+                                           os.path.basename(caminho)))
+    resultado = {}
+    for file_path in arquivos:
+        nome = os.path.basename(file_path)
+        if nome.startswith('~$') or _ja_ingerida(manifesto['publicacoes'].get(nome), file_path):
+            continue
+
+        publicacao = identificar_competencia(nome)
+        novas = []
+        if publicacao is None or publicacao not in gravadas:
+            df = ler_publicacao(file_path, ignorar=gravadas)
+            for competencia, df_mes in df.groupby('competencia', sort=True):
+                competencia = pd.Period(competencia, freq='M')
+                gravar_atomico(_caminho_mes(destino, competencia),
+                                lambda caminho, df_mes=df_mes: df_mes.to_parquet(caminho, index=False))
+                gravadas.add(competencia)
+                novas.append(str(competencia))
+
+        manifesto['publicacoes'][nome] = {
+            **fingerprint_arquivo(file_path),
+            'competencia_publicacao': str(publicacao) if publicacao is not None else None,
+            'competencias_incorporadas': novas,
+            'ingerido_em': datetime.now().isoformat(timespec='seconds'),
+        }
+        _gravar_manifesto(destino, manifesto)
+        resultado[nome] = novas
+    return resultado
+
+
+def carregar_caged_mensal(destino=DIRETORIO_CAGED, inicio=None, fim=None, codigos=None):
+    """
+    Objetivo: Ler a série mensal do CAGED a partir da base colunar.
+
+    Detalhes:
+    - `inicio` e `fim` ("2023-01", "2025-06") limitam os meses; só os arquivos desses
+      meses são lidos.
+    - `codigos` (opcional) filtra municípios por código IBGE de 6 ou 7 dígitos.
+    - Retorna COLUNAS_BASE, ordenado por mês e município.
+    """
+    meses = sorted(competencias_gravadas(destino))
+    if inicio is not None:
+        meses = [mes for mes in meses if mes >= pd.Period(inicio, freq='M')]
+    if fim is not None:
+        meses = [mes for mes in meses if mes <= pd.Period(fim, freq='M')]
+    if not meses:
+        return pd.DataFrame(columns=COLUNAS_BASE)
+
+    filtros = None
+    if codigos is not None:
+        filtros = [('codigo_municipio', 'in', para_codigo6(codigos).dropna().astype(int).tolist())]
+    partes = [pd.read_parquet(_caminho_mes(destino, mes), filters=filtros) for mes in meses]
+    return pd.concat(partes, ignore_index=True).sort_values(['competencia', 'codigo_municipio'], ignore_index=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Ingestão incremental das publicações mensais do Novo CAGED.")
+    parser.add_argument('--origem', default=DIRETORIO_PUBLICACOES, help="Pasta com as planilhas do CAGED.")
+    parser.add_argument('--destino', default=DIRETORIO_CAGED, help="Pasta da base colunar.")
+    parser.add_argument('--padrao', default=PADRAO_ARQUIVOS, help="Padrão dos nomes de arquivo (padrão: *.xlsx).")
+    args = parser.parse_args()
+
+    incorporadas = ingerir_publicacoes(args.origem, args.destino, args.padrao)
+    if not incorporadas:
+        print("Nenhuma publicação nova encontrada.")
+    for nome, meses in incorporadas.items():
+        if meses:
+            print(f"✅ {nome}: {len(meses)} meses incorporados ({meses[0]} a {meses[-1]}).")
+        else:
+            print(f"ℹ️ {nome}: nenhum mês novo.")
+    print(f"Base em '{args.destino}': {len(competencias_gravadas(args.destino))} meses.")
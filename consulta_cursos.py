@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# --- Visão Geral do Módulo ---
+# Consulta paginada da base de cursos técnicos, usada na Fase 4 do dashboard. Filtros
+# (eixo tecnológico, modalidade, unidade de ensino e carga horária), ordenação e
+# paginação são feitos no servidor, sobre a fatia da base em cache; apenas a página
+# visível é enviada ao navegador, qualquer que seja o tamanho da consulta.
+
+COLUNA_EIXO = 'EIXO TECNOLÓGICO'
+COLUNA_MODALIDADE = 'MODALIDADE'
+COLUNA_UNIDADE = 'UNIDADE DE ENSINO'
+COLUNA_CARGA = 'CARGA HORÁRIA CURSO'
+
+COLUNAS_CONSULTA = ['CURSO', COLUNA_EIXO, COLUNA_MODALIDADE, COLUNA_UNIDADE, COLUNA_CARGA]
+
+CURSOS_POR_PAGINA = 25
+
+
+def opcoes_filtro(df):
+    """
+    Objetivo: Levantar os valores disponíveis para os filtros da consulta.
+
+    Detalhes:
+    - Retorna {coluna: valores distintos em ordem alfabética} para eixo, modalidade e
+      unidade de ensino, e a faixa (mínimo, máximo) de carga horária (ou None, se a
+      coluna não existir ou estiver vazia).
+    """
+    opcoes = {coluna: sorted(df[coluna].dropna().unique().tolist())
+              for coluna in [COLUNA_EIXO, COLUNA_MODALIDADE, COLUNA_UNIDADE] if coluna in df.columns}
+    carga = df[COLUNA_CARGA].dropna() if COLUNA_CARGA in df.columns else pd.Series(dtype=float)
+    opcoes[COLUNA_CARGA] = (int(carga.min()), int(carga.max())) if not carga.empty else None
+    return opcoes
+
+
+def filtrar_cursos(df, eixos=None, modalidades=None, unidades=None, carga=None):
+    """
+    Objetivo: Aplicar os filtros da consulta, devolvendo apenas as linhas selecionadas.
+
+    Detalhes:
+    - Listas vazias (ou None) não filtram; `carga` é uma faixa (mínimo, máximo), inclusiva.
+    - As comparações são vetorizadas; com colunas 'category' elas operam sobre os códigos.
+    """
+    mascara = np.ones(len(df), dtype=bool)
+    for coluna, valores in [(COLUNA_EIXO, eixos), (COLUNA_MODALIDADE, modalidades),
+                            (COLUNA_UNIDADE, unidades)]:
+        if valores:
+            mascara &= df[coluna].isin(valores).to_numpy()
+    if carga is not None:
+        mascara &= df[COLUNA_CARGA].between(*carga).to_numpy()
+    return df[mascara]
+
+
+def paginar_cursos(df, coluna_ordem=None, crescente=True, pagina=1, por_pagina=CURSOS_POR_PAGINA,
+                   colunas=COLUNAS_CONSULTA):
+    """
+    Objetivo: Ordenar a consulta e recortar uma página.
+
+    Detalhes:
+    - A ordenação é estável, com valores ausentes no fim; colunas 'category' lidas do
+      CSV têm as categorias em ordem alfabética, de modo que ordenam pelo texto.
+    - `pagina` começa em 1 e é limitada ao intervalo válido.
+    - Retorna (página com as `colunas` presentes na base, número total de páginas).
+    """
+    total_paginas = max(-(-len(df) // por_pagina), 1)
+    pagina = min(max(pagina, 1), total_paginas)
+
+    if coluna_ordem is not None:
+        df = df.sort_values(coluna_ordem, ascending=crescente, kind='stable', na_position='last')
+    pagina_df = df.iloc[(pagina - 1) * por_pagina:pagina * por_pagina]
+    return pagina_df[[coluna for coluna in colunas if coluna in df.columns]], total_paginas
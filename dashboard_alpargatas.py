@@ -1,12 +1,35 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+import plotly.io as pio
+import streamlit.components.v1 as components
 import folium
-from streamlit_folium import st_folium
+import branca.colormap as cm
+import numpy as np
+import hashlib
+import functools
 from PIL import Image
 import io
 import os # <-- ADICIONE ESTA LINHA
 
+from alinhamento import calcular_alinhamento, ranking_descompasso, setores_principais
+from buscar_cursos import carregar_cursos_encontrados
+from consulta_cursos import (COLUNA_CARGA, COLUNA_EIXO, COLUNA_MODALIDADE, COLUNA_UNIDADE,
+                             COLUNAS_CONSULTA, CURSOS_POR_PAGINA, filtrar_cursos, opcoes_filtro,
+                             paginar_cursos)
+from indice_municipal import construir_indice, fatia_municipio
+from malhas_ibge import (carregar_malha, com_propriedades, limites_malha, objeto_municipios,
+                         qualidade_padrao)
+from instrumentacao import (REGISTRO, carregador_cacheado, exportar_csv, exportar_json,
+                             medir_etapa, medir_fase)
+from ive_nacional import ARQUIVO_ATUACAO_IA, ARQUIVO_IVE, carregar_ive_nacional
+from memoria import memoria_por_coluna, relatorio_memoria
+from monitor_arquivos import MONITOR
+from nomes_municipios import UFS
+from proximidade_cursos import (MALHA_CENTROIDES, carregar_coordenadas_municipios, construir_indice_espacial,
+                                cursos_no_raio)
+from rais_tabela4 import carregar_rais_tabela4, carregar_rais_tabela4_longa
+
 
 # --- Configuração da Página e Estilo ---
 st.set_page_config(
@@ -92,103 +115,92 @@ def apply_custom_css():
 
 
 # --- Funções de Carregamento e Processamento de Dados ---
-@st.cache_data
-def load_vulnerability_data():
+# Os carregadores recebem a `assinatura` dos arquivos de origem (ver monitor_arquivos.py),
+# usada apenas como parte da chave do cache: quando um arquivo muda, a nova versão é
+# carregada em segundo plano sob a nova assinatura. max_entries=2 mantém em memória só a
+# versão em uso e a anterior.
+@carregador_cacheado(max_entries=2)
+def load_vulnerability_data(assinatura=None):
     """
-    Carrega e limpa os dados de vulnerabilidade social e educacional.
-    
-    
-    Dados extraídos das análises de analise_educacional.py
+    Carrega os indicadores de vulnerabilidade social e educacional de todos os municípios.
 
+    O IVE é calculado para o país inteiro a partir do IVE_DADOS.xlsx e guardado em
+    snapshot (ver ive_nacional.py); a base vem ordenada do mais para o menos vulnerável.
     """
-    data = {
-        'municipio': ['Itatuba', 'Mogeiro', 'Ingá', 'Bananeiras', 'Alagoa Nova', 'Serra Redonda', 'Caturité', 'Lagoa Seca', 'Queimadas', 'Santa Rita', 'Guarabira', 'Carpina', 'Campina Grande', 'João Pessoa', 'Montes Claros', 'Cabaceiras'],
-        'uf': ['PB', 'PB', 'PB', 'PB', 'PB', 'PB', 'PB', 'PB', 'PB', 'PB', 'PB', 'PE', 'PB', 'PB', 'MG', 'PB'],
-        'ive': [0.259, 0.235, 0.213, 0.207, 0.197, 0.157, 0.141, 0.139, 0.130, 0.125, 0.125, 0.112, 0.065, 0.042, 0.036, 0.013],
-        'taxa_analfabetismo': [0.278, 0.254, 0.252, 0.250, 0.218, 0.216, 0.164, 0.154, 0.158, 0.144, 0.147, 0.123, 0.080, 0.061, 0.043, 0.093],
-        'taxa_cobertura_eja': [0.070, 0.074, 0.157, 0.170, 0.098, 0.275, 0.137, 0.099, 0.178, 0.128, 0.153, 0.089, 0.188, 0.312, 0.162, 0.860],
-        'perfil_cluster': ['Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Força de Trabalho (Adultos)', 'Analfabetismo Estrutural (Idosos)', 'Analfabetismo Estrutural (Idosos)', 'Analfabetismo Estrutural (Idosos)', 'Analfabetismo Estrutural (Idosos)', 'Analfabetismo Estrutural (Idosos)', 'Analfabetismo Estrutural (Idosos)', 'Analfabetismo Estrutural (Idosos)'],
-        'aderente_politica': [False, False, True, True, False, True, False, True, True, True, True, False, True, True, True, True],
-        'lat': [-7.35, -7.24, -7.24, -6.75, -7.06, -7.18, -7.38, -7.16, -7.22, -7.13, -6.85, -7.85, -7.23, -7.12, -16.73, -7.50],
-        'lon': [-35.65, -35.58, -35.79, -35.63, -35.75, -35.88, -36.05, -35.83, -35.93, -34.97, -35.49, -35.25, -35.88, -34.86, -43.86, -36.28]
-    }
-    df = pd.DataFrame(data)
-    df['municipio_upper'] = df['municipio'].str.upper()
-    df['municipio_uf'] = df['municipio'] + ' (' + df['uf'] + ')'
-    return df
+    return carregar_ive_nacional()
 
-@st.cache_data
-def load_courses_data():
-    """Carrega e processa os dados de cursos técnicos."""
-   
-    # (O conteúdo da sua string de dados de cursos permanece o mesmo)
-    df = pd.read_csv('cursos_encontrados.csv', sep=';')
-    
-    df['MUNICÍPIO_UPPER'] = df['MUNICÍPIO'].str.strip().str.upper()
+ABRANGENCIAS = ["Municípios de atuação do IA", "Por estado", "Brasil"]
+
+def filtrar_abrangencia(df):
+    """Restringe a base de vulnerabilidade à abrangência escolhida na barra lateral."""
+    abrangencia = st.session_state.get("abrangencia", ABRANGENCIAS[0])
+    if abrangencia == "Municípios de atuação do IA":
+        return df[df['atuacao_ia']]
+    if abrangencia == "Por estado":
+        return df[df['uf'] == st.session_state.get("abrangencia_uf", "PB")]
     return df
 
-@st.cache_data
-# REMOVA A FUNÇÃO ANTIGA:
-# @st.cache_data
-# def load_economic_data():
-#     """Carrega dados da matriz econômica local."""
-#     data = { ... }
-#     df = pd.DataFrame(data)
-#     ...
-#     return df
-
-# ADICIONE ESTA NOVA FUNÇÃO NO LUGAR:
-@st.cache_data
-def load_rais_economic_data(file_path):
+@carregador_cacheado(max_entries=2)
+def load_courses_data(assinatura=None):
+    """
+    Carrega e processa os dados de cursos técnicos.
+
+    Retorna a base ordenada por município e o índice {(MUNICÍPIO_UPPER, UF): fatia}
+    usado pela Fase 4 (ver indice_municipal.py).
+    """
+    df = carregar_cursos_encontrados(courses_file_path)
+    return construir_indice(df, ['MUNICÍPIO_UPPER', 'UF'])
+
+@carregador_cacheado(max_entries=2)
+def load_courses_spatial_index(assinatura=None):
+    """
+    Monta o índice espacial (BallTree, haversine) dos municípios com oferta de cursos.
+
+    Retorna (pontos, arvore, coordenadas), em que `coordenadas` traz lat/lon de todos os
+    municípios conhecidos, indexadas pelo código IBGE (ver proximidade_cursos.py). A
+    malha do país entra na assinatura: quando ela é gerada, o índice é refeito com os
+    centroides de todos os municípios.
+    """
+    coordenadas = carregar_coordenadas_municipios()
+    pontos, arvore = construir_indice_espacial(carregar_cursos_encontrados(courses_file_path), coordenadas)
+    return pontos, arvore, coordenadas
+
+@carregador_cacheado(max_entries=2)
+def load_rais_economic_data(file_path, assinatura=None):
     """
     Carrega e processa dados de empregos por setor a partir de um arquivo da RAIS.
+
+    A planilha só é lida do Excel quando o arquivo muda; nas demais vezes os dados
+    vêm do snapshot colunar em disco (ver rais_tabela4.py). Retorna a base ordenada
+    e o índice {(municipio_upper, uf): fatia} usado pela Fase 4.
     """
     try:
-        df = pd.read_excel(file_path, sheet_name='TABELA 4', skiprows=12)
-
-        # Renomeia colunas e seleciona as de interesse
-        df.rename(columns={
-            'Município': 'municipio', 'UF': 'uf', 'Unnamed: 5': 'Agropecuaria',
-            'Unnamed: 9': 'Industria', 'Unnamed: 13': 'Construcao',
-            'Unnamed: 17': 'Comercio', 'Unnamed: 21': 'Servicos'
-        }, inplace=True)
-        
-        colunas_setores = ['Agropecuaria', 'Industria', 'Construcao', 'Comercio', 'Servicos']
-        df_rais = df[['municipio', 'uf'] + colunas_setores].copy()
-
-        # Limpa e converte os dados para formato numérico
-        df_rais.dropna(subset=['municipio', 'uf'], inplace=True)
-        for setor in colunas_setores:
-            df_rais[setor] = pd.to_numeric(df_rais[setor], errors='coerce').fillna(0).astype(int)
-
-        # Transforma os dados do formato "wide" para "long"
-        df_long = df_rais.melt(
-            id_vars=['municipio', 'uf'],
-            value_vars=colunas_setores,
-            var_name='setor',
-            value_name='vagas'
-        )
-        
-        # Cria a coluna 'municipio_upper' necessária para a Fase 4
-        df_long['municipio_upper'] = df_long['municipio'].str.strip().str.upper()
-        return df_long
+        df_long = carregar_rais_tabela4_longa(file_path)
+        return construir_indice(df_long, ['municipio_upper', 'uf'])
 
     except FileNotFoundError:
         st.error(f"Arquivo da RAIS não encontrado em '{file_path}'. Verifique o caminho e o nome do arquivo.")
-        return pd.DataFrame()
+        return pd.DataFrame(), {}
     except Exception as e:
         st.error(f"Erro ao ler o arquivo da RAIS: {e}. Verifique o formato da planilha.")
-        return pd.DataFrame()
-
-def get_sector_to_eixo_mapping():
-    """Mapeia setores econômicos para eixos tecnológicos."""
-    return {
-        'Serviços': ['TURISMO, HOSPITALIDADE E LAZER', 'GESTÃO E NEGÓCIOS', 'INFORMAÇÃO E COMUNICAÇÃO', 'AMBIENTE E SAÚDE'],
-        'Comércio': ['GESTÃO E NEGÓCIOS'],
-        'Agropecuária': ['RECURSOS NATURAIS', 'PRODUÇÃO ALIMENTÍCIA'],
-        'Industria': ['CONTROLE E PROCESSOS INDUSTRIAIS', 'PRODUÇÃO INDUSTRIAL'],
-        'Construcao': ['INFRAESTRUTURA'] 
-    }
+        return pd.DataFrame(), {}
+
+@carregador_cacheado(max_entries=2)
+def load_alignment_data(file_path, assinatura=None):
+    """
+    Calcula o alinhamento entre setores econômicos e eixos tecnológicos para todos os municípios.
+
+    O mapeamento setor -> eixos fica em alinhamento.py, que cruza de uma vez a Tabela 4
+    da RAIS com a base de cursos. Retorna (resumo, matrizes) ou (DataFrame vazio, {}).
+    """
+    try:
+        df_rais = carregar_rais_tabela4(file_path)
+        df_cursos = carregar_cursos_encontrados(courses_file_path)
+        return calcular_alinhamento(df_rais, df_cursos)
+
+    except FileNotFoundError as e:
+        st.error(f"Arquivo não encontrado para o cálculo de alinhamento: {e}")
+        return pd.DataFrame(), {}
 
 # --- Funções para Renderizar as Páginas ("Fases") ---
 
@@ -212,13 +224,209 @@ def show_introduction():
     st.info("**Como usar:** Selecione uma das fases no menu lateral para iniciar a sua análise.")
 
 def get_color_for_ive(ive):
-    """Retorna uma cor baseada no valor do IVE para o mapa."""
-    if ive > 0.2:
-        return 'red'
-    elif ive > 0.1:
-        return 'orange'
+    """Retorna, de forma vetorizada, a cor de cada município no mapa a partir do IVE."""
+    return np.select([ive > 0.2, ive > 0.1], ['red', 'orange'], default='green')
+
+def dataset_hash(df):
+    """Calcula um hash estável do conteúdo de um DataFrame, usado como chave de cache."""
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+# --- Cache de Figuras Plotly ---
+# A montagem de uma figura pelo Plotly Express (com a validação de cada atributo) custa
+# bem mais que a sua leitura a partir do JSON. As figuras abaixo são montadas uma única
+# vez por conteúdo de dados e parâmetros, e guardadas já serializadas em JSON (um texto
+# imutável, seguro para compartilhar entre sessões). Cada função aparece na página de
+# diagnóstico como carregador, com o tempo de montagem ('miss') e o de leitura ('hit').
+
+# Gráficos de setores guardados (um por município consultado).
+MAX_FIGURAS_MUNICIPIO = 256
+
+def figura_de_json(figura_json):
+    """Reconstrói uma figura Plotly a partir do JSON guardado em cache."""
+    return pio.from_json(figura_json)
+
+@carregador_cacheado(show_spinner=False)
+def build_ive_ranking_json(data_hash, _df_ranking):
+    """Monta o ranking de IVE (barras horizontais) e o devolve em JSON; o cache é indexado por `data_hash`."""
+    fig_ive = px.bar(
+        _df_ranking,
+        x='ive',
+        y='municipio_uf',
+        orientation='h',
+        title='Índice de Vulnerabilidade à Exclusão (IVE) por Município',
+        labels={'ive': 'Índice de Vulnerabilidade (IVE)', 'municipio_uf': 'Município'},
+        text='ive'
+    )
+    fig_ive.update_traces(
+        marker_color='#F26522',  # Laranja do Instituto Alpargatas
+        texttemplate='%{text:.3f}', 
+        textposition='outside'
+    )
+    fig_ive.update_layout(yaxis={'categoryorder':'total ascending'})
+    return fig_ive.to_json()
+
+@carregador_cacheado(show_spinner=False)
+def build_ive_scatter_json(data_hash, com_rotulos, _df):
+    """Monta a dispersão IVE × analfabetismo e a devolve em JSON; `com_rotulos` escreve o nome de cada ponto."""
+    fig_scatter = px.scatter(
+        _df,
+        x='taxa_analfabetismo',
+        y='ive',
+        text='municipio' if com_rotulos else None,
+        hover_name='municipio_uf',
+        title='Relação entre IVE e Taxa de Analfabetismo',
+        labels={'taxa_analfabetismo': 'Taxa de Analfabetismo', 'ive': 'Índice de Vulnerabilidade (IVE)'},
+        color_discrete_sequence=['#0055A4'] # Azul Corporativo
+    )
+    fig_scatter.update_traces(textposition='top center')
+    fig_scatter.update_layout(xaxis_tickformat=".1%")
+    return fig_scatter.to_json()
+
+@carregador_cacheado(show_spinner=False, max_entries=MAX_FIGURAS_MUNICIPIO)
+def build_sectors_pie_json(chave_municipio, data_hash, _df_eco_mun):
+    """Monta o gráfico de setores empregadores de um município e o devolve em JSON."""
+    fig_eco = px.pie(_df_eco_mun, names='setor', values='vagas',
+                     title=f"Setores Empregadores", hole=0.4,
+                     color_discrete_sequence=px.colors.sequential.Oranges_r)
+    fig_eco.update_traces(textinfo='percent+label', showlegend=False)
+    return fig_eco.to_json()
+
+def build_vulnerability_geojson(df):
+    """
+    Monta uma FeatureCollection GeoJSON (um ponto por município) a partir da base de
+    vulnerabilidade. Cores, raios e textos do popup são calculados em bloco, sem iterrows.
+    """
+    cores = get_color_for_ive(df['ive'].to_numpy())
+    raios = (df['taxa_analfabetismo'].to_numpy() * 70).round(1)  # Fator de escala para o raio
+    ive_fmt = np.char.mod('%.3f', df['ive'].to_numpy())
+    analfabetismo_fmt = np.char.mod('%.1f%%', df['taxa_analfabetismo'].to_numpy() * 100)
+    cobertura_fmt = np.char.mod('%.1f%%', df['taxa_cobertura_eja'].to_numpy() * 100)
+
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+            'properties': {'municipio_uf': nome, 'ive': ive, 'analfabetismo': analf,
+                           'cobertura': cob, 'cor': cor, 'raio': raio},
+        }
+        for nome, lat, lon, ive, analf, cob, cor, raio in zip(
+            df['municipio_uf'].tolist(), df['lat'].tolist(), df['lon'].tolist(), ive_fmt.tolist(),
+            analfabetismo_fmt.tolist(), cobertura_fmt.tolist(), cores.tolist(), raios.tolist())
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+@carregador_cacheado(show_spinner=False)
+def build_vulnerability_map_html(data_hash, _df):
+    """
+    Constrói o mapa de vulnerabilidade como uma única camada GeoJSON e devolve o HTML renderizado.
+
+    O cache é indexado por `data_hash` (conteúdo da base); `_df` não entra na chave, de modo
+    que reruns sem mudança nos dados reutilizam o HTML já pronto.
+    """
+    map_center = [_df['lat'].mean(), _df['lon'].mean()]
+    m = folium.Map(location=map_center, zoom_start=7, tiles="CartoDB positron")
+
+    folium.GeoJson(
+        build_vulnerability_geojson(_df),
+        name="Vulnerabilidade (IVE)",
+        marker=folium.CircleMarker(fill=True, fill_opacity=0.6),
+        style_function=lambda feature: {
+            'color': feature['properties']['cor'],
+            'fillColor': feature['properties']['cor'],
+            'radius': feature['properties']['raio'],
+        },
+        popup=folium.GeoJsonPopup(
+            fields=['municipio_uf', 'ive', 'analfabetismo', 'cobertura'],
+            aliases=['Município:', 'IVE:', 'Analfabetismo:', 'Cobertura EJA:'],
+            max_width=300,
+        ),
+    ).add_to(m)
+
+    return m.get_root().render()
+
+LIMITE_LISTAGEM = 30
+
+def listar_municipios(municipios):
+    """Lista municípios em tópicos; listas longas (ex.: o país inteiro) viram uma tabela."""
+    if len(municipios) > LIMITE_LISTAGEM:
+        st.dataframe(municipios.rename('Município').reset_index(drop=True), use_container_width=True)
     else:
-        return 'green'
+        for mun in municipios:
+            st.markdown(f"- {mun}")
+
+# Indicadores disponíveis no mapa coroplético: coluna -> (rótulo, formato do valor).
+INDICADORES_MAPA = {
+    'ive': ('IVE', '{:.3f}'),
+    'taxa_analfabetismo': ('Taxa de Analfabetismo', '{:.1%}'),
+    'taxa_cobertura_eja': ('Cobertura EJA', '{:.1%}'),
+}
+
+TIPOS_MAPA = ["Pontos (municípios com coordenadas)", "Coroplético (malha municipal do IBGE)"]
+
+@carregador_cacheado(show_spinner=False)
+def build_choropleth_map_html(uf, qualidade, indicador, data_hash, _df):
+    """
+    Constrói o mapa coroplético de um indicador sobre a malha municipal do IBGE e devolve o HTML.
+
+    A malha vai ao navegador em TopoJSON (ver malhas_ibge.py), já com a cor e o valor
+    formatado de cada município. O cache é indexado pelo recorte (`uf`, ou None para o
+    país), pelo nível da malha, pelo indicador e por `data_hash`.
+    """
+    rotulo, formato = INDICADORES_MAPA[indicador]
+    valores = _df[indicador].to_numpy(dtype=float)
+    escala = cm.linear.YlOrRd_09.scale(np.nanmin(valores), np.nanmax(valores))
+    escala.caption = rotulo
+
+    propriedades = {
+        str(codigo): {'municipio_uf': nome,
+                      'valor': 'sem dado' if np.isnan(valor) else formato.format(valor),
+                      'cor': '#d9d9d9' if np.isnan(valor) else escala(valor)}
+        for codigo, nome, valor in zip(_df['codigo_ibge'].tolist(), _df['municipio_uf'].tolist(), valores.tolist())
+    }
+    topologia = com_propriedades(carregar_malha(uf, qualidade), propriedades)
+
+    m = folium.Map(tiles="CartoDB positron")
+    m.fit_bounds(limites_malha(topologia))
+    folium.TopoJson(
+        topologia,
+        f"objects.{objeto_municipios(topologia)}",
+        name=rotulo,
+        style_function=lambda feature: {
+            'fillColor': feature['properties'].get('cor', '#d9d9d9'),
+            'color': '#ffffff',
+            'weight': 0.3,
+            'fillOpacity': 0.8,
+        },
+        tooltip=folium.GeoJsonTooltip(fields=['municipio_uf', 'valor'], aliases=['Município:', f'{rotulo}:']),
+    ).add_to(m)
+    escala.add_to(m)
+    return m.get_root().render()
+
+def show_mapa_coropletico():
+    """
+    Exibe o mapa coroplético de IVE, analfabetismo ou cobertura da EJA para todos os
+    municípios de uma UF ou do país, independentemente da abrangência escolhida.
+    """
+    col1, col2 = st.columns(2)
+    indicador = col1.selectbox("Indicador:", list(INDICADORES_MAPA),
+                               format_func=lambda coluna: INDICADORES_MAPA[coluna][0], key="mapa_indicador")
+    recortes = ["Brasil"] + sorted(UFS)
+    recorte = col2.selectbox("Recorte:", recortes, key="mapa_recorte",
+                             index=recortes.index(st.session_state.get("abrangencia_uf", "PB")))
+    uf = None if recorte == "Brasil" else recorte
+
+    df_nacional = carregar_base('vulnerabilidade')
+    df_mapa = df_nacional if uf is None else df_nacional[df_nacional['uf'] == uf]
+    df_mapa = df_mapa[['codigo_ibge', 'municipio_uf', indicador]]
+    try:
+        with medir_etapa('mapa_folium'):
+            map_html = build_choropleth_map_html(uf, qualidade_padrao(uf), indicador, dataset_hash(df_mapa), df_mapa)
+    except OSError as e:
+        st.warning(f"Não foi possível obter a malha municipal do IBGE ({e}). Com acesso à internet, "
+                   "preencha o cache local com `python malhas_ibge.py --brasil --ufs <UF>`.")
+        return
+    with medir_etapa('serializacao_mapa'):
+        components.html(map_html, height=600)
 
 def show_fase1(df):
     """
@@ -242,45 +450,35 @@ def show_fase1(df):
     # Gráfico 1: Ranking de IVE
     st.markdown("#### Ranking de Vulnerabilidade (IVE)")
     st.markdown("O gráfico abaixo ordena os municípios pelo **Índice de Vulnerabilidade à Exclusão (IVE)**. Valores mais altos indicam maior vulnerabilidade, sinalizando prioridade na análise.")
+    df_ranking = df.nlargest(LIMITE_LISTAGEM, 'ive')
+    if len(df) > LIMITE_LISTAGEM:
+        st.caption(f"Exibindo os {LIMITE_LISTAGEM} municípios mais vulneráveis de {len(df)}.")
     
-    fig_ive = px.bar(
-        df.sort_values('ive', ascending=False),
-        x='ive',
-        y='municipio_uf',
-        orientation='h',
-        title='Índice de Vulnerabilidade à Exclusão (IVE) por Município',
-        labels={'ive': 'Índice de Vulnerabilidade (IVE)', 'municipio_uf': 'Município'},
-        text='ive'
-    )
-    fig_ive.update_traces(
-        marker_color='#F26522',  # Laranja do Instituto Alpargatas
-        texttemplate='%{text:.3f}', 
-        textposition='outside'
-    )
-    fig_ive.update_layout(yaxis={'categoryorder':'total ascending'})
-    st.plotly_chart(fig_ive, use_container_width=True)
+    with medir_etapa('figura_plotly'):
+        fig_ive = figura_de_json(build_ive_ranking_json(dataset_hash(df_ranking), df_ranking))
+    with medir_etapa('serializacao_plotly'):
+        st.plotly_chart(fig_ive, use_container_width=True)
 
     # Gráfico 2: Correlação entre IVE e Analfabetismo
     st.markdown("#### Correlação: IVE vs. Taxa de Analfabetismo")
     st.markdown("Este gráfico de dispersão ajuda a visualizar a relação entre a vulnerabilidade e o analfabetismo. Municípios no quadrante superior direito representam os maiores desafios.")
 
-    fig_scatter = px.scatter(
-        df,
-        x='taxa_analfabetismo',
-        y='ive',
-        text='municipio',
-        title='Relação entre IVE e Taxa de Analfabetismo',
-        labels={'taxa_analfabetismo': 'Taxa de Analfabetismo', 'ive': 'Índice de Vulnerabilidade (IVE)'},
-        color_discrete_sequence=['#0055A4'] # Azul Corporativo
-    )
-    fig_scatter.update_traces(textposition='top center')
-    fig_scatter.update_layout(xaxis_tickformat=".1%")
-    st.plotly_chart(fig_scatter, use_container_width=True)
+    with medir_etapa('figura_plotly'):
+        df_scatter = df[['taxa_analfabetismo', 'ive', 'municipio', 'municipio_uf']]
+        fig_scatter = figura_de_json(build_ive_scatter_json(
+            dataset_hash(df_scatter), len(df) <= LIMITE_LISTAGEM, df_scatter))
+    with medir_etapa('serializacao_plotly'):
+        st.plotly_chart(fig_scatter, use_container_width=True)
 
     st.markdown("---")
 
     # Mapa Interativo Aprimorado
     st.subheader("Mapa Temático de Vulnerabilidade")
+    tipo_mapa = st.radio("Tipo de mapa:", TIPOS_MAPA, horizontal=True, key="tipo_mapa")
+    if tipo_mapa == TIPOS_MAPA[1]:
+        show_mapa_coropletico()
+        return
+
     st.markdown("""
     O mapa interativo abaixo consolida os indicadores de forma geoespacial:
     - **Cor do Círculo:** Representa o nível do IVE (Vermelho: Alto, Laranja: Médio, Verde: Baixo).
@@ -289,29 +487,14 @@ def show_fase1(df):
     Passe o mouse ou clique nos círculos para ver os detalhes de cada município.
     """)
     
-    # Centralizar o mapa
-    map_center = [df['lat'].mean(), df['lon'].mean()]
-    m = folium.Map(location=map_center, zoom_start=7, tiles="CartoDB positron")
-
-    for idx, row in df.iterrows():
-        popup_html = f"""
-        <b>Município:</b> {row['municipio_uf']}<br>
-        <b>IVE:</b> {row['ive']:.3f}<br>
-        <b>Analfabetismo:</b> {row['taxa_analfabetismo']:.1%}<br>
-        <b>Cobertura EJA:</b> {row['taxa_cobertura_eja']:.1%}
-        """
-        
-        folium.CircleMarker(
-            location=[row['lat'], row['lon']],
-            radius=row['taxa_analfabetismo'] * 70,  # Fator de escala para o raio
-            color=get_color_for_ive(row['ive']),
-            fill=True,
-            fill_color=get_color_for_ive(row['ive']),
-            fill_opacity=0.6,
-            popup=folium.Popup(popup_html, max_width=300)
-        ).add_to(m)
-
-    st_folium(m, width='100%', height=500)
+    map_df = df[['municipio_uf', 'lat', 'lon', 'ive', 'taxa_analfabetismo', 'taxa_cobertura_eja']].dropna(subset=['lat', 'lon'])
+    if map_df.empty:
+        st.info("Não há coordenadas cadastradas para os municípios selecionados. O mapa cobre os municípios de atuação do IA.")
+        return
+    with medir_etapa('mapa_folium'):
+        map_html = build_vulnerability_map_html(dataset_hash(map_df), map_df)
+    with medir_etapa('serializacao_mapa'):
+        components.html(map_html, height=500)
 
 def show_fase2(df):
     """Exibe a Fase 2: Segmentação por Perfis de Analfabetismo."""
@@ -333,8 +516,7 @@ def show_fase2(df):
         st.markdown("- **Estratégia Recomendada:** Foco em EJA Profissionalizante, horários flexíveis (noturno), e parcerias com empresas locais para incentivar a matrícula de funcionários.")
         
         with st.expander("Municípios com este perfil"):
-            for mun in df[df['perfil_cluster'] == 'Força de Trabalho (Adultos)']['municipio_uf']:
-                st.markdown(f"- {mun}")
+            listar_municipios(df.loc[df['perfil_cluster'] == 'Força de Trabalho (Adultos)', 'municipio_uf'])
 
     with col2:
         st.subheader("Perfil 2: Analfabetismo Estrutural (Idosos)")
@@ -346,8 +528,7 @@ def show_fase2(df):
         st.markdown("- **Estratégia Recomendada:** Foco em EJA como ferramenta de inclusão social e cidadania, alfabetização digital, e parcerias com centros de convivência e secretarias de assistência social.")
 
         with st.expander("Municípios com este perfil"):
-            for mun in df[df['perfil_cluster'] == 'Analfabetismo Estrutural (Idosos)']['municipio_uf']:
-                st.markdown(f"- {mun}")
+            listar_municipios(df.loc[df['perfil_cluster'] == 'Analfabetismo Estrutural (Idosos)', 'municipio_uf'])
 
 def show_fase3(df):
     """Exibe a Fase 3: Análise de Maturidade Institucional."""
@@ -382,30 +563,120 @@ def show_fase3(df):
     
     with col_sim:
         with st.expander(f"✅ **Municípios Aderentes** ({len(df[df['aderente_politica'] == True])})"):
-            for mun in df[df['aderente_politica'] == True]['municipio_uf']:
-                st.markdown(f"- {mun}")
+            listar_municipios(df.loc[df['aderente_politica'] == True, 'municipio_uf'])
                 
     with col_nao:
         with st.expander(f"❌ **Municípios Não Aderentes** ({len(df[df['aderente_politica'] == False])})"):
-            for mun in df[df['aderente_politica'] == False]['municipio_uf']:
-                st.markdown(f"- {mun}")
+            listar_municipios(df.loc[df['aderente_politica'] == False, 'municipio_uf'])
 
 # "Fase 4: Alinhamento Estratégico de Cursos" # Mantenha esta linha
-def show_fase4(df_vulnerability, df_economic, df_courses):
-    """Exibe a Fase 4: Alinhamento Estratégico de Cursos."""
+def show_ranking_descompasso(df_vulnerability, df_alignment):
+    """Exibe os municípios da abrangência com maior descompasso entre demanda e oferta de cursos."""
+    st.subheader("Ranking de Descompasso entre Demanda e Oferta")
+    st.markdown("O **descompasso** soma, eixo a eixo, o quanto a participação do eixo na demanda "
+                "(empregos dos setores associados) supera a sua participação nos cursos ofertados: "
+                "0 indica oferta alinhada à economia local e 1 indica nenhum curso nos eixos demandados.")
+    ranking = ranking_descompasso(df_alignment, df_vulnerability['codigo_ibge'])
+    st.dataframe(
+        ranking.head(LIMITE_LISTAGEM)[['municipio', 'uf', 'descompasso', 'eixo_maior_lacuna',
+                                       'cursos_total', 'cursos_alinhados', 'total_vagas']],
+        column_config={'descompasso': st.column_config.ProgressColumn(
+            "Descompasso", min_value=0.0, max_value=1.0, format="%.2f")},
+        hide_index=True, use_container_width=True)
+    if len(ranking) > LIMITE_LISTAGEM:
+        st.caption(f"Exibindo os {LIMITE_LISTAGEM} municípios de maior descompasso, de {len(ranking)} na abrangência selecionada.")
+
+def show_consulta_cursos(df_cursos, chave_widgets, colunas=COLUNAS_CONSULTA):
+    """
+    Exibe a consulta paginada de cursos.
+
+    Filtros, ordenação e paginação são aplicados no servidor (ver consulta_cursos.py);
+    apenas a página visível é enviada ao navegador.
+    """
+    opcoes = opcoes_filtro(df_cursos)
+    col1, col2, col3 = st.columns(3)
+    eixos = col1.multiselect("Eixo tecnológico", opcoes[COLUNA_EIXO], key=f"{chave_widgets}_eixo")
+    modalidades = col2.multiselect("Modalidade", opcoes[COLUNA_MODALIDADE], key=f"{chave_widgets}_modalidade")
+    unidades = col3.multiselect("Unidade de ensino", opcoes[COLUNA_UNIDADE], key=f"{chave_widgets}_unidade")
+
+    carga = None
+    if opcoes[COLUNA_CARGA] and opcoes[COLUNA_CARGA][0] < opcoes[COLUNA_CARGA][1]:
+        carga = st.slider("Carga horária (horas)", *opcoes[COLUNA_CARGA], value=opcoes[COLUNA_CARGA],
+                          key=f"{chave_widgets}_carga")
+
+    df_filtrado = filtrar_cursos(df_cursos, eixos, modalidades, unidades, carga)
+    total_paginas = max(-(-len(df_filtrado) // CURSOS_POR_PAGINA), 1)
+    # A página fica no session_state; ao estreitar os filtros, ela pode deixar de existir.
+    chave_pagina = f"{chave_widgets}_pagina"
+    st.session_state[chave_pagina] = min(st.session_state.get(chave_pagina, 1), total_paginas)
+
+    col4, col5, col6 = st.columns(3)
+    coluna_ordem = col4.selectbox("Ordenar por", colunas, key=f"{chave_widgets}_ordem")
+    crescente = col5.radio("Ordem", ["Crescente", "Decrescente"], horizontal=True,
+                           key=f"{chave_widgets}_sentido") == "Crescente"
+    pagina = col6.number_input("Página", min_value=1, max_value=total_paginas, step=1, key=chave_pagina)
+
+    df_pagina, _ = paginar_cursos(df_filtrado, coluna_ordem, crescente, pagina, colunas=colunas)
+    st.caption(f"{len(df_filtrado)} cursos encontrados · página {pagina} de {total_paginas}")
+    st.dataframe(df_pagina, use_container_width=True, hide_index=True)
+
+
+def cursos_no_entorno(courses, codigo6):
+    """
+    Pede o raio de busca e devolve os cursos ofertados a até essa distância do município.
+
+    A busca usa o índice espacial em cache (ver proximidade_cursos.py), carregado apenas
+    quando este modo é aberto. Devolve None quando o município não tem coordenadas.
+    """
+    pontos, arvore, coordenadas = carregar_base('proximidade')
+    coordenadas_municipio = coordenadas[coordenadas.index // 10 == codigo6]
+    if coordenadas_municipio.empty:
+        if os.path.exists(MALHA_CENTROIDES):
+            st.info("Não há coordenadas cadastradas para este município; a busca por raio não está disponível.")
+        else:
+            st.info("Sem a malha municipal do país, a busca por raio cobre apenas os municípios de atuação "
+                    "do IA. Para os demais, gere a malha com `python malhas_ibge.py --brasil`.")
+        return None
+
+    lat, lon = coordenadas_municipio.iloc[0]
+    raio_km = st.slider("Raio de busca (km)", min_value=5, max_value=300, value=50, step=5,
+                        key=f"cursos_raio_km_{codigo6}")
+    df_entorno = cursos_no_raio(*courses, pontos, arvore, lat, lon, raio_km)
+    n_municipios = df_entorno['MUNICÍPIO_UPPER'].nunique() if not df_entorno.empty else 0
+    st.caption(f"{len(df_entorno)} cursos em {n_municipios} município(s) a até {raio_km} km.")
+    return df_entorno
+
+def show_fase4(df_vulnerability, economic, courses, alignment):
+    """
+    Exibe a Fase 4: Alinhamento Estratégico de Cursos.
+
+    `economic` e `courses` são os pares (base, índice) retornados pelos carregadores;
+    os dados de cada município são obtidos pelo índice, sem varrer as bases. As
+    recomendações vêm de `alignment`, calculado para todos os municípios de uma vez.
+    """
     st.header("Fase 4: Alinhamento Estratégico de Cursos")
     st.markdown("Esta análise cruza a **matriz econômica local** (setores que mais empregam) com a **oferta de cursos técnicos**, gerando recomendações para maximizar a empregabilidade dos egressos da EJA.")
     
-    municipios_options = sorted(df_vulnerability['municipio'].unique())
-    selected_municipio = st.selectbox(
+    df_economic, idx_economic = economic
+    df_courses, idx_courses = courses
+    df_alignment, matrizes = alignment
+    if not df_alignment.empty:
+        show_ranking_descompasso(df_vulnerability, df_alignment)
+        st.markdown("---")
+
+    municipios_chaves = dict(zip(df_vulnerability['municipio_uf'],
+                                 zip(df_vulnerability['municipio'], df_vulnerability['uf'],
+                                     df_vulnerability['codigo_ibge'] // 10)))
+    selected_municipio_uf = st.selectbox(
         "Selecione um município para análise de alinhamento:",
-        options=municipios_options
+        options=sorted(municipios_chaves)
     )
     
-    if selected_municipio:
-        municipio_upper = selected_municipio.upper()
-        df_eco_mun = df_economic[df_economic['municipio_upper'] == municipio_upper]
-        df_crs_mun = df_courses[df_courses['MUNICÍPIO_UPPER'] == municipio_upper]
+    if selected_municipio_uf:
+        selected_municipio, uf, codigo6 = municipios_chaves[selected_municipio_uf]
+        chave = (selected_municipio.upper(), uf)
+        df_eco_mun = fatia_municipio(df_economic, idx_economic, chave)
+        df_crs_mun = fatia_municipio(df_courses, idx_courses, chave)
         
         if df_eco_mun.empty:
             st.warning(f"Não há dados sobre a matriz econômica disponíveis para {selected_municipio}.")
@@ -417,17 +688,19 @@ def show_fase4(df_vulnerability, df_economic, df_courses):
         
         with col1:
             st.markdown("**Matriz Econômica Local**")
-            fig_eco = px.pie(df_eco_mun, names='setor', values='vagas',
-                             title=f"Setores Empregadores", hole=0.4,
-                             color_discrete_sequence=px.colors.sequential.Oranges_r)
-            fig_eco.update_traces(textinfo='percent+label', showlegend=False)
-            st.plotly_chart(fig_eco, use_container_width=True)
+            with medir_etapa('figura_plotly'):
+                fig_eco = figura_de_json(build_sectors_pie_json(
+                    chave, dataset_hash(df_eco_mun[['setor', 'vagas']]), df_eco_mun))
+            with medir_etapa('serializacao_plotly'):
+                st.plotly_chart(fig_eco, use_container_width=True)
             
         with col2:
             st.markdown("**Alinhamento Estratégico e Recomendações**")
-            top_setores = df_eco_mun.sort_values('vagas', ascending=False).head(3)['setor'].tolist()
-            mapping = get_sector_to_eixo_mapping()
-            eixos_recomendados = list(set([eixo for setor in top_setores for eixo in mapping.get(setor, [])]))
+            top_setores, eixos_recomendados = [], []
+            if codigo6 in df_alignment.index:
+                top_setores = setores_principais(df_alignment.loc[codigo6])
+                recomendado = matrizes['recomendado'].loc[codigo6]
+                eixos_recomendados = recomendado.index[recomendado.to_numpy()].tolist()
             
             if not eixos_recomendados:
                 st.info("Não foi possível gerar recomendações automáticas de eixos tecnológicos para os setores deste município.")
@@ -447,28 +720,165 @@ def show_fase4(df_vulnerability, df_economic, df_courses):
                     
         st.markdown("---")
         with st.expander(f"Consultar todos os {len(df_crs_mun)} cursos técnicos disponíveis em {selected_municipio}"):
-            if df_crs_mun.empty:
-                st.write("Nenhum curso técnico cadastrado para este município na base de dados.")
+            abrangencia = st.radio("Abrangência da consulta", ["Município", f"Estado ({uf})", "Raio (km)"],
+                                   horizontal=True, key=f"cursos_abrangencia_{codigo6}")
+            colunas = COLUNAS_CONSULTA
+            if abrangencia == "Município":
+                df_consulta, chave_widgets = df_crs_mun, f"cursos_{codigo6}"
+            elif abrangencia == "Raio (km)":
+                df_consulta, chave_widgets = cursos_no_entorno(courses, codigo6), f"cursos_raio_{codigo6}"
+                colunas = ['distancia_km', 'MUNICÍPIO'] + COLUNAS_CONSULTA
+                if df_consulta is None:
+                    return
             else:
-                st.dataframe(df_crs_mun[['CURSO', 'EIXO TECNOLÓGICO', 'MODALIDADE', 'UNIDADE DE ENSINO']])
+                df_consulta, chave_widgets = df_courses[df_courses['UF'] == uf], f"cursos_{uf}"
 
-# --- Estrutura Principal da Aplicação ---
+            if df_consulta.empty:
+                st.write("Nenhum curso técnico cadastrado para esta abrangência na base de dados.")
+            else:
+                show_consulta_cursos(df_consulta, chave_widgets, colunas)
+
+
+def bases_em_cache():
+    """Reúne os DataFrames mantidos em cache pelos carregadores, para o relatório de memória."""
+    df_economic, _ = carregar_base('economico')
+    df_courses, _ = carregar_base('cursos')
+    resumo_alinhamento, matrizes = carregar_base('alinhamento')
+    bases = {
+        'vulnerabilidade': carregar_base('vulnerabilidade'),
+        'economico': df_economic,
+        'cursos': df_courses,
+        'alinhamento (resumo)': resumo_alinhamento,
+    }
+    bases.update({f'alinhamento ({nome})': matriz for nome, matriz in matrizes.items()})
+    return bases
+
+def show_memoria():
+    """Exibe a memória ocupada por cada base em cache, com o detalhe por coluna."""
+    st.subheader("Memória das bases em cache")
+    bases = bases_em_cache()
+    st.dataframe(relatorio_memoria(bases), use_container_width=True, hide_index=True)
+    for nome, df in bases.items():
+        with st.expander(f"Colunas: {nome}"):
+            st.dataframe(memoria_por_coluna(df), use_container_width=True, hide_index=True)
+
+def show_diagnostico():
+    """Exibe as medições de desempenho acumuladas pelo processo do dashboard (todas as sessões)."""
+    st.header("Diagnóstico de Desempenho")
+    show_memoria()
+
+    st.subheader("Arquivos de origem monitorados")
+    st.dataframe(MONITOR.situacao(), use_container_width=True, hide_index=True)
+
+    st.markdown("Tempos acumulados desde o início do servidor, somando todas as sessões. "
+                "Carregadores aparecem separados em **hit** (resultado em cache) e **miss** "
+                "(função executada); fases aparecem divididas por etapa de renderização.")
+
+    resumo = REGISTRO.resumo()
+    if resumo.empty:
+        st.info("Nenhuma medição registrada ainda. Navegue pelas fases para gerar dados.")
+        return
+
+    carregadores = resumo[resumo['categoria'] == 'carregador']
+    if not carregadores.empty:
+        st.subheader("Carregadores em cache")
+        taxa_hit = carregadores.pivot_table(index='nome', columns='etapa', values='chamadas',
+                                            aggfunc='sum', fill_value=0)
+        taxa_hit['taxa_hit'] = taxa_hit.get('hit', 0) / taxa_hit.sum(axis=1)
+        st.dataframe(taxa_hit, use_container_width=True)
+
+    st.subheader("Todas as métricas")
+    st.dataframe(resumo, use_container_width=True)
 
-# Aplicar o estilo visual
-apply_custom_css()
-######
+    col1, col2, col3 = st.columns(3)
+    col1.download_button("Exportar CSV", exportar_csv(resumo), "diagnostico_desempenho.csv", "text/csv")
+    col2.download_button("Exportar JSON", exportar_json(resumo), "diagnostico_desempenho.json", "application/json")
+    if col3.button("Zerar medições"):
+        REGISTRO.limpar()
+        st.rerun()
 
-df_vulnerability = load_vulnerability_data()
-df_courses = load_courses_data()
+# --- Registro de Bases de Dados e Fases ---
+# Cada base é carregada apenas quando a fase selecionada precisa dela. Assim, abrir a
+# Introdução não depende do tamanho dos arquivos, e as bases pesadas da Fase 4 (RAIS e
+# cursos) só são lidas quando essa fase é aberta.
 
-# --- INÍCIO DA MODIFICAÇÃO ---
-# ATENÇÃO: Crie uma pasta 'dados' ao lado do seu script e coloque o arquivo da RAIS nela.
-# O nome do arquivo deve ser 'rais_dados_economicos.xlsx' ou você deve alterar o nome abaixo.
 rais_file_path = 'tabelas-rais-2024-parcial.xlsx'
-df_economic = load_rais_economic_data(rais_file_path)
+courses_file_path = 'cursos_encontrados.csv'
+
+# Para cada base: carregador, argumentos e arquivos de origem monitorados.
+FONTES = {
+    'vulnerabilidade': (load_vulnerability_data, [], [ARQUIVO_IVE, ARQUIVO_ATUACAO_IA]),
+    'economico': (load_rais_economic_data, [rais_file_path], [rais_file_path]),
+    'cursos': (load_courses_data, [], [courses_file_path]),
+    'alinhamento': (load_alignment_data, [rais_file_path], [rais_file_path, courses_file_path]),
+    'proximidade': (load_courses_spatial_index, [], [courses_file_path, ARQUIVO_ATUACAO_IA, MALHA_CENTROIDES]),
+}
+
+def carregar_base(nome, assinatura=None):
+    """Chama o carregador da base com a assinatura em uso (ou com a assinatura dada)."""
+    carregador, args, _ = FONTES[nome]
+    if assinatura is None:
+        assinatura = MONITOR.assinatura(nome)
+    return carregador(*args, assinatura)
+
+def reconstruir_base(nome, assinatura):
+    """
+    Carrega, em segundo plano, a nova versão de uma base cujos arquivos mudaram.
+
+    Os carregadores devolvem uma base vazia quando a leitura falha; nesse caso a troca
+    é recusada e a versão anterior continua em uso.
+    """
+    resultado = carregar_base(nome, assinatura)
+    df = resultado[0] if isinstance(resultado, tuple) else resultado
+    if df.empty:
+        raise ValueError(f"a nova versão de '{nome}' está vazia")
+
+for nome_base, (_, _, arquivos) in FONTES.items():
+    MONITOR.registrar(nome_base, arquivos, functools.partial(reconstruir_base, nome_base))
+
+DATASETS = {
+    'vulnerabilidade': lambda: filtrar_abrangencia(carregar_base('vulnerabilidade')),
+    'economico': lambda: carregar_base('economico'),
+    'cursos': lambda: carregar_base('cursos'),
+    'alinhamento': lambda: carregar_base('alinhamento'),
+}
+
+FASES = {
+    "Introdução": (show_introduction, []),
+    "Fase 1: Análise Geoespacial e de Indicadores": (show_fase1, ['vulnerabilidade']),
+    "Fase 2: Segmentação por Perfis de Analfabetismo": (show_fase2, ['vulnerabilidade']),
+    "Fase 3: Análise de Maturidade Institucional": (show_fase3, ['vulnerabilidade']),
+    "Fase 4: Alinhamento Estratégico de Cursos": (show_fase4, ['vulnerabilidade', 'economico', 'cursos', 'alinhamento']),
+}
+
+# A página de diagnóstico só aparece quando o dashboard é aberto com ?diagnostico=1.
+if st.query_params.get("diagnostico") == "1":
+    FASES["Diagnóstico de Desempenho"] = (show_diagnostico, [])
+
+def get_dataset(nome):
+    """Carrega, sob demanda, uma das bases registradas em DATASETS."""
+    return DATASETS[nome]()
+
+def render_fase(selecao):
+    """
+    Carrega apenas as bases necessárias à fase selecionada e exibe a página.
 
+    O tempo de carregamento e o de renderização são registrados na instrumentação
+    (ver instrumentacao.py), sob o nome da função da fase.
+    """
+    show_page, datasets = FASES[selecao]
+    with medir_fase(show_page.__name__):
+        args = []
+        if datasets:
+            with medir_etapa('carregamento'), st.spinner("Carregando dados..."):
+                args = [get_dataset(nome) for nome in datasets]
+        show_page(*args)
+
+# --- Estrutura Principal da Aplicação ---
+
+# Aplicar o estilo visual
+apply_custom_css()
 
-#######
 # Configuração da Barra Lateral (Sidebar)
 with st.sidebar:
     try:
@@ -483,24 +893,14 @@ with st.sidebar:
     
     selecao = st.radio(
         "Navegar pelas fases da análise:",
-        [
-            "Introdução",
-            "Fase 1: Análise Geoespacial e de Indicadores",
-            "Fase 2: Segmentação por Perfis de Analfabetismo",
-            "Fase 3: Análise de Maturidade Institucional",
-            "Fase 4: Alinhamento Estratégico de Cursos"
-        ],
+        list(FASES),
         key="navigation"
     )
 
+    st.markdown("---")
+    abrangencia = st.radio("Abrangência dos municípios:", ABRANGENCIAS, key="abrangencia")
+    if abrangencia == "Por estado":
+        st.selectbox("Estado:", sorted(UFS), index=sorted(UFS).index("PB"), key="abrangencia_uf")
+
 # Lógica para exibir a página selecionada
-if selecao == "Introdução":
-    show_introduction()
-elif selecao == "Fase 1: Análise Geoespacial e de Indicadores":
-    show_fase1(df_vulnerability)
-elif selecao == "Fase 2: Segmentação por Perfis de Analfabetismo":
-    show_fase2(df_vulnerability)
-elif selecao == "Fase 3: Análise de Maturidade Institucional":
-    show_fase3(df_vulnerability)
-elif selecao == "Fase 4: Alinhamento Estratégico de Cursos":
-    show_fase4(df_vulnerability, df_economic, df_courses)
+render_fase(selecao)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+from os import path
+
+import pandas as pd
+
+from nomes_municipios import SIGLAS_UF, canonicalizar_nomes
+from snapshot_cache import carregar_snapshot
+
+# --- Visão Geral do Módulo ---
+# Tabela de referência territorial (municípios da Divisão Territorial Brasileira do
+# IBGE), construída uma única vez a partir do RELATORIO_DTB_BRASIL_*_MUNICIPIOS.xls e
+# guardada em snapshot Parquet (ver snapshot_cache.py). Os scripts carregam a tabela
+# pronta, com códigos inteiros, UF e região como categorias e a chave canônica do nome
+# já calculada, em vez de reabrir a planilha com o xlrd a cada execução.
+
+ARQUIVO_DTB = path.join('data', 'DTB', '2024', 'RELATORIO_DTB_BRASIL_2024_MUNICIPIOS.xls')
+
+# Incrementar quando as colunas da tabela mudarem, para invalidar snapshots antigos.
+VERSAO_DTB = 1
+
+
+def _ler_dtb_excel(file_path):
+    """
+    Objetivo: Ler as colunas de interesse da planilha da DTB.
+
+    Detalhes:
+    - Pula as primeiras linhas para ignorar o cabeçalho complexo e seleciona as colunas
+      pelas posições 0, 1, 5, 7 e 8 ('id_uf', 'ds_uf', 'ds_rgi', 'id_mundv', 'ds_mun').
+    - O leitor xlrd só abre o formato .xls; a DTB exportada como .xlsx é lida pelo
+      leitor padrão do pandas.
+    """
+    data = pd.read_excel(file_path, skiprows=6,
+                         usecols=[0, 1, 5, 7, 8],
+                         engine='xlrd' if str(file_path).lower().endswith('.xls') else None)
+    data.columns = ['id_uf', 'ds_uf', 'ds_rgi', 'id_mundv', 'ds_mun']
+    return data
+
+
+def _construir_tabela_dtb(file_path):
+    """
+    Objetivo: Montar a tabela territorial compacta a partir da planilha da DTB.
+
+    Detalhes:
+    - Remove linhas sem código e duplicatas, garantindo um registro por município.
+    - Códigos como inteiros (id_uf int8; id_mundv e codigo6 int32), sigla, nome da UF e
+      região geográfica imediata como categorias.
+    - 'codigo6' é o código de 6 dígitos usado pela RAIS e pelo CAGED; 'chave_nome' é a
+      chave canônica do nome (ver nomes_municipios.canonicalizar_nomes).
+    """
+    data = _ler_dtb_excel(file_path)
+    data['id_mundv'] = pd.to_numeric(data['id_mundv'], errors='coerce')
+    data = data.dropna(subset=['id_mundv']).drop_duplicates(subset=['id_mundv'])
+
+    id_uf = pd.to_numeric(data['id_uf'], errors='coerce').astype('int8')
+    id_mundv = data['id_mundv'].astype('int32')
+    ds_mun = data['ds_mun'].astype(str).str.strip()
+    tabela = pd.DataFrame({
+        'id_uf': id_uf,
+        'sg_uf': id_uf.map(SIGLAS_UF).astype('category'),
+        'ds_uf': data['ds_uf'].astype(str).str.strip().astype('category'),
+        'ds_rgi': data['ds_rgi'].astype(str).str.strip().astype('category'),
+        'id_mundv': id_mundv,
+        'codigo6': (id_mundv // 10).astype('int32'),
+        'ds_mun': ds_mun,
+        'chave_nome': canonicalizar_nomes(ds_mun),
+    })
+    return tabela.sort_values('id_mundv').reset_index(drop=True)
+
+
+def carregar_dtb(file_path=ARQUIVO_DTB):
+    """
+    Objetivo: Carregar a tabela territorial dos municípios (DTB do IBGE).
+
+    Detalhes:
+    - A planilha só é lida na primeira vez e quando o arquivo muda; nas demais, a tabela
+      vem do snapshot em disco.
+    - Colunas: 'id_uf', 'sg_uf', 'ds_uf', 'ds_rgi', 'id_mundv', 'codigo6', 'ds_mun' e
+      'chave_nome'. Pode ser passada diretamente como `referencia` para
+      nomes_municipios.resolver_codigos, que aproveita a chave já calculada.
+    """
+    return carregar_snapshot(file_path, 'dtb', _construir_tabela_dtb, versao=VERSAO_DTB)
@@ -1,63 +1,28 @@
 # -*- coding: utf-8 -*-
 
 import pandas as pd
-from os import path
-from pandas import read_excel
 import matplotlib.pyplot as plt
 import numpy as np
 
+from dtb import carregar_dtb
+from nomes_municipios import resolver_codigos
+
 # --- Seção de Funções de Apoio ---
 # Esta seção contém funções para carregar e padronizar os dados de diferentes fontes,
 # preparando-os para a análise principal.
 
 def getdtb(file: str):
     """
-    Objetivo: Ler e preparar o arquivo da Divisão Territorial Brasileira (DTB) do IBGE.
+    Objetivo: Carregar a Divisão Territorial Brasileira (DTB) do IBGE.
 
     Detalhes:
-    - Esta função lê o arquivo Excel do IBGE, pulando as primeiras linhas para ignorar
-      o cabeçalho complexo, e seleciona colunas específicas usando seus índices.
-    - As colunas de interesse são: 'id_uf', 'ds_uf', 'ds_rgi', 'id_mundv' e 'ds_mun'.
-    - Remove duplicatas com base no ID do município para garantir que cada um tenha
-      um único registro.
-    """
-    # As colunas de interesse estão nas posições 0, 1, 5, 7 e 8,
-    # conforme a estrutura do arquivo.
-    data = read_excel(file, skiprows=6,
-                      usecols=[0, 1, 5, 7, 8],
-                      engine='xlrd')
-    
-    # Renomeia as colunas para facilitar a manipulação.
-    data.columns = ['id_uf', 'ds_uf', 'ds_rgi',
-                    'id_mundv', 'ds_mun']
-    
-    # Remove duplicatas para garantir a unicidade dos municípios.
-    data = data.drop_duplicates(subset=['id_mundv'])
-    return data
-
-
-def formatar_nome_para_merge(df, coluna, novo_nome="ds_formatada"):
+    - A planilha é lida uma única vez e guardada como tabela de referência compacta
+      (ver dtb.py); as execuções seguintes carregam o snapshot em milissegundos.
+    - As colunas de interesse são: 'id_uf', 'ds_uf', 'ds_rgi', 'id_mundv' e 'ds_mun',
+      com um único registro por município, além de 'sg_uf', 'codigo6' e 'chave_nome'.
     """
-    Objetivo: Padronizar os nomes dos municípios para permitir uma junção (merge) precisa
-    entre diferentes bases de dados.
+    return carregar_dtb(file)
 
-    Detalhes:
-    - Converte os nomes para maiúsculas.
-    - Remove caracteres especiais, acentos, espaços extras e termos indesejados.
-    - Aplica um tratamento específico para nomes compostos como "Rio de Janeiro".
-    """
-    df[novo_nome] = (df[coluna].str.upper()
-                               .str.replace("[-.!?'`()*]", "", regex=True)
-                               .str.replace("MIXING CENTER", "", regex=False)
-                               .str.strip())
-    
-    # Tratamento especial para o caso do Rio de Janeiro.
-    df[novo_nome] = df[novo_nome].str.replace("RIO DE JANEIRO", "RIODEJANEIRO", regex=False)
-    
-    # Remove espaços em todos os nomes após o tratamento de "Rio de Janeiro".
-    df[novo_nome] = df[novo_nome].str.replace(" ", "", regex=False)
-    
-    return df
 
 def padronizar_cidades_ia(df_ia, df_dtb):
     """
@@ -65,26 +30,19 @@ def padronizar_cidades_ia(df_ia, df_dtb):
     códigos do IBGE.
 
     Detalhes:
-    - Mapeia as siglas de estados (UF) para os nomes completos.
-    - Padroniza os nomes das cidades em ambos os DataFrames.
-    - Realiza uma junção do tipo `left` entre o DataFrame de IA e o do IBGE.
+    - Resolve cada par (cidade, UF) do IA para o código do município (id_mundv) com
+      base na DTB, aceitando a UF como sigla ou nome.
+    - Realiza uma junção do tipo `left` pelo código do município com a base do IBGE.
     - Retorna dois DataFrames: um com os municípios que foram encontrados no IBGE
       e outro com aqueles que não foram, o que é útil para a validação.
     """
-    # Mapear UF para o nome do estado.
-    uf_mapping = {"PB": "Paraíba", "PE": "Pernambuco",
-                  "MG": "Minas Gerais", "SP": "São Paulo",
-                  "RJ": "Rio de Janeiro"}
-    df_ia['ds_uf'] = df_ia['sg_uf'].map(uf_mapping)
-
-    # Formata os nomes das cidades em ambos os dataframes para o merge.
-    df_ia = formatar_nome_para_merge(df_ia.copy(), "ds_mun", "ds_mun_formatada")
-    df_dtb_formatado = formatar_nome_para_merge(df_dtb.copy(), "ds_mun", "ds_mun_formatada")
+    df_ia = df_ia.copy()
+    df_ia['id_mundv'] = resolver_codigos(df_ia['ds_mun'], df_ia['sg_uf'], df_dtb, coluna_uf='id_uf')
     
     # Realiza o merge com o DataFrame do IBGE.
-    df_combinado = df_ia.merge(df_dtb_formatado[['ds_mun_formatada', 'ds_uf', 'ds_mun', 'id_mundv']],
+    df_combinado = df_ia.merge(df_dtb[['id_mundv', 'ds_uf', 'ds_mun']],
                                how="left",
-                               on=['ds_mun_formatada', 'ds_uf'],
+                               on='id_mundv',
                                suffixes=["_ia", "_ibge"],
                                indicator=True)
     
@@ -99,7 +57,7 @@ def padronizar_cidades_ia(df_ia, df_dtb):
     
     return df_combinado, nao_encontrados
 
-def get_ideb_data(file_path):
+def get_ideb_data(file_path, df_dtb):
     """
     Objetivo: Carregar e preparar os dados do IDEB.
 
@@ -108,7 +66,7 @@ def get_ideb_data(file_path):
     - Seleciona as colunas de interesse por índice: UF, Município, Rede, IDEB 2021 e IDEB 2023.
     - Renomeia as colunas para nomes mais significativos.
     - Converte as notas do IDEB para o tipo numérico, substituindo valores não numéricos por NaN.
-    - Aplica a função de padronização de nomes de cidade.
+    - Resolve cada município para o código do IBGE (id_mundv) a partir da DTB.
     """
     # Define as colunas a serem lidas usando seus índices (baseado em 0).
     cols_to_read = [0, 2, 3, 16, 17]
@@ -123,188 +81,163 @@ def get_ideb_data(file_path):
     df_ideb['ideb_2021'] = pd.to_numeric(df_ideb['ideb_2021'], errors='coerce')
     df_ideb['ideb_2023'] = pd.to_numeric(df_ideb['ideb_2023'], errors='coerce')
     
-    # Chama a função de formatação para tratar o nome do município.
-    df_ideb = formatar_nome_para_merge(df_ideb, 'ds_municipio', 'ds_mun_formatada')
+    # Resolve o código do município, usado como chave de junção com a base do IA.
+    df_ideb['id_mundv'] = resolver_codigos(df_ideb['ds_municipio'], df_ideb['sg_uf'], df_dtb, coluna_uf='id_uf')
 
     return df_ideb
 
-# --- INÍCIO DO SCRIPT PRINCIPAL ---
-
-# 1. Leitura e Preparação das Bases de Dados
-print("Iniciando a leitura e preparação das bases de dados.")
-
-# Carrega a base de Divisão Territorial Brasileira (DTB) do IBGE.
-data_dir = 'data'
-file = path.join(data_dir, "DTB/2024/RELATORIO_DTB_BRASIL_2024_MUNICIPIOS.xls")
-df_dtb = getdtb(file)
-print("DataFrame do IBGE lido e pronto.")
-
-# Carrega a base de dados do IDEB.
-ideb_file_path = "data/IDEB/divulgacao_ensino_medio_municipios_2023.xlsx"
-df_ideb = get_ideb_data(ideb_file_path)
-print("DataFrame do IDEB lido e preparado.")
-
-# Dicionários para armazenar os resultados do processamento por ano.
-dataframes_combinados_por_ano = {}
-cidades_nao_encontradas_por_ano = {}
-
-# Carrega o arquivo principal de projetos do IA.
-file_path = "data/Projetos_de_Atuac807a771o_-_IA_-_2020_a_2025 (1).xlsx"
-
-# 2. Processamento Anual e Junção dos Dados do IA com o IBGE
-# Este laço itera sobre cada ano para processar as planilhas de projetos do IA.
-for ano in range(2020, 2026):
-    try:
-        df_ano = pd.read_excel(file_path, sheet_name=str(ano), skiprows=5)
-    except ValueError as e:
-        print(f"\nErro ao ler a planilha do ano {ano}: {e}")
-        continue
-
-    # Identifica as últimas 3 colunas de interesse de forma dinâmica.
-    ultimas_3 = list(df_ano.columns[-3:])
-
-    # Renomeia colunas para manter a consistência, tratando diferentes nomes de cabeçalho.
-    if "UF" in df_ano.columns:
-        df_ano.rename(columns={"UF": "sg_uf", "CIDADES": "ds_mun"}, inplace=True)
-    elif "ESTADO" in df_ano.columns:
-        df_ano.rename(columns={"ESTADO": "sg_uf", "CIDADES": "ds_mun"}, inplace=True)
-    else:
-        print(f"\nNem 'UF' nem 'ESTADO' encontrado no ano {ano}. Ignorando este ano.")
-        continue
-
-    # Limpa os dados de observação.
-    df_ano = df_ano[~df_ano['ds_mun'].str.contains('Obs.:', na=False)]
-    
-    # Seleciona as colunas relevantes.
-    df_ano = df_ano[df_ano.columns.intersection(["ds_mun", "sg_uf"] + ultimas_3)]
-    df_ano.columns = ["ds_mun", "sg_uf", "nprojetos", "ninstituicoes", "nbeneficiados"]
-
-    # Agrupa os dados por município e estado, somando os valores.
-    df_ano = df_ano.groupby(["ds_mun", "sg_uf"], as_index=False).sum(numeric_only=True)
-    df_ano['ano'] = ano
-
-    # Realiza a padronização e junção com a base do IBGE.
-    df_combinado, df_nao_encontrados = padronizar_cidades_ia(df_ano, df_dtb)
-    
-    # Armazena os DataFrames resultantes.
-    dataframes_combinados_por_ano[ano] = df_combinado
-    cidades_nao_encontradas_por_ano[ano] = df_nao_encontrados
-    
-    print(f"\nDataFrame combinado do ano {ano} criado com sucesso.")
-    if not df_nao_encontrados.empty:
-        print(f"ATENÇÃO: {len(df_nao_encontrados)} cidades não foram encontradas no IBGE para este ano.")
-    print("-" * 30)
-
-# Unir todos os dataframes de IA de anos diferentes em um só.
-df_ia_completo = pd.concat(dataframes_combinados_por_ano.values(), ignore_index=True)
+# Séries do gráfico "Média do IDEB por Município e Rede": pares (rede, ano), na ordem
+# das barras de cada município.
+REDE_ANO_PARES = [
+    ('Estadual', '2021'), ('Estadual', '2023'),
+    ('Federal', '2021'), ('Federal', '2023'),
+    ('Municipal', '2021'), ('Municipal', '2023'),
+]
 
-# 3. Análise Exploratória e Visualização dos Dados
+# Municípios por figura; bases maiores são divididas em páginas.
+MUNICIPIOS_POR_PAGINA = 40
 
-# --- Gráfico 1: Evolução Anual dos Projetos do IA ---
-# Agrupa os dados por ano e soma os valores para a visualização de tendências.
-df_evolucao = df_ia_completo.groupby('ano').sum(numeric_only=True)
 
-fig, ax1 = plt.subplots(figsize=(12, 8))
+def montar_matriz_ideb(df_final, coluna_municipio='ds_mun_ia'):
+    """
+    Objetivo: Organizar as notas do IDEB em uma matriz município × (rede, ano).
 
-# Plota o número de projetos e instituições no eixo Y1.
-ax1.set_xlabel('Ano')
-ax1.set_ylabel('Nº de Projetos e Instituições', color='blue')
-ax1.plot(df_evolucao.index, df_evolucao['nprojetos'], 'bo-', label='Nº de Projetos')
-ax1.plot(df_evolucao.index, df_evolucao['ninstituicoes'], 'b^--', label='Nº de Instituições')
-ax1.tick_params(axis='y', labelcolor='blue')
-ax1.legend(loc='upper left')
+    Detalhes:
+    - Cada município aparece uma única vez, em ordem alfabética (a mesma do groupby).
+    - Quando a base final repete o município (um registro por ano de atuação do IA),
+      vale a primeira linha de cada rede.
+    - Redes ou anos sem nota ficam como NaN; municípios sem nenhuma rede também entram,
+      com a linha inteira vazia.
+    """
+    redes = [rede for rede, _ in REDE_ANO_PARES]
+    primeiras = (df_final[df_final['rede'].isin(redes)]
+                 .drop_duplicates(subset=[coluna_municipio, 'rede']))
+    largas = primeiras.pivot(index=coluna_municipio, columns='rede', values=['ideb_2021', 'ideb_2023'])
+    largas.columns = pd.MultiIndex.from_tuples(
+        [(rede, coluna.split('_')[1]) for coluna, rede in largas.columns], names=['rede', 'ano'])
 
-# Cria um segundo eixo Y para o número de beneficiados, permitindo
-# a visualização em uma escala diferente.
-ax2 = ax1.twinx()
-ax2.set_ylabel('Nº de Beneficiados', color='red')
-ax2.plot(df_evolucao.index, df_evolucao['nbeneficiados'], 'rD-', label='Nº de Beneficiados')
-ax2.tick_params(axis='y', labelcolor='red')
-ax2.legend(loc='upper right')
+    municipios = pd.Index(sorted(df_final[coluna_municipio].dropna().unique()), name=coluna_municipio)
+    return largas.reindex(index=municipios, columns=pd.MultiIndex.from_tuples(REDE_ANO_PARES, names=['rede', 'ano']))
 
-ax1.set_title('Evolução Anual dos Projetos do IA (2020-2025)', fontweight='bold')
-ax1.set_xticks(df_evolucao.index)
-ax1.grid(True)
-fig.tight_layout()
-plt.show()
 
-# --- Junção Final com a Base do IDEB ---
-# Prepara a base de dados consolidada para a análise final com o IDEB.
+def desenhar_ideb_por_municipio(matriz, ax, bar_width=0.12, espaco=0.3):
+    """
+    Objetivo: Desenhar as barras agrupadas do IDEB por município em um eixo do matplotlib.
 
-# Padroniza a coluna 'ds_mun_ia' para o merge com a base do IDEB.
-df_ia_completo = formatar_nome_para_merge(df_ia_completo, 'ds_mun_ia', 'ds_mun_ia_formatada')
+    Detalhes:
+    - Uma única chamada de `ax.bar` por série (rede, ano), com as posições de todos os
+      municípios calculadas de uma vez; valores ausentes não geram barra.
+    - Séries sem nenhum valor ficam de fora da legenda.
+    """
+    largura_grupo = len(REDE_ANO_PARES) * bar_width + espaco
+    base = np.arange(len(matriz)) * largura_grupo
 
-# Realiza a junção entre a base de IA e a base do IDEB, usando os nomes formatados e o estado como chaves.
-df_final = pd.merge(df_ia_completo, df_ideb,
-                     left_on=['ds_mun_ia_formatada', 'sg_uf'], 
-                     right_on=['ds_mun_formatada', 'sg_uf'],
-                     how='left', suffixes=('_ia', '_ideb'))
+    for i, (rede, ano) in enumerate(REDE_ANO_PARES):
+        valores = matriz[(rede, ano)].to_numpy(dtype=float)
+        presentes = ~np.isnan(valores)
+        if presentes.any():
+            ax.bar(base[presentes] + i * bar_width, valores[presentes], width=bar_width,
+                   color=f'C{i}', label=f'IDEB {ano} ({rede})')
 
-# Exibe informações sobre o DataFrame final.
-print("\nDataFrame final com dados do IDEB e IA:")
-print(df_final.head())
-print(f"Número de municípios na base final: {df_final['ds_mun_ia'].nunique()}")
-print(f"Total de registros na base final: {len(df_final)}")
-print("-" * 30)
+    # Rótulos e formatação do gráfico.
+    ax.set_xlabel('Municípios', fontweight='bold')
+    ax.set_ylabel('IDEB', fontweight='bold')
 
-# --- Gráfico 2: Média do IDEB por Município e Rede de Ensino ---
-# Visualiza as notas do IDEB de 2021 e 2023 por município,
-# segregadas por rede de ensino (Estadual, Federal, Municipal).
+    # Configura os rótulos do eixo X para os municípios.
+    ax.set_xticks(base + (len(REDE_ANO_PARES) * bar_width) / 2)
+    ax.set_xticklabels(matriz.index, rotation=90)
+    ax.legend()
 
-df_grouped = df_final.groupby('ds_mun_ia')
 
-fig, ax = plt.subplots(figsize=(20, 10))
+def figuras_ideb_por_municipio(matriz, municipios_por_pagina=MUNICIPIOS_POR_PAGINA, figsize=(20, 10)):
+    """
+    Objetivo: Gerar as figuras do gráfico de IDEB por município, paginadas.
 
-bar_width = 0.12
-base_pos = 0
-plotted_labels = set()
+    Detalhes:
+    - Cada figura mostra até `municipios_por_pagina` municípios, mantendo a ordem da
+      matriz; com uma única página, o título é o mesmo do gráfico original.
+    - Retorna um gerador de figuras, de modo que cada página pode ser exibida ou salva
+      (fig.savefig) e fechada antes de a próxima ser desenhada.
+    """
+    paginas = max(1, -(-len(matriz) // municipios_por_pagina))
+    titulo = 'Média do IDEB 2021 e 2023 por Município e Rede de Ensino'
+    for pagina in range(paginas):
+        trecho = matriz.iloc[pagina * municipios_por_pagina:(pagina + 1) * municipios_por_pagina]
+        fig, ax = plt.subplots(figsize=figsize)
+        desenhar_ideb_por_municipio(trecho, ax)
+        ax.set_title(titulo if paginas == 1 else f"{titulo} (página {pagina + 1} de {paginas})",
+                     fontweight='bold')
+        fig.tight_layout()
+        yield fig
 
-# Define os pares de rede de ensino e ano para plotagem.
-rede_ano_pairs = [
-    ('Estadual', '2021'), ('Estadual', '2023'),
-    ('Federal', '2021'), ('Federal', '2023'),
-    ('Municipal', '2021'), ('Municipal', '2023'),
-]
+# --- INÍCIO DO SCRIPT PRINCIPAL ---
 
-# Define os rótulos de legenda para o gráfico.
-legend_labels = {
-    ('Estadual', '2021'): 'IDEB 2021 (Estadual)',
-    ('Estadual', '2023'): 'IDEB 2023 (Estadual)',
-    ('Federal', '2021'): 'IDEB 2021 (Federal)',
-    ('Federal', '2023'): 'IDEB 2023 (Federal)',
-    ('Municipal', '2021'): 'IDEB 2021 (Municipal)',
-    ('Municipal', '2023'): 'IDEB 2023 (Municipal)'
-}
-
-# Itera sobre cada grupo de município para criar as barras.
-for mun_name, group_df in df_grouped:
-    for i, (rede, ano) in enumerate(rede_ano_pairs):
-        rede_data = group_df[group_df['rede'] == rede]
-
-        if not rede_data.empty:
-            ideb_val = rede_data[f'ideb_{ano}'].iloc[0]
-            if pd.notna(ideb_val):
-                pos = base_pos + i * bar_width
-                label = legend_labels[(rede, ano)] if (rede, ano) not in plotted_labels else ""
-                color_idx = i
-                ax.bar(pos, ideb_val, width=bar_width, color=f'C{color_idx}', label=label)
-                plotted_labels.add((rede, ano))
-
-    base_pos += len(rede_ano_pairs) * bar_width + 0.3
-
-# Rótulos e formatação do gráfico.
-ax.set_xlabel('Municípios', fontweight='bold')
-ax.set_ylabel('IDEB', fontweight='bold')
-ax.set_title('Média do IDEB 2021 e 2023 por Município e Rede de Ensino', fontweight='bold')
-
-# Configura os rótulos do eixo X para os municípios.
-tick_positions = [
-    i * (len(rede_ano_pairs) * bar_width + 0.3) + (len(rede_ano_pairs) * bar_width) / 2
-    for i in range(len(df_grouped))
-]
-ax.set_xticks(tick_positions)
-ax.set_xticklabels(df_grouped.groups.keys(), rotation=90)
+if __name__ == "__main__":
+
+    # 1. Leitura, Preparação e Junção das Bases de Dados
+    # As etapas (DTB, IDEB, projetos do IA de 2020 a 2025, vínculo de cada cidade do IA ao
+    # código do IBGE e junção com o IDEB) são executadas pelo pipeline incremental (ver
+    # pipeline.py): só rodam de novo as etapas afetadas por mudanças nos arquivos de
+    # origem ou no código. Os caminhos dos arquivos ficam em pipeline.CONFIGURACAO.
+    from pipeline import executar
+
+    print("Iniciando a leitura e preparação das bases de dados.")
+    resultados, _ = executar(['ia_municipios', 'evolucao_ia', 'ia_ideb', 'matriz_ideb'])
+
+    # Cidades do IA que não foram encontradas no IBGE, por ano.
+    for ano, df_nao_encontrados in resultados['ia_municipios']['nao_encontrados'].items():
+        if not df_nao_encontrados.empty:
+            print(f"ATENÇÃO: {len(df_nao_encontrados)} cidades não foram encontradas no IBGE no ano {ano}.")
+
+    # 2. Análise Exploratória e Visualização dos Dados
+
+    # --- Gráfico 1: Evolução Anual dos Projetos do IA ---
+    # Dados somados por ano, para a visualização de tendências.
+    df_evolucao = resultados['evolucao_ia']
+
+    fig, ax1 = plt.subplots(figsize=(12, 8))
+
+    # Plota o número de projetos e instituições no eixo Y1.
+    ax1.set_xlabel('Ano')
+    ax1.set_ylabel('Nº de Projetos e Instituições', color='blue')
+    ax1.plot(df_evolucao.index, df_evolucao['nprojetos'], 'bo-', label='Nº de Projetos')
+    ax1.plot(df_evolucao.index, df_evolucao['ninstituicoes'], 'b^--', label='Nº de Instituições')
+    ax1.tick_params(axis='y', labelcolor='blue')
+    ax1.legend(loc='upper left')
+
+    # Cria um segundo eixo Y para o número de beneficiados, permitindo
+    # a visualização em uma escala diferente.
+    ax2 = ax1.twinx()
+    ax2.set_ylabel('Nº de Beneficiados', color='red')
+    ax2.plot(df_evolucao.index, df_evolucao['nbeneficiados'], 'rD-', label='Nº de Beneficiados')
+    ax2.tick_params(axis='y', labelcolor='red')
+    ax2.legend(loc='upper right')
+
+    ax1.set_title('Evolução Anual dos Projetos do IA (2020-2025)', fontweight='bold')
+    ax1.set_xticks(df_evolucao.index)
+    ax1.grid(True)
+    fig.tight_layout()
+    plt.show()
+
+    # --- Junção Final com a Base do IDEB ---
+    # Base consolidada do IA com o IDEB, pelo código do município.
+    df_final = resultados['ia_ideb']
+
+    # Exibe informações sobre o DataFrame final.
+    print("\nDataFrame final com dados do IDEB e IA:")
+    print(df_final.head())
+    print(f"Número de municípios na base final: {df_final['ds_mun_ia'].nunique()}")
+    print(f"Total de registros na base final: {len(df_final)}")
+    print("-" * 30)
 
-ax.legend()
-plt.tight_layout()
-plt.show()
\ No newline at end of file
+    # --- Gráfico 2: Média do IDEB por Município e Rede de Ensino ---
+    # Visualiza as notas do IDEB de 2021 e 2023 por município,
+    # segregadas por rede de ensino (Estadual, Federal, Municipal).
+    # As notas são organizadas uma única vez em uma matriz município × (rede, ano), e
+    # cada série é desenhada com uma só chamada de barras; com muitos municípios, o
+    # gráfico é dividido em páginas de MUNICIPIOS_POR_PAGINA municípios.
+    matriz_ideb = resultados['matriz_ideb']
+
+    for fig in figuras_ideb_por_municipio(matriz_ideb):
+        plt.show()
+        plt.close(fig)
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# --- Visão Geral do Módulo ---
+# Índice por município para as bases usadas no dashboard. Em vez de filtrar a base
+# inteira com uma máscara booleana a cada interação, a base é ordenada uma única vez
+# pela chave (município, UF) e cada chave passa a apontar para uma fatia contígua de
+# linhas, recuperada em tempo constante com `iloc`.
+
+
+def construir_indice(df, colunas_chave):
+    """
+    Objetivo: Ordenar a base pelas colunas de chave e mapear cada chave para a sua
+    fatia contígua de linhas.
+
+    Detalhes:
+    - Retorna o DataFrame ordenado (com índice 0..n-1) e um dicionário
+      {chave: (inicio, fim)}, em que a chave é uma tupla com os valores de
+      `colunas_chave` (ex.: ('ITATUBA', 'PB')).
+    - As fronteiras entre chaves são detectadas de forma vetorizada, comparando cada
+      linha com a anterior; o laço em Python percorre apenas as chaves distintas.
+    - A ordenação é estável, preservando a ordem original das linhas dentro de cada chave.
+    """
+    if df.empty or not set(colunas_chave).issubset(df.columns):
+        return df, {}
+
+    df_ordenado = df.sort_values(colunas_chave, kind='stable').reset_index(drop=True)
+    valores = [df_ordenado[col].to_numpy() for col in colunas_chave]
+
+    n_linhas = len(df_ordenado)
+    quebras = np.zeros(n_linhas, dtype=bool)
+    quebras[0] = True
+    for coluna in valores:
+        quebras[1:] |= coluna[1:] != coluna[:-1]
+
+    inicios = np.flatnonzero(quebras)
+    fins = np.append(inicios[1:], n_linhas)
+    chaves = zip(*(coluna[inicios] for coluna in valores))
+
+    indice = {chave: (inicio, fim) for chave, inicio, fim in zip(chaves, inicios.tolist(), fins.tolist())}
+    return df_ordenado, indice
+
+
+def fatia_municipio(df, indice, chave):
+    """
+    Objetivo: Recuperar as linhas de uma chave a partir do índice, sem varrer a base.
+
+    Detalhes:
+    - Retorna um DataFrame vazio (com as mesmas colunas) quando a chave não existe.
+    """
+    inicio, fim = indice.get(chave, (0, 0))
+    return df.iloc[inicio:fim]
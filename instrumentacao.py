@@ -0,0 +1,208 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from types import MappingProxyType
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+# --- Visão Geral do Módulo ---
+# Instrumentação sempre ativa do dashboard: tempo de cada chamada aos carregadores em
+# cache (separando acertos e faltas de cache) e tempo de renderização de cada fase,
+# dividido por etapa (montagem de figuras Plotly, montagem do mapa folium, serialização
+# para o navegador). As medições ficam em um registro único do processo do Streamlit,
+# compartilhado por todas as sessões, e podem ser exportadas em CSV ou JSON.
+#
+# Os carregadores guardam uma única instância de cada base por processo (cache de
+# recurso) e entregam a cada chamada uma visão somente leitura dela, sem cópia dos dados.
+
+# Quantidade de medições recentes guardadas por métrica, usadas nos percentis.
+AMOSTRAS_POR_METRICA = 500
+
+COLUNAS_RESUMO = ['categoria', 'nome', 'etapa', 'chamadas', 'total_s', 'media_s',
+                  'p50_s', 'p95_s', 'min_s', 'max_s', 'ultima_em']
+
+# As visões entregues pelos carregadores dependem do Copy-on-Write do pandas: uma escrita
+# em uma visão copia antes os dados afetados, sem alterar a base compartilhada. Ele está
+# sempre ativo a partir do pandas 3, a versão mínima exigida em requirements.txt.
+
+
+class RegistroMetricas:
+    """Acumula medições de tempo por (categoria, nome, etapa), de forma segura entre threads."""
+
+    def __init__(self, amostras=AMOSTRAS_POR_METRICA):
+        self._trava = threading.Lock()
+        self._amostras = amostras
+        self._metricas = {}
+
+    def registrar(self, categoria, nome, etapa, segundos):
+        with self._trava:
+            metrica = self._metricas.get((categoria, nome, etapa))
+            if metrica is None:
+                metrica = self._metricas[(categoria, nome, etapa)] = {
+                    'chamadas': 0, 'total_s': 0.0, 'min_s': float('inf'), 'max_s': 0.0,
+                    'recentes': deque(maxlen=self._amostras), 'ultima_em': None,
+                }
+            metrica['chamadas'] += 1
+            metrica['total_s'] += segundos
+            metrica['min_s'] = min(metrica['min_s'], segundos)
+            metrica['max_s'] = max(metrica['max_s'], segundos)
+            metrica['recentes'].append(segundos)
+            metrica['ultima_em'] = datetime.now().isoformat(timespec='seconds')
+
+    def limpar(self):
+        with self._trava:
+            self._metricas.clear()
+
+    def resumo(self):
+        """Devolve um DataFrame com uma linha por métrica (percentis sobre as medições recentes)."""
+        with self._trava:
+            itens = [(chave, dict(metrica, recentes=list(metrica['recentes'])))
+                     for chave, metrica in self._metricas.items()]
+
+        linhas = []
+        for (categoria, nome, etapa), metrica in itens:
+            p50, p95 = np.percentile(metrica['recentes'], [50, 95])
+            linhas.append({
+                'categoria': categoria, 'nome': nome, 'etapa': etapa,
+                'chamadas': metrica['chamadas'], 'total_s': metrica['total_s'],
+                'media_s': metrica['total_s'] / metrica['chamadas'], 'p50_s': p50, 'p95_s': p95,
+                'min_s': metrica['min_s'], 'max_s': metrica['max_s'], 'ultima_em': metrica['ultima_em'],
+            })
+        resumo = pd.DataFrame(linhas, columns=COLUNAS_RESUMO)
+        return resumo.sort_values(['categoria', 'nome', 'etapa'], ignore_index=True)
+
+
+# Registro único do processo: módulos importados sobrevivem aos reruns do script do
+# dashboard, de modo que as medições se acumulam entre sessões.
+REGISTRO = RegistroMetricas()
+
+# Estado por thread (cada sessão do Streamlit roda em sua própria thread).
+_estado = threading.local()
+
+
+def _execucoes():
+    return getattr(_estado, 'execucoes', 0)
+
+
+def _congelar(valor):
+    """Prepara o resultado de um carregador para ser compartilhado: dicionários viram somente leitura."""
+    if isinstance(valor, dict):
+        return MappingProxyType({chave: _congelar(item) for chave, item in valor.items()})
+    if isinstance(valor, tuple):
+        return tuple(_congelar(item) for item in valor)
+    return valor
+
+
+def visao_somente_leitura(valor):
+    """
+    Objetivo: Entregar uma visão da base compartilhada que não a altera quando modificada.
+
+    Detalhes:
+    - DataFrames e Series viram cópias rasas (`copy(deep=False)`): os dados não são
+      copiados, e, com o Copy-on-Write, escritas e colunas novas ficam só na visão.
+    - Dicionários chegam como MappingProxyType (somente leitura); os que guardam
+      DataFrames são remontados com visões deles. Tuplas são percorridas item a item.
+    - O custo depende do número de objetos e colunas, e não do número de linhas.
+    """
+    if isinstance(valor, (pd.DataFrame, pd.Series)):
+        return valor.copy(deep=False)
+    if isinstance(valor, tuple):
+        return tuple(visao_somente_leitura(item) for item in valor)
+    if isinstance(valor, MappingProxyType) and any(
+            isinstance(item, (pd.DataFrame, pd.Series)) for item in valor.values()):
+        return MappingProxyType({chave: visao_somente_leitura(item) for chave, item in valor.items()})
+    return valor
+
+
+def carregador_cacheado(**opcoes_cache):
+    """
+    Objetivo: Cachear os carregadores do dashboard uma única vez por processo, medindo
+    cada chamada.
+
+    Detalhes:
+    - Usa o st.cache_resource em vez do st.cache_data: o resultado não é serializado
+      nem copiado a cada chamada, e todas as sessões compartilham a mesma instância.
+      Cada chamada recebe uma visão somente leitura (ver `visao_somente_leitura`), de
+      modo que o custo de um acerto de cache não cresce com o tamanho da base.
+    - Aceita as mesmas opções do st.cache_resource (ex.: show_spinner=False, max_entries).
+    - Cada chamada é registrada como 'hit' (resultado veio do cache) ou 'miss' (a função
+      foi executada). A distinção usa um contador por thread, incrementado apenas quando
+      o corpo da função roda; chamadas aninhadas também são classificadas corretamente.
+    - A função devolvida mantém o método `clear` do cache.
+    """
+    def decorar(funcao):
+        @functools.wraps(funcao)
+        def executar(*args, **kwargs):
+            _estado.execucoes = _execucoes() + 1
+            return _congelar(funcao(*args, **kwargs))
+
+        cacheada = st.cache_resource(**opcoes_cache)(executar)
+
+        @functools.wraps(funcao)
+        def medir(*args, **kwargs):
+            antes = _execucoes()
+            inicio = time.perf_counter()
+            resultado = visao_somente_leitura(cacheada(*args, **kwargs))
+            segundos = time.perf_counter() - inicio
+            REGISTRO.registrar('carregador', funcao.__name__,
+                               'miss' if _execucoes() > antes else 'hit', segundos)
+            return resultado
+
+        medir.clear = cacheada.clear
+        return medir
+    return decorar
+
+
+@contextmanager
+def medir_fase(nome):
+    """
+    Mede a renderização de uma fase. As etapas medidas com `medir_etapa` dentro do bloco
+    são somadas e registradas uma vez por renderização, junto com o 'total' e o tempo
+    'outros' (texto, widgets e demais elementos não medidos individualmente).
+    """
+    anterior = getattr(_estado, 'fase', None)
+    etapas = {}
+    _estado.fase = (nome, etapas)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        total = time.perf_counter() - inicio
+        _estado.fase = anterior
+        for etapa, segundos in etapas.items():
+            REGISTRO.registrar('fase', nome, etapa, segundos)
+        REGISTRO.registrar('fase', nome, 'outros', max(total - sum(etapas.values()), 0.0))
+        REGISTRO.registrar('fase', nome, 'total', total)
+
+
+@contextmanager
+def medir_etapa(etapa):
+    """Mede uma etapa da fase em renderização (ex.: 'figura_plotly', 'serializacao_plotly')."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        fase = getattr(_estado, 'fase', None)
+        if fase is not None:
+            etapas = fase[1]
+            etapas[etapa] = etapas.get(etapa, 0.0) + time.perf_counter() - inicio
+
+
+def exportar_csv(resumo=None):
+    resumo = REGISTRO.resumo() if resumo is None else resumo
+    return resumo.to_csv(index=False).encode('utf-8')
+
+
+def exportar_json(resumo=None):
+    resumo = REGISTRO.resumo() if resumo is None else resumo
+    conteudo = {'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                'metricas': json.loads(resumo.to_json(orient='records'))}
+    return json.dumps(conteudo, ensure_ascii=False, indent=2).encode('utf-8')
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import KMeans
+from sklearn.preprocessing import StandardScaler
+
+from nomes_municipios import SIGLAS_UF, codigos_uf
+from snapshot_cache import carregar_snapshot
+
+# --- Visão Geral do Módulo ---
+# Cálculo do Índice de Vulnerabilidade Educacional (IVE) para todos os municípios da
+# planilha IVE_DADOS.xlsx. A fórmula é a mesma da Fase 1 do analise_educacional.py, agora
+# aplicada de uma vez a todo o país; o resultado é uma tabela compacta guardada em
+# snapshot (ver snapshot_cache.py), que o dashboard carrega sem reprocessar o Excel.
+# Para os municípios de atuação do IA, o perfil etário e a adesão à política cadastrados
+# em municipios_atuacao_ia.csv (os da análise original) prevalecem sobre os calculados.
+
+ARQUIVO_IVE = 'IVE_DADOS.xlsx'
+
+# Municípios de atuação do Instituto Alpargatas, com as coordenadas usadas no mapa.
+ARQUIVO_ATUACAO_IA = 'municipios_atuacao_ia.csv'
+
+COLUNAS_IVE = {
+    'MUNICÍPIO': 'municipio', 'UF': 'uf', 'CÓDIGO\nIBGE': 'codigo_ibge',
+    'ADESÃO AO PACTO\n(SIMEC) ': 'adesao_pacto',
+    'POPULAÇÃO TOTAL DO MUNICÍPIO +15 anos \n(CENSO IBGE 2022)': 'populacao_total_15_mais',
+    'POPULAÇÃO NÃO ALFABETIZADA (nº de pessoas)\n(CENSO IBGE 2022)': 'populacao_nao_alfabetizada',
+    'Nº de matrículas de EJA - Fundamental + Médio \n(incluindo particulares)\n(CENSO ESCOLAR 2024)': 'matriculas_eja',
+    '15 a 19 anos\n(% da população não alfabetizada)': 'nao_alf_15_19', '20 a 24 anos\n(% da população não alfabetizada)': 'nao_alf_20_24',
+    '25 a 34 anos\n(% da população não alfabetizada)': 'nao_alf_25_34', '35 a 44 anos\n(% da população não alfabetizada)': 'nao_alf_35_44',
+    '45 a 54 anos\n(% da população não alfabetizada)': 'nao_alf_45_54', '55 a 64 anos\n(% da população não alfabetizada)': 'nao_alf_55_64',
+    '65 anos ou mais\n(% da população não alfabetizada)': 'nao_alf_65_mais'
+}
+
+COLUNAS_NUMERICAS = ['populacao_total_15_mais', 'populacao_nao_alfabetizada', 'matriculas_eja']
+FAIXAS_ETARIAS = ['nao_alf_15_19', 'nao_alf_20_24', 'nao_alf_25_34', 'nao_alf_35_44',
+                  'nao_alf_45_54', 'nao_alf_55_64', 'nao_alf_65_mais']
+FAIXAS_ADULTOS = ['nao_alf_25_34', 'nao_alf_35_44', 'nao_alf_45_54']
+
+# Perfis exibidos na Fase 2 do dashboard, um por cluster do perfil etário.
+PERFIL_ADULTOS = 'Força de Trabalho (Adultos)'
+PERFIL_IDOSOS = 'Analfabetismo Estrutural (Idosos)'
+
+
+def calcular_ive(df):
+    """
+    Objetivo: Calcular o IVE e suas componentes para todas as linhas da base.
+
+    Detalhes:
+    - taxa_analfabetismo = população não alfabetizada / população com 15 anos ou mais.
+    - taxa_cobertura_eja = matrículas de EJA / população não alfabetizada (limitada a [0, 1]).
+    - ive = taxa_analfabetismo * (1 - taxa_cobertura_eja).
+    - Linhas sem algum dos dados numéricos são descartadas. Retorna uma cópia da base.
+    """
+    df = df.copy()
+    for col in COLUNAS_NUMERICAS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+    df = df.dropna(subset=COLUNAS_NUMERICAS)
+
+    epsilon = 1e-6
+    df['taxa_analfabetismo'] = df['populacao_nao_alfabetizada'] / (df['populacao_total_15_mais'] + epsilon)
+    df['taxa_cobertura_eja'] = (df['matriculas_eja'] / (df['populacao_nao_alfabetizada'] + epsilon)).clip(0, 1)
+    df['ive'] = df['taxa_analfabetismo'] * (1 - df['taxa_cobertura_eja'])
+    return df
+
+
+def classificar_perfil(df):
+    """
+    Objetivo: Classificar o perfil etário do analfabetismo de cada município por clusterização.
+
+    Detalhes:
+    - Mesmo método da Fase 2 do analise_educacional.py: as faixas etárias são
+      padronizadas (StandardScaler) e agrupadas com K-Means (random_state=42, n_init=10),
+      com um cluster para cada perfil exibido no dashboard (k=2).
+    - Como na Fase 2, cada cluster é nomeado pelo perfil médio: o de maior parcela de
+      25 a 54 anos é a "Força de Trabalho"; o outro, o "Analfabetismo Estrutural".
+    - Municípios sem alguma das faixas ficam sem perfil (NaN).
+    """
+    faixas = df[FAIXAS_ETARIAS].apply(pd.to_numeric, errors='coerce').dropna()
+    perfil = pd.Series(np.nan, index=df.index, dtype=object)
+    if len(faixas) < 2:
+        return perfil
+
+    modelo = KMeans(n_clusters=2, random_state=42, n_init=10).fit(StandardScaler().fit_transform(faixas))
+    medias = faixas.groupby(modelo.labels_).mean()
+    medias = medias.div(medias.sum(axis=1), axis=0)
+    cluster_adultos = medias[FAIXAS_ADULTOS].sum(axis=1).idxmax()
+    perfil.loc[faixas.index] = np.where(modelo.labels_ == cluster_adultos, PERFIL_ADULTOS, PERFIL_IDOSOS)
+    return perfil
+
+
+def _construir_tabela_ive(file_path):
+    """
+    Objetivo: Ler a planilha do IVE e montar a tabela nacional de indicadores.
+
+    Detalhes:
+    - Só as colunas usadas no cálculo são lidas do Excel.
+    - A UF vem por extenso na planilha ("Paraíba ") e é convertida para a sigla.
+    - A adesão ao pacto vem da coluna 'ADESÃO AO PACTO (SIMEC)' ("Aderiu ao Pacto (2024)",
+      "Não aderiu", ...); o perfil etário, da clusterização (ver `classificar_perfil`).
+    - Tipos compactos (int32, float32 e categorias) mantêm o snapshot pequeno.
+    """
+    df = pd.read_excel(file_path, header=6, usecols=list(COLUNAS_IVE))
+    df = df.rename(columns=COLUNAS_IVE).dropna(subset=['municipio', 'uf', 'codigo_ibge'])
+    df = calcular_ive(df)
+
+    tabela = pd.DataFrame({
+        'codigo_ibge': df['codigo_ibge'].astype('int32'),
+        'municipio': df['municipio'].astype(str).str.strip(),
+        'uf': codigos_uf(df['uf']).map(SIGLAS_UF).astype('category'),
+        'ive': df['ive'].astype('float32'),
+        'taxa_analfabetismo': df['taxa_analfabetismo'].astype('float32'),
+        'taxa_cobertura_eja': df['taxa_cobertura_eja'].astype('float32'),
+        'perfil_cluster': classificar_perfil(df).astype('category'),
+        'aderente_politica': df['adesao_pacto'].astype(str).str.strip().str.startswith('Aderiu'),
+    })
+    return tabela.sort_values('ive', ascending=False, kind='stable').reset_index(drop=True)
+
+
+def carregar_ive_nacional(file_path=ARQUIVO_IVE, arquivo_atuacao=ARQUIVO_ATUACAO_IA):
+    """
+    Objetivo: Carregar o IVE de todos os municípios, ordenado do mais para o menos vulnerável.
+
+    Detalhes:
+    - A tabela calculada vem do snapshot em disco; o Excel só é relido quando muda.
+    - A lista de municípios de atuação do IA é lida à parte (é pequena e editada à mão),
+      acrescentando as colunas 'atuacao_ia', 'lat' e 'lon'.
+    - Para esses municípios, 'perfil_cluster' e 'aderente_politica' vêm da lista: são os
+      valores da análise original do IA, que prevalecem sobre a coluna do SIMEC (que dá
+      todos como aderentes) e sobre a clusterização nacional. Células vazias na lista
+      mantêm o valor calculado.
+    - Inclui as colunas auxiliares 'municipio_upper' e 'municipio_uf' usadas no dashboard.
+    """
+    df = carregar_snapshot(file_path, 'ive_nacional', _construir_tabela_ive, versao=2)
+
+    atuacao = pd.read_csv(arquivo_atuacao, sep=';',
+                          usecols=['codigo_ibge', 'lat', 'lon', 'perfil_cluster', 'aderente_politica'])
+    curados = atuacao.set_index('codigo_ibge')[['perfil_cluster', 'aderente_politica']]
+    df = df.merge(atuacao[['codigo_ibge', 'lat', 'lon']], on='codigo_ibge', how='left')
+    df['atuacao_ia'] = df['codigo_ibge'].isin(atuacao['codigo_ibge'])
+
+    for coluna in ['perfil_cluster', 'aderente_politica']:
+        valores = df['codigo_ibge'].map(curados[coluna].dropna())
+        df[coluna] = valores.where(valores.notna(), df[coluna].astype(object)).astype(
+            'category' if coluna == 'perfil_cluster' else bool)
+
+    df['municipio_upper'] = df['municipio'].str.upper()
+    df['municipio_uf'] = df['municipio'] + ' (' + df['uf'].astype(str) + ')'
+    return df
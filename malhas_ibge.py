@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import json
+import os
+import urllib.parse
+import urllib.request
+
+import numpy as np
+import pandas as pd
+
+from nomes_municipios import UFS
+from snapshot_cache import gravar_atomico
+
+# --- Visão Geral do Módulo ---
+# Malhas municipais do IBGE (API de malhas v3) para os mapas coropléticos do dashboard.
+# As malhas são baixadas em TopoJSON — topologia compartilhada entre municípios vizinhos
+# e coordenadas quantizadas, bem menor que o GeoJSON ou o shapefile — já simplificadas
+# pelo IBGE em três níveis de qualidade. Cada recorte (país ou UF) e nível é guardado em
+# um cache local, de modo que o dashboard não depende da API depois do primeiro acesso.
+# Para preencher o cache de antemão: python malhas_ibge.py --brasil --ufs PB PE
+
+URL_MALHAS = 'https://servicodados.ibge.gov.br/api/v3/malhas/{recorte}'
+DIRETORIO_MALHAS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'malhas')
+
+# Níveis de simplificação oferecidos pela API, do mais leve ao mais detalhado.
+QUALIDADES = ['minima', 'intermediaria', 'maxima']
+
+# Nível usado em cada escala de mapa: o país inteiro com a malha mais leve, uma UF com
+# mais detalhe.
+QUALIDADE_PAIS = 'minima'
+QUALIDADE_UF = 'intermediaria'
+
+# Propriedade das feições da malha com o código IBGE (7 dígitos) do município.
+PROPRIEDADE_CODIGO = 'codarea'
+
+
+def qualidade_padrao(uf=None):
+    """Nível de simplificação adequado à escala do mapa (país inteiro ou uma UF)."""
+    return QUALIDADE_PAIS if uf is None else QUALIDADE_UF
+
+
+def _recorte(uf):
+    return 'paises/BR' if uf is None else f"estados/{UFS[uf][0]}"
+
+
+def caminho_malha(uf=None, qualidade=None, diretorio=None):
+    """Arquivo da malha em cache: 'BR-minima.json', 'PB-intermediaria.json' etc."""
+    qualidade = qualidade or qualidade_padrao(uf)
+    return os.path.join(diretorio or DIRETORIO_MALHAS, f"{uf or 'BR'}-{qualidade}.json")
+
+
+def baixar_malha(uf=None, qualidade=None, diretorio=None, timeout=60):
+    """
+    Objetivo: Baixar da API do IBGE a malha municipal do país (uf=None) ou de uma UF.
+
+    Detalhes:
+    - Pede o formato TopoJSON, com divisão interna por município, no nível `qualidade`.
+    - Grava o arquivo no cache de forma atômica e devolve o caminho gravado.
+    - Falhas de rede são propagadas (urllib.error.URLError, subclasse de OSError).
+    """
+    qualidade = qualidade or qualidade_padrao(uf)
+    if qualidade not in QUALIDADES:
+        raise ValueError(f"Qualidade inválida: {qualidade}. Use uma de {QUALIDADES}.")
+
+    parametros = urllib.parse.urlencode({'formato': 'application/json', 'intrarregiao': 'municipio',
+                                         'qualidade': qualidade})
+    url = f"{URL_MALHAS.format(recorte=_recorte(uf))}?{parametros}"
+    with urllib.request.urlopen(url, timeout=timeout) as resposta:
+        conteudo = resposta.read()
+    json.loads(conteudo)  # Não grava respostas que não sejam JSON válido.
+
+    destino = caminho_malha(uf, qualidade, diretorio)
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+
+    def escrever(caminho):
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(conteudo)
+    gravar_atomico(destino, escrever)
+    return destino
+
+
+def carregar_malha(uf=None, qualidade=None, diretorio=None):
+    """
+    Objetivo: Carregar a malha TopoJSON do país ou de uma UF, do cache local ou da API.
+
+    Detalhes:
+    - A API só é consultada quando o arquivo ainda não está em cache.
+    - Devolve a topologia como dicionário (ver `objeto_municipios` e `limites_malha`).
+    """
+    caminho = caminho_malha(uf, qualidade, diretorio)
+    if not os.path.exists(caminho):
+        baixar_malha(uf, qualidade, diretorio)
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def objeto_municipios(topologia):
+    """Nome do objeto da topologia que guarda os municípios (a API devolve um único objeto)."""
+    return next(iter(topologia['objects']))
+
+
+def com_propriedades(topologia, propriedades):
+    """
+    Objetivo: Acrescentar dados às feições da malha, a partir de {código IBGE: {campo: valor}}.
+
+    Detalhes:
+    - Devolve uma nova topologia; as coordenadas (arcos) são compartilhadas com a
+      original, apenas a lista de geometrias é refeita.
+    - Municípios sem dados ficam com as propriedades originais da malha.
+    """
+    nome = objeto_municipios(topologia)
+    objeto = topologia['objects'][nome]
+    geometrias = []
+    for geometria in objeto['geometries']:
+        extras = propriedades.get(str(geometria.get('properties', {}).get(PROPRIEDADE_CODIGO)), {})
+        geometrias.append(dict(geometria, properties={**geometria.get('properties', {}), **extras}))
+    return dict(topologia, objects={**topologia['objects'], nome: dict(objeto, geometries=geometrias)})
+
+
+def _decodificar_arcos(topologia):
+    """Converte os arcos da topologia em arrays de (lon, lat), desfazendo a quantização, se houver."""
+    transformacao = topologia.get('transform')
+    arcos = []
+    for arco in topologia['arcs']:
+        posicoes = np.asarray(arco, dtype=float)[:, :2]
+        if transformacao:
+            posicoes = np.cumsum(posicoes, axis=0) * transformacao['scale'] + transformacao['translate']
+        arcos.append(posicoes)
+    return arcos
+
+
+def _anel(arcos, indices):
+    """Monta um anel de polígono a partir dos índices de arcos (índice negativo: arco invertido)."""
+    return np.concatenate([arcos[i] if i >= 0 else arcos[~i][::-1] for i in indices])
+
+
+def _centroide_anel(anel):
+    """Centroide (lon, lat) e área de um anel, pela fórmula do polígono (shoelace)."""
+    x, y = anel[:, 0], anel[:, 1]
+    produto = x * np.roll(y, -1) - np.roll(x, -1) * y
+    area = produto.sum() / 2
+    if area == 0:
+        return anel.mean(axis=0), 0.0
+    cx = ((x + np.roll(x, -1)) * produto).sum() / (6 * area)
+    cy = ((y + np.roll(y, -1)) * produto).sum() / (6 * area)
+    return np.array([cx, cy]), abs(area)
+
+
+def centroides_malha(topologia):
+    """
+    Objetivo: Calcular o centroide de cada município da malha.
+
+    Detalhes:
+    - Usa o anel externo de cada polígono; em municípios com mais de um polígono (ilhas),
+      fica o centroide do polígono de maior área.
+    - Retorna um DataFrame com 'codigo_ibge' (7 dígitos), 'lat' e 'lon'.
+    """
+    arcos = _decodificar_arcos(topologia)
+    linhas = []
+    for geometria in topologia['objects'][objeto_municipios(topologia)]['geometries']:
+        if geometria['type'] == 'Polygon':
+            poligonos = [geometria['arcs']]
+        elif geometria['type'] == 'MultiPolygon':
+            poligonos = geometria['arcs']
+        else:
+            continue
+        centroides = [_centroide_anel(_anel(arcos, poligono[0])) for poligono in poligonos]
+        (lon, lat), _ = max(centroides, key=lambda item: item[1])
+        linhas.append({'codigo_ibge': int(geometria['properties'][PROPRIEDADE_CODIGO]), 'lat': lat, 'lon': lon})
+    return pd.DataFrame(linhas, columns=['codigo_ibge', 'lat', 'lon'])
+
+
+def limites_malha(topologia):
+    """
+    Objetivo: Calcular os limites [[lat_min, lon_min], [lat_max, lon_max]] da malha.
+
+    Detalhes:
+    - Usa o 'bbox' da topologia quando presente; caso contrário, decodifica os arcos
+      (posições acumuladas e, se a malha for quantizada, a transformação de escala).
+    """
+    if 'bbox' in topologia:
+        lon_min, lat_min, lon_max, lat_max = topologia['bbox'][:4]
+        return [[lat_min, lon_min], [lat_max, lon_max]]
+
+    pontos = np.concatenate(_decodificar_arcos(topologia))
+    (lon_min, lat_min), (lon_max, lat_max) = pontos.min(axis=0).tolist(), pontos.max(axis=0).tolist()
+    return [[lat_min, lon_min], [lat_max, lon_max]]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Baixa as malhas municipais do IBGE para o cache local.")
+    parser.add_argument('--brasil', action='store_true', help="Baixa a malha do país inteiro.")
+    parser.add_argument('--ufs', nargs='+', default=[], help="Baixa a malha das UFs indicadas (ex.: PB PE).")
+    parser.add_argument('--qualidades', nargs='+', default=None, choices=QUALIDADES,
+                        help="Níveis a baixar (padrão: o nível usado pelo dashboard em cada escala).")
+    parser.add_argument('--diretorio', default=DIRETORIO_MALHAS, help="Pasta do cache de malhas.")
+    args = parser.parse_args()
+
+    recortes = ([None] if args.brasil else []) + [uf.upper() for uf in args.ufs]
+    if not recortes:
+        parser.error("indique --brasil e/ou --ufs")
+    for uf in recortes:
+        for qualidade in args.qualidades or [qualidade_padrao(uf)]:
+            destino = baixar_malha(uf, qualidade, args.diretorio)
+            print(f"{uf or 'BR'} ({qualidade}): {os.path.getsize(destino) / 2**20:.2f} MB em {destino}")
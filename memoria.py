@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+
+# --- Visão Geral do Módulo ---
+# Tipos compactos e relatório de memória para as bases mantidas em cache pelo dashboard.
+# Colunas de texto com muitos valores repetidos (eixo, modalidade, UF, setor...) viram
+# 'category' — cada texto distinto é guardado uma única vez e as linhas guardam apenas um
+# código inteiro — e colunas inteiras são reduzidas ao menor tipo que comporta os valores.
+
+# Colunas de texto com proporção de valores distintos até este limite viram 'category'.
+LIMITE_CATEGORIA = 0.5
+
+
+def compactar_tipos(df, categorias=(), limite_categoria=LIMITE_CATEGORIA):
+    """
+    Objetivo: Converter as colunas de `df` para tipos compactos, sem alterar os valores.
+
+    Detalhes:
+    - Colunas em `categorias`, e colunas de texto em que a proporção de valores distintos
+      não passa de `limite_categoria`, são convertidas para 'category'.
+    - Colunas inteiras passam ao menor tipo inteiro que comporta os valores (ex.: int16);
+      colunas de ponto flutuante não são alteradas, para não perder precisão.
+    - Altera `df` no lugar e o devolve.
+    """
+    n_linhas = max(len(df), 1)
+    for coluna in df.columns:
+        serie = df[coluna]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            continue
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            df[coluna] = pd.to_numeric(serie, downcast='integer')
+        elif coluna in categorias or (
+                (pd.api.types.is_object_dtype(serie.dtype) or pd.api.types.is_string_dtype(serie.dtype))
+                and serie.nunique() / n_linhas <= limite_categoria):
+            df[coluna] = serie.astype('category')
+    return df
+
+
+def mapear_categorias(serie, funcao):
+    """
+    Objetivo: Aplicar uma transformação de texto (ex.: maiúsculas) a uma coluna 'category'.
+
+    Detalhes:
+    - `funcao` recebe e devolve uma Series de texto; ela é aplicada apenas às categorias
+      distintas, e não a cada linha. O resultado também é 'category'.
+    """
+    categorias = serie.cat.categories
+    novas = funcao(pd.Series(categorias, dtype=object))
+    return serie.map(dict(zip(categorias, novas))).astype('category')
+
+
+def memoria_por_coluna(df):
+    """Devolve a memória ocupada (em MB, contando o conteúdo dos textos) e o tipo de cada coluna."""
+    uso = df.memory_usage(deep=True, index=False)
+    return pd.DataFrame({
+        'coluna': uso.index,
+        'tipo': [str(df[coluna].dtype) for coluna in uso.index],
+        'memoria_mb': uso.to_numpy() / 2**20,
+    })
+
+
+def relatorio_memoria(bases):
+    """
+    Objetivo: Resumir a memória ocupada por cada base, a partir de {nome: DataFrame}.
+
+    Detalhes:
+    - Uma linha por base, com linhas, colunas, memória total em MB (incluindo o índice e
+      o conteúdo dos textos) e bytes por linha.
+    - Bases que não são DataFrame (ex.: o dicionário de matrizes do alinhamento) devem ser
+      passadas já decompostas, uma entrada por DataFrame.
+    """
+    linhas = []
+    for nome, df in bases.items():
+        total = int(df.memory_usage(deep=True).sum())
+        linhas.append({
+            'base': nome,
+            'linhas': len(df),
+            'colunas': df.shape[1],
+            'memoria_mb': total / 2**20,
+            'bytes_por_linha': total / len(df) if len(df) else 0.0,
+        })
+    return pd.DataFrame(linhas, columns=['base', 'linhas', 'colunas', 'memoria_mb', 'bytes_por_linha'])
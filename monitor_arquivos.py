@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from snapshot_cache import fingerprint_arquivo
+
+# --- Visão Geral do Módulo ---
+# Monitor dos arquivos de origem das bases do dashboard. Cada base é carregada com a
+# assinatura atual dos seus arquivos (mtime e tamanho) como parte da chave do cache; uma
+# thread em segundo plano verifica periodicamente os arquivos e, quando algum muda,
+# reconstrói a base com a nova assinatura fora do caminho das requisições. Só depois que
+# a nova versão está pronta a assinatura atual é trocada, de uma só vez: até lá, as
+# sessões continuam recebendo a versão anterior, já em cache.
+
+# Intervalo, em segundos, entre duas verificações dos arquivos de origem.
+INTERVALO_VERIFICACAO = 10
+
+
+def assinatura_arquivos(arquivos):
+    """
+    Objetivo: Resumir o estado dos arquivos de origem de uma base em uma tupla comparável.
+
+    Detalhes:
+    - Usa apenas mtime e tamanho (sem ler o conteúdo), para que a verificação periódica
+      seja barata mesmo com planilhas grandes.
+    - Arquivos ausentes aparecem com `None` no lugar do mtime e do tamanho.
+    """
+    assinatura = []
+    for arquivo in arquivos:
+        try:
+            fingerprint = fingerprint_arquivo(arquivo, calcular_hash=False)
+            assinatura.append((arquivo, fingerprint['mtime_ns'], fingerprint['tamanho']))
+        except FileNotFoundError:
+            assinatura.append((arquivo, None, None))
+    return tuple(assinatura)
+
+
+def _arquivos_presentes(assinatura):
+    return all(mtime is not None for _, mtime, _ in assinatura)
+
+
+class MonitorArquivos:
+    """Guarda a assinatura em uso de cada base e a atualiza em segundo plano quando os arquivos mudam."""
+
+    def __init__(self, intervalo=INTERVALO_VERIFICACAO):
+        self._trava = threading.Lock()
+        self._intervalo = intervalo
+        self._bases = {}
+        self._thread = None
+
+    def registrar(self, nome, arquivos, reconstruir):
+        """
+        Registra uma base e inicia a thread de verificação, se ainda não estiver rodando.
+
+        `reconstruir(assinatura)` deve carregar a base com a assinatura dada, deixando-a
+        em cache (ex.: chamando o carregador do dashboard). Registrar de novo uma base já
+        conhecida não tem efeito, de modo que o registro pode ficar no corpo do script.
+        """
+        with self._trava:
+            if nome not in self._bases:
+                self._bases[nome] = {
+                    'arquivos': list(arquivos), 'reconstruir': reconstruir,
+                    'assinatura': assinatura_arquivos(arquivos), 'pendente': None, 'falha': None,
+                    'erro': None, 'atualizada_em': None, 'verificada_em': None,
+                }
+        self.iniciar()
+
+    def assinatura(self, nome):
+        """Assinatura em uso da base: é ela que os carregadores recebem como chave do cache."""
+        with self._trava:
+            return self._bases[nome]['assinatura']
+
+    def verificar(self):
+        """
+        Objetivo: Fazer uma rodada de verificação de todas as bases registradas.
+
+        Detalhes:
+        - Uma mudança só é aplicada quando a nova assinatura se repete em duas
+          verificações seguidas, para não reconstruir a partir de um arquivo que ainda
+          está sendo copiado.
+        - Arquivos ausentes não disparam reconstrução: a versão em uso é mantida.
+        - Se a reconstrução falhar, a versão em uso é mantida e o erro fica registrado;
+          a mesma assinatura não é tentada de novo até que os arquivos mudem outra vez.
+        - Chamada pela thread do monitor; pode ser chamada diretamente (ex.: em testes).
+        """
+        with self._trava:
+            bases = list(self._bases.items())
+
+        for nome, base in bases:
+            nova = assinatura_arquivos(base['arquivos'])
+            agora = datetime.now().isoformat(timespec='seconds')
+            with self._trava:
+                base['verificada_em'] = agora
+                if nova == base['assinatura'] or nova == base['falha'] or not _arquivos_presentes(nova):
+                    base['pendente'] = None
+                    continue
+                if nova != base['pendente']:
+                    base['pendente'] = nova
+                    continue
+
+            try:
+                base['reconstruir'](nova)
+            except Exception as erro:
+                with self._trava:
+                    base['falha'], base['pendente'] = nova, None
+                    base['erro'] = f"{type(erro).__name__}: {erro}"
+                continue
+
+            with self._trava:
+                base['assinatura'], base['pendente'], base['falha'], base['erro'] = nova, None, None, None
+                base['atualizada_em'] = datetime.now().isoformat(timespec='seconds')
+
+    def _executar(self):
+        while True:
+            time.sleep(self._intervalo)
+            self.verificar()
+
+    def iniciar(self):
+        """Inicia a thread de verificação (daemon), uma única vez por processo."""
+        with self._trava:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._executar, name='monitor-arquivos', daemon=True)
+                self._thread.start()
+
+    def situacao(self):
+        """Devolve um DataFrame com uma linha por base: arquivos, última atualização e erros."""
+        with self._trava:
+            linhas = [{
+                'base': nome,
+                'arquivos': ', '.join(base['arquivos']),
+                'atualizada_em': base['atualizada_em'],
+                'verificada_em': base['verificada_em'],
+                'mudanca_pendente': base['pendente'] is not None,
+                'erro': base['erro'],
+            } for nome, base in self._bases.items()]
+        return pd.DataFrame(linhas, columns=['base', 'arquivos', 'atualizada_em', 'verificada_em',
+                                             'mudanca_pendente', 'erro'])
+
+
+# Monitor único do processo, compartilhado por todas as sessões (como o REGISTRO da
+# instrumentação).
+MONITOR = MonitorArquivos()
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+import pandas as pd
+
+# --- Visão Geral do Módulo ---
+# Padronização única dos nomes de municípios e resolução para o código IBGE (id_mundv).
+# Substitui as funções de normalização que cada script tinha (standardize_name no RAIS.py,
+# normalize_city_name no caged_f e formatar_nome_para_merge no ideb_f.py), que geravam
+# chaves diferentes e eram aplicadas linha a linha com `.apply`.
+#
+# A normalização é vetorizada (métodos `.str` do pandas) e feita apenas sobre os valores
+# distintos de cada coluna; os resultados ficam guardados em uma tabela de memória
+# compartilhada, de modo que um nome já visto não é processado de novo.
+
+# Unidades da Federação: sigla -> (código IBGE, nome).
+UFS = {
+    'RO': (11, 'Rondônia'), 'AC': (12, 'Acre'), 'AM': (13, 'Amazonas'),
+    'RR': (14, 'Roraima'), 'PA': (15, 'Pará'), 'AP': (16, 'Amapá'),
+    'TO': (17, 'Tocantins'), 'MA': (21, 'Maranhão'), 'PI': (22, 'Piauí'),
+    'CE': (23, 'Ceará'), 'RN': (24, 'Rio Grande do Norte'), 'PB': (25, 'Paraíba'),
+    'PE': (26, 'Pernambuco'), 'AL': (27, 'Alagoas'), 'SE': (28, 'Sergipe'),
+    'BA': (29, 'Bahia'), 'MG': (31, 'Minas Gerais'), 'ES': (32, 'Espírito Santo'),
+    'RJ': (33, 'Rio de Janeiro'), 'SP': (35, 'São Paulo'), 'PR': (41, 'Paraná'),
+    'SC': (42, 'Santa Catarina'), 'RS': (43, 'Rio Grande do Sul'),
+    'MS': (50, 'Mato Grosso do Sul'), 'MT': (51, 'Mato Grosso'), 'GO': (52, 'Goiás'),
+    'DF': (53, 'Distrito Federal'),
+}
+
+# Código IBGE da UF -> sigla.
+SIGLAS_UF = {codigo: sigla for sigla, (codigo, _) in UFS.items()}
+
+# Termos que aparecem junto ao nome do município em algumas planilhas do IA e que
+# não fazem parte do nome oficial.
+TERMOS_IGNORADOS = ['MIXING CENTER']
+
+# Tabela de memória: valor original -> nome canônico.
+_MEMO_NOMES = {}
+
+
+def _canonicalizar_unicos(valores):
+    """Aplica as regras de padronização, de forma vetorizada, a valores distintos."""
+    nomes = pd.Series(valores, dtype=object).astype(str)
+    nomes = (nomes.str.normalize('NFKD')
+                  .str.encode('ascii', 'ignore')
+                  .str.decode('ascii')
+                  .str.upper())
+    for termo in TERMOS_IGNORADOS:
+        nomes = nomes.str.replace(termo, '', regex=False)
+    # Remove tudo o que não é letra ou dígito, inclusive espaços, hífens e apóstrofos:
+    # "Olho-d'Água", "Olho d'Água" e "OLHO D AGUA" geram a mesma chave "OLHODAGUA".
+    return nomes.str.replace(r'[^A-Z0-9]', '', regex=True).to_numpy(dtype=object)
+
+
+def canonicalizar_nomes(nomes):
+    """
+    Objetivo: Gerar a chave canônica dos nomes de municípios para junções entre bases.
+
+    Detalhes:
+    - Remove acentos, converte para maiúsculas e elimina espaços, pontuação e termos
+      indesejados (ex.: "MIXING CENTER"), de forma que grafias diferentes do mesmo
+      município gerem a mesma chave.
+    - Só os valores distintos ainda não vistos são processados; a repetição de nomes
+      (comum em bases longas, como município × setor) não custa nada extra.
+    - Valores ausentes permanecem ausentes. Retorna uma Series com o mesmo índice da entrada.
+    """
+    nomes = pd.Series(nomes)
+    codigos, unicos = pd.factorize(nomes)
+
+    faltantes = [valor for valor in unicos if valor not in _MEMO_NOMES]
+    if faltantes:
+        _MEMO_NOMES.update(zip(faltantes, _canonicalizar_unicos(faltantes)))
+
+    canonicos = np.array([_MEMO_NOMES[valor] for valor in unicos] + [None], dtype=object)
+    # pd.factorize marca valores ausentes com -1, que aponta para o `None` ao final.
+    return pd.Series(canonicos[codigos], index=nomes.index, dtype=object)
+
+
+def _tabela_codigos_uf():
+    """Monta o dicionário chave canônica (sigla ou nome) -> código IBGE da UF."""
+    tabela = {}
+    for sigla, (codigo, nome) in UFS.items():
+        tabela[sigla] = codigo
+        tabela[_canonicalizar_unicos([nome])[0]] = codigo
+    return tabela
+
+
+_CODIGOS_UF = _tabela_codigos_uf()
+
+
+def codigos_uf(ufs):
+    """
+    Objetivo: Converter uma coluna de UFs para o código IBGE da UF (ex.: 'PB' -> 25).
+
+    Detalhes:
+    - Aceita siglas ('PB'), nomes com ou sem acento ('Paraíba ', 'PARAIBA') ou códigos
+      numéricos já prontos. Valores não reconhecidos viram <NA>.
+    """
+    ufs = pd.Series(ufs)
+    numericos = pd.to_numeric(ufs, errors='coerce')
+    por_nome = canonicalizar_nomes(ufs).map(_CODIGOS_UF)
+    return numericos.fillna(por_nome).astype('Int8')
+
+
+def resolver_codigos(nomes, ufs, referencia, coluna_codigo='id_mundv',
+                     coluna_nome='ds_mun', coluna_uf='sg_uf', coluna_chave='chave_nome'):
+    """
+    Objetivo: Resolver pares (nome do município, UF) para o código IBGE do município.
+
+    Detalhes:
+    - `referencia` é uma base territorial com código, nome e UF de cada município
+      (ex.: a DTB do IBGE, ou a própria Tabela 4 da RAIS).
+    - A junção é feita pela chave canônica do nome e pelo código numérico da UF, de modo
+      que homônimos em estados diferentes (ex.: Santa Rita/PB e Santa Rita/MA) não se misturam.
+    - Se a referência já traz a chave canônica (`coluna_chave`, como na tabela de
+      dtb.carregar_dtb), ela é usada diretamente.
+    - Retorna uma Series de inteiros (Int64, com <NA> para os não encontrados) alinhada
+      com `nomes`, pronta para ser usada como chave de junção entre bases.
+    """
+    nomes = pd.Series(nomes)
+    consulta = pd.DataFrame({
+        'id_uf': codigos_uf(pd.Series(ufs, index=nomes.index)).to_numpy(),
+        'chave': canonicalizar_nomes(nomes).to_numpy(),
+    })
+
+    ref = pd.DataFrame({
+        'id_uf': codigos_uf(referencia[coluna_uf]).to_numpy(),
+        'chave': (referencia[coluna_chave] if coluna_chave in referencia.columns
+                  else canonicalizar_nomes(referencia[coluna_nome])).to_numpy(),
+        'codigo': pd.to_numeric(referencia[coluna_codigo], errors='coerce').to_numpy(),
+    }).dropna().drop_duplicates(subset=['id_uf', 'chave'])
+
+    resultado = consulta.merge(ref, on=['id_uf', 'chave'], how='left')
+    return pd.Series(resultado['codigo'].to_numpy(), index=nomes.index).astype('Int64')
+
+
+def para_codigo6(codigos):
+    """
+    Objetivo: Converter códigos IBGE de 7 dígitos (com dígito verificador, como na DTB)
+    para o formato de 6 dígitos usado pela RAIS e pelo CAGED.
+
+    Detalhes:
+    - Códigos que já têm 6 dígitos são mantidos; assim as duas convenções podem ser
+      usadas como chave de junção entre bases sem comparar nomes.
+    """
+    codigos = pd.Series(codigos).astype('Int64')
+    return codigos.where(codigos < 1_000_000, codigos // 10)
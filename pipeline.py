@@ -0,0 +1,511 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from os import path
+
+import pandas as pd
+
+import analise_educacional
+import caged_dados
+import dtb
+import ideb_f
+import nomes_municipios
+import projetos_ia
+import rais_tabela4
+from snapshot_cache import escrever_json, gravar_atomico, hash_arquivo, ler_metadados
+
+# --- Visão Geral do Módulo ---
+# Pipeline incremental das análises dos scripts RAIS.py, ideb_f.py, caged_f e
+# analise_educacional.py. Cada etapa (carregar a DTB, carregar os projetos do IA,
+# carregar o IDEB, juntar as bases...) é declarada com as etapas de que depende, os
+# arquivos de origem e parâmetros que lê e o código que executa. O resultado de cada
+# etapa fica em disco, identificado por uma chave calculada a partir do conteúdo dos
+# arquivos, dos parâmetros, do código e do conteúdo dos resultados das dependências:
+# numa nova execução, só rodam as etapas cuja chave mudou, isto é, as que estão abaixo
+# de algo que de fato mudou. Se uma etapa roda de novo e produz o mesmo resultado, as
+# etapas abaixo dela continuam válidas.
+# Uso: python pipeline.py [etapas...] [--forcar etapa ...] [--situacao]
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_PIPELINE = os.path.join(RAIZ, '.cache', 'pipeline')
+
+# Arquivos de origem (chaves 'arquivo_*', cujo conteúdo entra na chave das etapas) e
+# parâmetros das análises; podem ser substituídos na chamada de `executar`.
+CONFIGURACAO = {
+    'arquivo_dtb': path.join('data', 'DTB/2024/RELATORIO_DTB_BRASIL_2024_MUNICIPIOS.xls'),
+    'arquivo_ideb': 'data/IDEB/divulgacao_ensino_medio_municipios_2023.xlsx',
+    'arquivo_projetos_ia': 'data/Projetos_de_Atuac807a771o_-_IA_-_2020_a_2025 (1).xlsx',
+    'arquivo_rais': 'data/MT/tabelas-rais-2024-parcial.xlsx',
+    'arquivo_caged': 'data/MT/3-tabelas_Junho de 2025 - Site.xlsx',
+    'arquivo_eja': 'Análise de dados/IVE_DADOS.xlsx',
+    'anos_ia': list(range(2020, 2026)),
+    'ano_rais': 2024,
+    'anos_profissionalizante': list(range(2022, 2026)),
+    'municipios_eja': [
+        'Alagoa Nova', 'Cabaceiras', 'Campina Grande', 'Caturité', 'Bananeiras',
+        'Guarabira', 'Ingá', 'Itatuba', 'João Pessoa', 'Lagoa Seca', 'Mogeiro',
+        'Queimadas', 'Santa Rita', 'Serra Redonda', 'Carpina', 'Montes Claros'
+    ],
+}
+
+# Registro das etapas, na ordem em que são declaradas: {nome: definição}.
+ETAPAS = {}
+
+
+def etapa(nome, dependencias=(), entradas=(), codigo=()):
+    """
+    Objetivo: Registrar uma função como etapa do pipeline (uso como decorador).
+
+    Detalhes:
+    - `dependencias`: etapas cujos resultados a função recebe, como argumentos nomeados.
+    - `entradas`: chaves da configuração que a função recebe; as que começam com
+      'arquivo_' são caminhos, e é o conteúdo do arquivo que entra na chave da etapa.
+    - `codigo`: módulos do projeto chamados pela etapa (uma função vale pelo módulo em
+      que foi definida). O código-fonte inteiro deles, e dos módulos do projeto que eles
+      importam, entra na chave junto com o da própria função, de modo que mudar a lógica
+      ou uma constante de módulo invalida a etapa. Módulos e constantes do pipeline
+      usados diretamente pela função são incluídos mesmo sem constar da lista.
+    - A função não deve alterar os resultados recebidos: eles podem ser compartilhados
+      com outras etapas na mesma execução.
+    """
+    def registrar(funcao):
+        faltando = [dependencia for dependencia in dependencias if dependencia not in ETAPAS]
+        if faltando:
+            raise ValueError(f"Etapa '{nome}' depende de etapas não declaradas: {faltando}")
+        ETAPAS[nome] = {'funcao': funcao, 'dependencias': tuple(dependencias),
+                        'entradas': tuple(entradas), 'codigo': tuple(codigo)}
+        return funcao
+    return registrar
+
+
+# --- Etapas: bases de referência e projetos do IA ---
+
+@etapa('dtb', entradas=['arquivo_dtb'], codigo=[dtb, nomes_municipios])
+def _dtb(arquivo_dtb):
+    return dtb.carregar_dtb(arquivo_dtb)
+
+
+@etapa('projetos_ia', entradas=['arquivo_projetos_ia', 'anos_ia'], codigo=[projetos_ia])
+def _projetos_ia(arquivo_projetos_ia, anos_ia):
+    return projetos_ia.carregar_projetos_ia(arquivo_projetos_ia, anos=anos_ia)
+
+
+# --- Etapas: IDEB (ideb_f.py) ---
+
+@etapa('ideb', dependencias=['dtb'], entradas=['arquivo_ideb'], codigo=[ideb_f, nomes_municipios])
+def _ideb(dtb, arquivo_ideb):
+    return ideb_f.get_ideb_data(arquivo_ideb, dtb)
+
+
+@etapa('ia_municipios', dependencias=['projetos_ia', 'dtb'],
+       codigo=[ideb_f, nomes_municipios])
+def _ia_municipios(projetos_ia, dtb):
+    """Projetos do IA de todos os anos vinculados ao código do IBGE, e as cidades não encontradas por ano."""
+    combinados, nao_encontrados = [], {}
+    for ano, df_ano in projetos_ia.groupby('ano'):
+        df_combinado, df_nao_encontrados = ideb_f.padronizar_cidades_ia(df_ano, dtb)
+        combinados.append(df_combinado)
+        nao_encontrados[ano] = df_nao_encontrados
+    return {'combinado': pd.concat(combinados, ignore_index=True), 'nao_encontrados': nao_encontrados}
+
+
+@etapa('evolucao_ia', dependencias=['ia_municipios'])
+def _evolucao_ia(ia_municipios):
+    return ia_municipios['combinado'].groupby('ano').sum(numeric_only=True)
+
+
+@etapa('ia_ideb', dependencias=['ia_municipios', 'ideb'])
+def _ia_ideb(ia_municipios, ideb):
+    return pd.merge(ia_municipios['combinado'], ideb.drop(columns=['sg_uf']),
+                    on='id_mundv', how='left', suffixes=('_ia', '_ideb'))
+
+
+@etapa('matriz_ideb', dependencias=['ia_ideb'], codigo=[ideb_f])
+def _matriz_ideb(ia_ideb):
+    return ideb_f.montar_matriz_ideb(ia_ideb)
+
+
+# --- Etapas: RAIS (RAIS.py) ---
+
+SETORES_RAIS = ['Agropecuaria_2024', 'Industria_2024', 'Construcao_2024', 'Comercio_2024', 'Servicos_2024']
+METRICAS_IA = ['nprojetos', 'ninstituicoes', 'nbeneficiados']
+
+
+@etapa('rais_tabela4', entradas=['arquivo_rais'], codigo=[rais_tabela4])
+def _rais_tabela4(arquivo_rais):
+    return rais_tabela4.carregar_rais_tabela4(arquivo_rais)
+
+
+@etapa('rais_ia', dependencias=['rais_tabela4', 'projetos_ia'], entradas=['ano_rais'],
+       codigo=[nomes_municipios])
+def _rais_ia(rais_tabela4, projetos_ia, ano_rais):
+    """Municípios presentes na Tabela 4 da RAIS e nos projetos do IA do ano, lado a lado."""
+    df_ia = projetos_ia[projetos_ia['ano'] == ano_rais].drop(columns=['ano']).reset_index(drop=True)
+    # A própria Tabela 4 da RAIS serve de referência territorial para resolver as cidades.
+    df_ia['id_mundv'] = nomes_municipios.resolver_codigos(df_ia['ds_mun'], df_ia['sg_uf'], rais_tabela4)
+    return pd.merge(rais_tabela4, df_ia, on='id_mundv', how='inner', suffixes=('_rais', '_ia'))
+
+
+@etapa('totais_rais_ia', dependencias=['rais_ia'])
+def _totais_rais_ia(rais_ia):
+    """Totais de emprego por setor (RAIS) e de projetos, instituições e beneficiados (IA)."""
+    total_rais = rais_ia[SETORES_RAIS].sum().reset_index()
+    total_rais.columns = ['Setor', 'Total_2024_RAIS']
+    total_rais['Setor'] = total_rais['Setor'].str.replace('_2024', '')
+    total_ia = rais_ia[METRICAS_IA].sum().reset_index()
+    total_ia.columns = ['Setor', 'Total_2024_IA']
+    return {'rais': total_rais, 'ia': total_ia}
+
+
+# --- Etapas: CAGED (caged_f) ---
+
+COLUNAS_METRICAS_PROFISSIONALIZANTE = {'cursos': 'CURSOS', 'turmas': 'TURMAS',
+                                       'beneficiados': 'BENEFICIADOS', 'desistentes': 'DESISTENTES'}
+
+
+@etapa('caged_tabela81', entradas=['arquivo_caged'], codigo=[caged_dados, nomes_municipios])
+def _caged_tabela81(arquivo_caged):
+    return caged_dados.carregar_caged_tabela81(arquivo_caged)
+
+
+@etapa('ed_profissionalizante', entradas=['arquivo_projetos_ia', 'anos_profissionalizante'],
+       codigo=[projetos_ia])
+def _ed_profissionalizante(arquivo_projetos_ia, anos_profissionalizante):
+    return projetos_ia.carregar_ed_profissionalizante_ia(arquivo_projetos_ia, anos=anos_profissionalizante)
+
+
+@etapa('caged_ia', dependencias=['ed_profissionalizante', 'caged_tabela81'], codigo=[nomes_municipios])
+def _caged_ia(ed_profissionalizante, caged_tabela81):
+    """
+    Programas profissionalizantes do IA de cada ano nos municípios do CAGED, com os dados
+    do CAGED ao lado: {ano: DataFrame}. Como as planilhas de alguns anos não trazem a UF,
+    a junção é feita pela chave canônica do nome da cidade.
+    """
+    cidades_caged = set(caged_tabela81['CIDADES_NORMALIZADAS'])
+    por_ano = {}
+    for ano, df in ed_profissionalizante.groupby('ano'):
+        df = df.rename(columns={'ds_mun': 'CIDADES', **COLUNAS_METRICAS_PROFISSIONALIZANTE})
+        df['CIDADES_NORMALIZADAS'] = nomes_municipios.canonicalizar_nomes(df['CIDADES'])
+        df_filtrado = df[df['CIDADES_NORMALIZADAS'].isin(cidades_caged)]
+
+        # Métricas que não existem no ano (ex.: desistentes em 2022) ficam de fora.
+        metricas = [coluna for coluna in COLUNAS_METRICAS_PROFISSIONALIZANTE.values() if df[coluna].notna().any()]
+        df_final = df_filtrado[['CIDADES', 'CIDADES_NORMALIZADAS'] + metricas].copy()
+        if 'DESISTENTES' in df_final.columns:
+            df_final['DESISTENTES'] = df_final['DESISTENTES'].fillna(0).astype(int)
+
+        df_final = pd.merge(df_final, caged_tabela81, on='CIDADES_NORMALIZADAS', how='left')
+        df_final = df_final.drop(columns=['CIDADES_NORMALIZADAS', 'CIDADES_x'], errors='ignore')
+        por_ano[ano] = df_final.rename(columns={'CIDADES_y': 'CIDADES'})
+    return por_ano
+
+
+@etapa('evolucao_profissionalizante', dependencias=['caged_ia'])
+def _evolucao_profissionalizante(caged_ia):
+    """Evolução anual de cursos, turmas, beneficiados e desistentes, uma linha por ano."""
+    cursos, desistentes = [], []
+    for ano, df in caged_ia.items():
+        if {'CURSOS', 'TURMAS', 'BENEFICIADOS'} <= set(df.columns):
+            cursos.append({'Ano': int(ano), 'Cursos': df['CURSOS'].sum(), 'Turmas': df['TURMAS'].sum(),
+                           'Beneficiados': df['BENEFICIADOS'].sum()})
+        if 'DESISTENTES' in df.columns:
+            desistentes.append({'Ano': int(ano), 'Desistentes': df['DESISTENTES'].sum()})
+    df_cursos = pd.DataFrame(cursos, columns=['Ano', 'Cursos', 'Turmas', 'Beneficiados']).set_index('Ano')
+    df_desistentes = pd.DataFrame(desistentes, columns=['Ano', 'Desistentes']).set_index('Ano')
+    return df_cursos.merge(df_desistentes, left_index=True, right_index=True, how='outer')
+
+
+# --- Etapas: EJA (analise_educacional.py) ---
+
+@etapa('eja_base', entradas=['arquivo_eja', 'municipios_eja'],
+       codigo=[analise_educacional])
+def _eja_base(arquivo_eja, municipios_eja):
+    return analise_educacional.carregar_e_preparar_dados(arquivo_eja, municipios_eja)
+
+
+# --- Execução ---
+
+def ordem_execucao(alvos):
+    """Etapas necessárias para produzir `alvos`, com cada dependência antes de quem a usa."""
+    ordem, visitadas = [], set()
+
+    def visitar(nome):
+        if nome not in ETAPAS:
+            raise KeyError(f"Etapa desconhecida: '{nome}'. Etapas: {list(ETAPAS)}")
+        if nome in visitadas:
+            return
+        visitadas.add(nome)
+        for dependencia in ETAPAS[nome]['dependencias']:
+            visitar(dependencia)
+        ordem.append(nome)
+
+    for alvo in alvos:
+        visitar(alvo)
+    return ordem
+
+
+def _modulo_do_projeto(objeto):
+    """Módulo do projeto (arquivo na raiz do repositório) em que `objeto` foi definido, ou None."""
+    modulo = objeto if inspect.ismodule(objeto) else inspect.getmodule(objeto)
+    arquivo = getattr(modulo, '__file__', None)
+    if arquivo is None or os.path.dirname(os.path.abspath(arquivo)) != RAIZ:
+        return None
+    return modulo
+
+
+def fontes_codigo(definicao):
+    """
+    Objetivo: Reunir o código de que o resultado de uma etapa depende.
+
+    Detalhes:
+    - Entram a função da etapa, as funções e os valores (constantes) do pipeline que
+      ela usa, e o código-fonte completo dos módulos do projeto que ela usa ou que
+      constam de 'codigo', seguindo os imports desses módulos.
+    - Bibliotecas externas (pandas, scikit-learn...) ficam de fora.
+    - Retorna {identificador: texto}, com identificadores como 'funcao:_ideb' e
+      'modulo:ideb_f'.
+    """
+    fontes = {}
+
+    def visitar_modulo(modulo):
+        chave = f"modulo:{modulo.__name__}"
+        if chave in fontes or modulo.__dict__ is globals():
+            return
+        fontes[chave] = inspect.getsource(modulo)
+        for valor in list(vars(modulo).values()):
+            if inspect.ismodule(valor) or inspect.isfunction(valor) or inspect.isclass(valor):
+                dependencia = _modulo_do_projeto(valor)
+                if dependencia is not None:
+                    visitar_modulo(dependencia)
+
+    def visitar_funcao(funcao):
+        chave = f"funcao:{funcao.__qualname__}"
+        if chave in fontes:
+            return
+        fontes[chave] = inspect.getsource(funcao)
+        for nome in funcao.__code__.co_names:
+            if nome not in funcao.__globals__:
+                continue
+            valor = funcao.__globals__[nome]
+            if inspect.isfunction(valor) and valor.__globals__ is funcao.__globals__:
+                visitar_funcao(valor)
+            elif inspect.ismodule(valor) or inspect.isfunction(valor) or inspect.isclass(valor):
+                modulo = _modulo_do_projeto(valor)
+                if modulo is not None:
+                    visitar_modulo(modulo)
+            else:
+                fontes[f"valor:{nome}"] = repr(valor)
+
+    visitar_funcao(definicao['funcao'])
+    for objeto in definicao['codigo']:
+        modulo = _modulo_do_projeto(objeto)
+        if modulo is not None:
+            visitar_modulo(modulo)
+    return fontes
+
+
+def _hash_codigo(definicao):
+    """Hash do código de que a etapa depende (ver `fontes_codigo`)."""
+    sha = hashlib.sha256()
+    for chave, texto in sorted(fontes_codigo(definicao).items()):
+        sha.update(f"{chave}\n{texto}\n".encode('utf-8'))
+    return sha.hexdigest()
+
+
+def chave_etapa(nome, configuracao, hashes_resultados, hashes_arquivos):
+    """
+    Objetivo: Calcular a chave de uma etapa, que muda sempre que algo de que ela depende muda.
+
+    Detalhes:
+    - Combina o hash do código, o conteúdo (SHA-256) dos arquivos de entrada, os valores
+      dos parâmetros e o hash do resultado de cada dependência.
+    - `hashes_resultados` deve ter as dependências já resolvidas; `hashes_arquivos` é um
+      cache {caminho: hash}, para que um arquivo lido por várias etapas seja lido uma vez.
+    """
+    definicao = ETAPAS[nome]
+    entradas = {}
+    for chave in definicao['entradas']:
+        valor = configuracao[chave]
+        if chave.startswith('arquivo_'):
+            if valor not in hashes_arquivos:
+                hashes_arquivos[valor] = hash_arquivo(valor)
+            valor = hashes_arquivos[valor]
+        entradas[chave] = valor
+    conteudo = {
+        'etapa': nome,
+        'codigo': _hash_codigo(definicao),
+        'entradas': entradas,
+        'dependencias': {dependencia: hashes_resultados[dependencia] for dependencia in definicao['dependencias']},
+    }
+    return hashlib.sha256(json.dumps(conteudo, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def hash_resultado(resultado):
+    """
+    Objetivo: Calcular o hash do conteúdo do resultado de uma etapa.
+
+    Detalhes:
+    - DataFrames e Series são resumidos pelos valores (pd.util.hash_pandas_object, com
+      o índice), nomes e tipos das colunas: o pickle de um mesmo DataFrame pode variar
+      entre execuções, e o hash precisa ser estável para que as etapas abaixo de uma
+      etapa que reproduziu o mesmo resultado continuem em cache.
+    - Dicionários, listas e tuplas são percorridos; os demais objetos usam o pickle.
+    """
+    sha = hashlib.sha256()
+    if isinstance(resultado, (pd.DataFrame, pd.Series)):
+        sha.update(repr(resultado.dtypes.to_dict() if isinstance(resultado, pd.DataFrame)
+                        else (resultado.name, resultado.dtype)).encode('utf-8'))
+        sha.update(pd.util.hash_pandas_object(resultado, index=True).to_numpy().tobytes())
+    elif isinstance(resultado, dict):
+        for chave, valor in resultado.items():
+            sha.update(f"{chave!r}:{hash_resultado(valor)}".encode('utf-8'))
+    elif isinstance(resultado, (list, tuple)):
+        for valor in resultado:
+            sha.update(hash_resultado(valor).encode('utf-8'))
+    else:
+        sha.update(pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL))
+    return sha.hexdigest()
+
+
+def _caminhos_etapa(nome, diretorio):
+    base = os.path.join(diretorio or DIRETORIO_PIPELINE, nome)
+    return f"{base}.pkl", f"{base}.json"
+
+
+def _meta_valida(nome, chave, diretorio):
+    """Metadados do resultado em disco da etapa, se ele corresponder à `chave`; senão, None."""
+    caminho_resultado, caminho_meta = _caminhos_etapa(nome, diretorio)
+    meta = ler_metadados(caminho_meta)
+    if meta is None or meta.get('chave') != chave or not os.path.exists(caminho_resultado):
+        return None
+    return meta
+
+
+def _gravar_resultado(nome, chave, conteudo, hash_resultado, diretorio):
+    caminho_resultado, caminho_meta = _caminhos_etapa(nome, diretorio)
+    os.makedirs(os.path.dirname(caminho_resultado), exist_ok=True)
+
+    def escrever(destino):
+        with open(destino, 'wb') as arquivo:
+            arquivo.write(conteudo)
+
+    gravar_atomico(caminho_resultado, escrever)
+    gravar_atomico(caminho_meta, lambda destino: escrever_json(destino, {'chave': chave, 'hash_resultado': hash_resultado}))
+
+
+def _ler_resultado(nome, diretorio):
+    caminho_resultado, _ = _caminhos_etapa(nome, diretorio)
+    with open(caminho_resultado, 'rb') as arquivo:
+        return pickle.load(arquivo)
+
+
+def executar(alvos=None, configuracao=None, forcar=(), diretorio=None, verbose=True):
+    """
+    Objetivo: Produzir os resultados das etapas `alvos`, executando apenas o necessário.
+
+    Detalhes:
+    - `alvos=None` executa todas as etapas; `configuracao` substitui chaves de CONFIGURACAO.
+    - As etapas são visitadas em ordem de dependência: a que tem resultado em disco com a
+      mesma chave é reaproveitada; as demais (e as indicadas em `forcar`) são executadas
+      e o resultado é gravado com a nova chave.
+    - Resultados em cache só são lidos do disco quando alguém precisa deles (um alvo ou
+      uma etapa que vai ser executada).
+    - Retorna (resultados, relatório): {alvo: resultado} e um DataFrame com a situação e
+      o tempo de cada etapa visitada.
+    """
+    alvos = list(alvos or ETAPAS)
+    configuracao = {**CONFIGURACAO, **(configuracao or {})}
+    forcar = set(forcar)
+    hashes_resultados, hashes_arquivos, em_memoria, linhas = {}, {}, {}, []
+
+    def obter(nome):
+        if nome not in em_memoria:
+            em_memoria[nome] = _ler_resultado(nome, diretorio)
+        return em_memoria[nome]
+
+    for nome in ordem_execucao(alvos):
+        definicao = ETAPAS[nome]
+        inicio = time.perf_counter()
+        chave = chave_etapa(nome, configuracao, hashes_resultados, hashes_arquivos)
+        meta = None if nome in forcar else _meta_valida(nome, chave, diretorio)
+
+        if meta is not None:
+            hashes_resultados[nome] = meta['hash_resultado']
+            estado = 'em cache'
+        else:
+            argumentos = {dependencia: obter(dependencia) for dependencia in definicao['dependencias']}
+            argumentos.update({entrada: configuracao[entrada] for entrada in definicao['entradas']})
+            resultado = definicao['funcao'](**argumentos)
+            conteudo = pickle.dumps(resultado, protocol=pickle.HIGHEST_PROTOCOL)
+            hashes_resultados[nome] = hash_resultado(resultado)
+            _gravar_resultado(nome, chave, conteudo, hashes_resultados[nome], diretorio)
+            em_memoria[nome] = resultado
+            estado = 'executada'
+
+        linhas.append({'etapa': nome, 'situacao': estado, 'tempo_s': time.perf_counter() - inicio})
+        if verbose:
+            print(f"[pipeline] {nome}: {estado} ({linhas[-1]['tempo_s']:.2f}s)")
+
+    relatorio = pd.DataFrame(linhas, columns=['etapa', 'situacao', 'tempo_s'])
+    return {alvo: obter(alvo) for alvo in alvos}, relatorio
+
+
+def situacao(alvos=None, configuracao=None, diretorio=None):
+    """
+    Objetivo: Informar, sem executar nada, quais etapas rodariam numa nova execução.
+
+    Detalhes:
+    - 'em cache': o resultado em disco corresponde ao estado atual das entradas.
+    - 'desatualizada': a etapa roda de novo (código, arquivos ou parâmetros mudaram, ou
+      não há resultado em disco).
+    - 'depende de etapa desatualizada': a etapa só roda se a dependência produzir um
+      resultado diferente do anterior (ou, sem ela, não pode rodar).
+    - 'arquivo ausente': um dos arquivos de origem da etapa não foi encontrado.
+    """
+    configuracao = {**CONFIGURACAO, **(configuracao or {})}
+    hashes_resultados, hashes_arquivos, linhas = {}, {}, []
+    for nome in ordem_execucao(list(alvos or ETAPAS)):
+        dependencias = ETAPAS[nome]['dependencias']
+        if any(dependencia not in hashes_resultados for dependencia in dependencias):
+            estado = 'depende de etapa desatualizada'
+        else:
+            try:
+                chave = chave_etapa(nome, configuracao, hashes_resultados, hashes_arquivos)
+            except FileNotFoundError:
+                linhas.append({'etapa': nome, 'dependencias': ', '.join(dependencias), 'situacao': 'arquivo ausente'})
+                continue
+            meta = _meta_valida(nome, chave, diretorio)
+            estado = 'em cache' if meta is not None else 'desatualizada'
+            if meta is not None:
+                hashes_resultados[nome] = meta['hash_resultado']
+        linhas.append({'etapa': nome, 'dependencias': ', '.join(dependencias), 'situacao': estado})
+    return pd.DataFrame(linhas, columns=['etapa', 'dependencias', 'situacao'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Executa as etapas do pipeline de análises, reaproveitando as que não mudaram.")
+    parser.add_argument('etapas', nargs='*', help=f"Etapas a produzir (padrão: todas). Etapas: {', '.join(ETAPAS)}.")
+    parser.add_argument('--forcar', nargs='+', default=[], help="Executa as etapas indicadas mesmo com resultado em cache.")
+    parser.add_argument('--situacao', action='store_true', help="Apenas mostra quais etapas estão em cache.")
+    parser.add_argument('--arquivo', nargs='+', default=[], metavar='NOME=CAMINHO',
+                        help="Substitui arquivos de origem (ex.: arquivo_rais=outra/tabela.xlsx).")
+    parser.add_argument('--diretorio', default=DIRETORIO_PIPELINE, help="Pasta dos resultados das etapas.")
+    args = parser.parse_args()
+
+    arquivos = dict(item.split('=', 1) for item in args.arquivo)
+    desconhecidos = [nome for nome in arquivos if not nome.startswith('arquivo_') or nome not in CONFIGURACAO]
+    if desconhecidos:
+        parser.error(f"arquivos desconhecidos: {desconhecidos}")
+
+    if args.situacao:
+        print(situacao(args.etapas, arquivos, args.diretorio).to_string(index=False))
+    else:
+        _, relatorio = executar(args.etapas, arquivos, args.forcar, args.diretorio)
+        executadas = relatorio['situacao'].eq('executada').sum()
+        print(f"\n{executadas} de {len(relatorio)} etapas executadas em {relatorio['tempo_s'].sum():.2f}s.")
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+import re
+
+import pandas as pd
+
+from snapshot_cache import carregar_snapshot
+
+# --- Visão Geral do Módulo ---
+# Leitura única da planilha "Projetos_de_Atuação - IA - 2020 a 2025", compartilhada pelos
+# scripts ideb_f.py, RAIS.py e caged_f. Antes, cada script abria o mesmo arquivo várias
+# vezes (uma por aba); aqui o arquivo é aberto uma única vez, todas as abas necessárias
+# são lidas na mesma passada e o resultado em formato "long" fica guardado em um
+# snapshot em disco (ver snapshot_cache.py).
+
+# Abas anuais de projetos ("2020", ..., "2025") e de educação profissionalizante
+# ("2022-Ed.Profissionalizante", ..., incluindo a grafia com espaço no final).
+PADRAO_ABA_PROJETOS = re.compile(r'^\s*(\d{4})\s*$')
+PADRAO_ABA_PROFISSIONALIZANTE = re.compile(r'^\s*(\d{4})-Ed\.Profissionalizante\s*$', re.IGNORECASE)
+
+# Posição (índice) das colunas nas abas de educação profissionalizante, que muda entre
+# os anos. Anos mais novos sem layout próprio usam o layout do ano mais recente.
+POSICOES_PROFISSIONALIZANTE = {
+    2022: {'cidade': 0, 'indices': [3, 4, 5], 'nomes': ['cursos', 'turmas', 'beneficiados']},
+    2023: {'cidade': 0, 'indices': [3, 4, 5, 15], 'nomes': ['cursos', 'turmas', 'beneficiados', 'desistentes']},
+    2024: {'cidade': 1, 'indices': [4, 5, 6, 14], 'nomes': ['cursos', 'turmas', 'beneficiados', 'desistentes']},
+    2025: {'cidade': 1, 'indices': [4, 5, 6, 14], 'nomes': ['cursos', 'turmas', 'beneficiados', 'desistentes']},
+}
+
+COLUNAS_PROJETOS = ['nprojetos', 'ninstituicoes', 'nbeneficiados']
+COLUNAS_PROFISSIONALIZANTE = ['cursos', 'turmas', 'beneficiados', 'desistentes']
+
+
+def _renomear_uf(df):
+    """Padroniza a coluna de estado, que aparece como 'UF' ou 'ESTADO' dependendo do ano."""
+    for coluna in ['UF', 'ESTADO']:
+        if coluna in df.columns:
+            return df.rename(columns={coluna: 'sg_uf'})
+    return df
+
+
+def _preparar_aba_projetos(df, ano):
+    """
+    Objetivo: Padronizar uma aba anual de projetos.
+
+    Detalhes:
+    - Trata a inconsistência nos nomes das colunas de estado ('UF' ou 'ESTADO').
+    - Remove as linhas de observação e usa as 3 últimas colunas como métricas
+      (projetos, instituições e beneficiados), agrupando por cidade e estado.
+    """
+    ultimas_3 = list(df.columns[-3:])
+    df = _renomear_uf(df).rename(columns={'CIDADES': 'ds_mun'})
+    if 'ds_mun' not in df.columns or 'sg_uf' not in df.columns:
+        raise ValueError(f"Colunas 'CIDADES' e 'UF' ou 'ESTADO' não encontradas na aba {ano}.")
+
+    df = df[~df['ds_mun'].astype(str).str.contains('Obs.:', na=False, regex=False)]
+    df = df[['ds_mun', 'sg_uf'] + ultimas_3].dropna(subset=['ds_mun']).copy()
+    df.columns = ['ds_mun', 'sg_uf'] + COLUNAS_PROJETOS
+    for col in COLUNAS_PROJETOS:
+        df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    df = df.groupby(['ds_mun', 'sg_uf'], as_index=False).sum(numeric_only=True)
+    df['ano'] = ano
+    return df
+
+
+def _preparar_aba_profissionalizante(df, ano):
+    """
+    Objetivo: Padronizar uma aba de educação profissionalizante.
+
+    Detalhes:
+    - A coluna de cidades e as métricas são localizadas pela posição, que varia entre
+      os anos (ver POSICOES_PROFISSIONALIZANTE).
+    - Métricas ausentes em um ano (ex.: desistentes em 2022) ficam como NaN.
+    """
+    ano_layout = ano if ano in POSICOES_PROFISSIONALIZANTE else max(POSICOES_PROFISSIONALIZANTE)
+    layout = POSICOES_PROFISSIONALIZANTE[ano_layout]
+
+    resultado = pd.DataFrame({'ds_mun': df.iloc[:, layout['cidade']]})
+    df_uf = _renomear_uf(df)
+    resultado['sg_uf'] = df_uf['sg_uf'] if 'sg_uf' in df_uf.columns else None
+    for indice, nome in zip(layout['indices'], layout['nomes']):
+        resultado[nome] = pd.to_numeric(df.iloc[:, indice], errors='coerce')
+
+    resultado = resultado.dropna(subset=['ds_mun'])
+    resultado = resultado[~resultado['ds_mun'].astype(str).str.contains('Obs.:', regex=False)]
+    resultado['ano'] = ano
+    return resultado.reindex(columns=['ds_mun', 'sg_uf'] + COLUNAS_PROFISSIONALIZANTE + ['ano'])
+
+
+def _ler_planilha_ia(file_path):
+    """
+    Objetivo: Abrir a planilha do IA uma única vez e ler todas as abas de interesse.
+
+    Detalhes:
+    - O leitor openpyxl do pandas abre o arquivo em modo somente leitura; com um único
+      pd.ExcelFile o arquivo XLSX é descompactado uma só vez para todas as abas.
+    - Retorna um único DataFrame "long", com a coluna 'tipo' indicando a origem:
+      'projetos' (abas anuais) ou 'profissionalizante' (abas "-Ed.Profissionalizante").
+    """
+    partes = []
+    with pd.ExcelFile(file_path, engine='openpyxl') as planilha:
+        for aba in planilha.sheet_names:
+            if match := PADRAO_ABA_PROJETOS.match(aba):
+                try:
+                    df = _preparar_aba_projetos(planilha.parse(aba, skiprows=5), int(match.group(1)))
+                except ValueError as e:
+                    print(f"Aba '{aba}' ignorada: {e}")
+                    continue
+                partes.append(df.assign(tipo='projetos'))
+            elif match := PADRAO_ABA_PROFISSIONALIZANTE.match(aba):
+                df = _preparar_aba_profissionalizante(planilha.parse(aba, header=5), int(match.group(1)))
+                partes.append(df.assign(tipo='profissionalizante'))
+
+    df_ia = pd.concat(partes, ignore_index=True)
+    df_ia['ds_mun'] = df_ia['ds_mun'].astype(str).str.strip()
+    df_ia['sg_uf'] = df_ia['sg_uf'].astype('string').str.strip().str.upper()
+    return df_ia
+
+
+def carregar_planilha_ia(file_path):
+    """
+    Objetivo: Carregar todas as abas da planilha do IA em formato "long".
+
+    Detalhes:
+    - Usa o snapshot em disco quando a planilha não mudou; caso contrário, relê o
+      Excel (abrindo-o uma única vez) e atualiza o snapshot.
+    """
+    return carregar_snapshot(file_path, 'projetos_ia', _ler_planilha_ia)
+
+
+def carregar_projetos_ia(file_path, anos=None):
+    """
+    Objetivo: Retornar os projetos do IA por cidade, estado e ano.
+
+    Detalhes:
+    - Colunas: 'ds_mun', 'sg_uf', 'nprojetos', 'ninstituicoes', 'nbeneficiados' e 'ano'.
+    - `anos` permite restringir o resultado a um ou mais anos (ex.: [2024]).
+    """
+    df = carregar_planilha_ia(file_path)
+    df = df[df['tipo'] == 'projetos']
+    if anos is not None:
+        df = df[df['ano'].isin(anos)]
+    return df[['ds_mun', 'sg_uf'] + COLUNAS_PROJETOS + ['ano']].reset_index(drop=True)
+
+
+def carregar_ed_profissionalizante_ia(file_path, anos=None):
+    """
+    Objetivo: Retornar os programas de educação profissionalizante do IA por cidade e ano.
+
+    Detalhes:
+    - Colunas: 'ds_mun', 'sg_uf' (quando a aba traz o estado), 'cursos', 'turmas',
+      'beneficiados', 'desistentes' e 'ano'.
+    """
+    df = carregar_planilha_ia(file_path)
+    df = df[df['tipo'] == 'profissionalizante']
+    if anos is not None:
+        df = df[df['ano'].isin(anos)]
+    return df[['ds_mun', 'sg_uf'] + COLUNAS_PROFISSIONALIZANTE + ['ano']].reset_index(drop=True)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+from indice_municipal import fatia_municipio
+from ive_nacional import ARQUIVO_ATUACAO_IA
+from malhas_ibge import QUALIDADE_PAIS, caminho_malha, centroides_malha
+from snapshot_cache import carregar_snapshot
+
+# --- Visão Geral do Módulo ---
+# Índice espacial da oferta de cursos técnicos, para responder "quais cursos existem a até
+# X km deste município" sem calcular a distância até cada linha da base. As unidades de
+# ensino são localizadas pelo município (CÓDIGO MUNICÍPIO); por isso os pontos do índice
+# são os municípios com oferta de cursos, guardados em uma BallTree com a métrica de
+# haversine (distância sobre a esfera). Os cursos de cada município encontrado vêm do
+# índice por município da base de cursos (ver indice_municipal.py).
+# As coordenadas de todo o país vêm dos centroides da malha municipal em cache local
+# (gerada de antemão com: python malhas_ibge.py --brasil); nada é baixado aqui.
+
+RAIO_TERRA_KM = 6371.0088
+
+# Malha do país de onde saem os centroides; é um dos arquivos de origem do índice.
+MALHA_CENTROIDES = caminho_malha(None, QUALIDADE_PAIS)
+
+COLUNA_CODIGO = 'CÓDIGO MUNICÍPIO'
+COLUNA_UNIDADE = 'CÓDIGO UNIDADE DE ENSINO'
+COLUNAS_CHAVE = ['MUNICÍPIO_UPPER', 'UF']
+
+
+def _centroides_do_arquivo(caminho):
+    with open(caminho, 'r', encoding='utf-8') as arquivo:
+        return centroides_malha(json.load(arquivo))
+
+
+def carregar_coordenadas_municipios(arquivo_atuacao=ARQUIVO_ATUACAO_IA, malha=MALHA_CENTROIDES):
+    """
+    Objetivo: Reunir as coordenadas (lat, lon) de cada município, indexadas pelo código IBGE.
+
+    Detalhes:
+    - Base: centroides da `malha` municipal do país já em cache local (ver malhas_ibge.py),
+      guardados em snapshot. A malha não é baixada aqui: sem o arquivo (ou com
+      malha=None), seguem apenas as coordenadas cadastradas. Quem guarda o resultado em
+      cache deve incluir o arquivo da malha na chave, para refazê-lo quando ela aparecer.
+    - Uma malha presente mas ilegível gera erro, em vez de um resultado incompleto.
+    - As coordenadas cadastradas em `arquivo_atuacao` (as mesmas do mapa da Fase 1) têm
+      prioridade e cobrem os municípios de atuação do IA mesmo sem a malha.
+    """
+    coordenadas = pd.read_csv(arquivo_atuacao, sep=';', usecols=['codigo_ibge', 'lat', 'lon'])
+    coordenadas = coordenadas.set_index('codigo_ibge')
+    if malha is not None and os.path.exists(malha):
+        centroides = carregar_snapshot(malha, 'centroides_municipios', _centroides_do_arquivo)
+        coordenadas = coordenadas.combine_first(centroides.set_index('codigo_ibge'))
+    return coordenadas[['lat', 'lon']]
+
+
+def construir_indice_espacial(df_cursos, coordenadas):
+    """
+    Objetivo: Montar o índice espacial dos municípios com oferta de cursos.
+
+    Detalhes:
+    - Retorna (pontos, arvore): `pontos` tem uma linha por município com cursos
+      ('MUNICÍPIO_UPPER', 'UF', 'codigo_ibge', 'unidades', 'cursos', 'lat', 'lon'), na
+      ordem dos pontos da `arvore` (BallTree em radianos, métrica de haversine).
+    - Municípios sem coordenadas conhecidas ficam de fora do índice.
+    """
+    pontos = (df_cursos.groupby(COLUNAS_CHAVE + [COLUNA_CODIGO], observed=True)
+              .agg(unidades=(COLUNA_UNIDADE, 'nunique'), cursos=(COLUNA_UNIDADE, 'size'))
+              .reset_index()
+              .rename(columns={COLUNA_CODIGO: 'codigo_ibge'}))
+    pontos = pontos.join(coordenadas, on='codigo_ibge', how='inner').reset_index(drop=True)
+    arvore = BallTree(np.radians(pontos[['lat', 'lon']].to_numpy(dtype=float)), metric='haversine')
+    return pontos, arvore
+
+
+def municipios_no_raio(pontos, arvore, lat, lon, raio_km):
+    """Municípios do índice a até `raio_km` de (lat, lon), do mais próximo ao mais distante, com 'distancia_km'."""
+    posicoes, distancias = arvore.query_radius(np.radians([[lat, lon]]), r=raio_km / RAIO_TERRA_KM,
+                                               return_distance=True, sort_results=True)
+    return pontos.iloc[posicoes[0]].assign(distancia_km=distancias[0] * RAIO_TERRA_KM)
+
+
+def cursos_no_raio(df_cursos, indice_cursos, pontos, arvore, lat, lon, raio_km):
+    """
+    Objetivo: Listar os cursos ofertados a até `raio_km` de (lat, lon).
+
+    Detalhes:
+    - `df_cursos` e `indice_cursos` são o par (base, índice) por (MUNICÍPIO_UPPER, UF)
+      do dashboard; os cursos de cada município encontrado são fatias desse índice.
+    - Acrescenta a coluna 'distancia_km' (distância entre os municípios) e ordena do
+      mais próximo ao mais distante.
+    """
+    proximos = municipios_no_raio(pontos, arvore, lat, lon, raio_km)
+    fatias = [fatia_municipio(df_cursos, indice_cursos, chave)
+              for chave in zip(*(proximos[coluna].tolist() for coluna in COLUNAS_CHAVE))]
+    if not fatias:
+        return df_cursos.iloc[:0].assign(distancia_km=pd.Series(dtype=float))
+    distancias = np.repeat(proximos['distancia_km'].to_numpy(), [len(fatia) for fatia in fatias])
+    return pd.concat(fatias).assign(distancia_km=distancias.round(1))
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+import pandas as pd
+
+from memoria import compactar_tipos, mapear_categorias
+from snapshot_cache import carregar_snapshot
+
+# --- Visão Geral do Módulo ---
+# Leitura única da planilha 'TABELA 4' da RAIS (empregos por setor e município),
+# compartilhada pelo dashboard e pelo script RAIS.py. O resultado limpo é guardado
+# em um snapshot colunar, de modo que o arquivo XLSX só é processado quando muda.
+
+COLUNAS_SETORES = ['Agropecuaria', 'Industria', 'Construcao', 'Comercio', 'Servicos']
+
+
+def _ler_tabela4_excel(file_path):
+    """
+    Objetivo: Ler a 'TABELA 4' diretamente do Excel e devolver o formato "wide" limpo.
+
+    Detalhes:
+    - Pula as linhas de cabeçalho irrelevantes e descarta rodapés e linhas sem código.
+    - Renomeia as colunas de 2024 de cada setor (as colunas 'Unnamed' logo após o
+      título do setor) para nomes significativos e converte tudo para inteiro.
+    """
+    df = pd.read_excel(file_path, sheet_name='TABELA 4', skiprows=12)
+    df = df.dropna(subset=['UF', 'Código', 'Município'])
+    df = df.rename(columns={
+        'Município': 'ds_mun',
+        'UF': 'sg_uf',
+        'Código': 'id_mundv',
+        'Unnamed: 5': 'Agropecuaria_2024',
+        'Unnamed: 9': 'Industria_2024',
+        'Unnamed: 13': 'Construcao_2024',
+        'Unnamed: 17': 'Comercio_2024',
+        'Unnamed: 21': 'Servicos_2024',
+        'Unnamed: 25': 'Total_2024'
+    })
+
+    cols_to_convert = [f"{setor}_2024" for setor in COLUNAS_SETORES] + ['Total_2024']
+    df_rais = df[['sg_uf', 'id_mundv', 'ds_mun'] + cols_to_convert].copy()
+    df_rais['sg_uf'] = df_rais['sg_uf'].astype(str).str.strip()
+    df_rais['ds_mun'] = df_rais['ds_mun'].astype(str).str.strip()
+    df_rais['id_mundv'] = pd.to_numeric(df_rais['id_mundv'], errors='coerce').fillna(0).astype(int)
+    for col in cols_to_convert:
+        df_rais[col] = pd.to_numeric(df_rais[col], errors='coerce').fillna(0).astype(int)
+
+    return df_rais.reset_index(drop=True)
+
+
+def carregar_rais_tabela4(file_path):
+    """
+    Objetivo: Carregar a 'TABELA 4' da RAIS no formato "wide" (uma linha por município).
+
+    Detalhes:
+    - Usa o snapshot em disco quando o arquivo de origem não mudou; caso contrário,
+      relê o Excel e atualiza o snapshot.
+    """
+    return carregar_snapshot(file_path, 'rais_tabela4', _ler_tabela4_excel)
+
+
+def _montar_tabela4_longa(file_path):
+    """
+    Transforma a TABELA 4 "wide" em formato "long" (município × setor).
+
+    Município, UF e setor se repetem a cada setor; por isso são guardados como
+    'category', e as vagas no menor tipo inteiro que as comporta.
+    """
+    df_rais = carregar_rais_tabela4(file_path)
+    df_rais = df_rais.rename(columns={'ds_mun': 'municipio', 'sg_uf': 'uf'})
+    df_rais = df_rais.rename(columns={f"{setor}_2024": setor for setor in COLUNAS_SETORES})
+
+    df_long = df_rais.melt(
+        id_vars=['municipio', 'uf'],
+        value_vars=COLUNAS_SETORES,
+        var_name='setor',
+        value_name='vagas'
+    )
+    df_long = compactar_tipos(df_long, categorias=['municipio', 'uf', 'setor'])
+    df_long['municipio_upper'] = mapear_categorias(df_long['municipio'], lambda s: s.str.upper())
+    return df_long
+
+
+def carregar_rais_tabela4_longa(file_path):
+    """
+    Objetivo: Carregar a 'TABELA 4' da RAIS no formato "long" usado pela Fase 4 do dashboard.
+
+    Detalhes:
+    - Colunas: 'municipio', 'uf', 'setor', 'vagas' e 'municipio_upper'.
+    - Possui seu próprio snapshot, construído a partir do snapshot "wide"; assim o
+      XLSX é lido uma única vez por versão do arquivo, qualquer que seja o consumidor.
+    """
+    return carregar_snapshot(file_path, 'rais_tabela4_longa', _montar_tabela4_longa, versao=2)
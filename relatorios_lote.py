@@ -0,0 +1,281 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+import html
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from alinhamento import calcular_alinhamento, setores_principais
+from buscar_cursos import carregar_cursos_encontrados
+from indice_municipal import construir_indice, fatia_municipio
+from ive_nacional import ARQUIVO_ATUACAO_IA, ARQUIVO_IVE, carregar_ive_nacional
+from nomes_municipios import para_codigo6
+from rais_tabela4 import COLUNAS_SETORES, carregar_rais_tabela4
+
+# --- Visão Geral do Script ---
+# Gera, sem o Streamlit, o relatório de alinhamento de todos os municípios da base do
+# IVE: indicadores das Fases 1 a 3, matriz econômica local, eixos tecnológicos
+# recomendados, cursos alinhados e o alerta de desalinhamento da Fase 4. Os municípios
+# são divididos em lotes processados em paralelo; cada processo carrega as bases uma
+# única vez (dos snapshots em disco) e grava o HTML e os CSVs de cada município, além
+# do resumo consolidado (resumo.csv e index.html).
+#
+#   python relatorios_lote.py --saida relatorios
+#   python relatorios_lote.py --uf PB PE --processos 4
+
+ARQUIVO_RAIS = 'tabelas-rais-2024-parcial.xlsx'
+ARQUIVO_CURSOS = 'cursos_encontrados.csv'
+DIRETORIO_SAIDA = 'relatorios'
+
+# Lotes por processo: lotes menores equilibram melhor a carga entre os processos.
+LOTES_POR_PROCESSO = 4
+
+COLUNAS_CURSOS = ['CURSO', 'EIXO TECNOLÓGICO', 'MODALIDADE', 'UNIDADE DE ENSINO']
+
+ESTILO_HTML = """
+body { font-family: Arial, sans-serif; color: #333333; margin: 2em; }
+h1 { color: #F26522; } h2 { color: #0055A4; }
+table { border-collapse: collapse; margin-bottom: 1em; }
+th, td { border: 1px solid #DDDDDD; padding: 4px 8px; text-align: left; }
+th { background: #F0F2F6; }
+.alerta { color: #B00020; font-weight: bold; } .ok { color: #009E4D; font-weight: bold; }
+"""
+
+# Bases carregadas em cada processo pelo inicializador do pool.
+_DADOS = {}
+
+
+def carregar_dados(arquivo_ive=ARQUIVO_IVE, arquivo_rais=ARQUIVO_RAIS, arquivo_cursos=ARQUIVO_CURSOS,
+                   arquivo_atuacao=ARQUIVO_ATUACAO_IA):
+    """
+    Objetivo: Carregar as bases usadas pelos relatórios, com os mesmos carregadores do dashboard.
+
+    Detalhes:
+    - IVE nacional (Fases 1 a 3), Tabela 4 da RAIS "wide" e cursos encontrados (Fase 4),
+      além do alinhamento setor × eixo calculado para todos os municípios.
+    - Os cursos são indexados pelo código IBGE de 6 dígitos; a RAIS e as matrizes do
+      alinhamento viram arrays NumPy, consultados pela posição do município.
+    """
+    df_ive = carregar_ive_nacional(arquivo_ive, arquivo_atuacao)
+    df_rais = carregar_rais_tabela4(arquivo_rais)
+    df_cursos = carregar_cursos_encontrados(arquivo_cursos)
+    resumo, matrizes = calcular_alinhamento(df_rais, df_cursos)
+
+    df_cursos['codigo6'] = para_codigo6(df_cursos['CÓDIGO MUNICÍPIO']).to_numpy()
+    return {
+        'ive': df_ive,
+        'posicao': {codigo: i for i, codigo in enumerate(resumo.index)},
+        'vagas': df_rais[[f"{setor}_2024" for setor in COLUNAS_SETORES]].to_numpy(dtype=float),
+        'cursos': construir_indice(df_cursos, ['codigo6']),
+        'alinhamento': resumo,
+        'eixos': matrizes['demanda'].columns,
+        'matrizes': {nome: matriz.to_numpy() for nome, matriz in matrizes.items()},
+    }
+
+
+def _inicializar_processo(arquivos):
+    _DADOS.update(carregar_dados(**arquivos))
+
+
+def _tabela_html(df, **opcoes):
+    return df.to_html(index=False, border=0, na_rep='-', **opcoes)
+
+
+def montar_relatorio(linha_ive, dados):
+    """
+    Objetivo: Montar as tabelas do relatório de um município.
+
+    Detalhes:
+    - Retorna um dicionário com a linha do resumo consolidado ('resumo') e as tabelas
+      'setores' (matriz econômica), 'eixos' (demanda, oferta e recomendação por eixo)
+      e 'cursos' (cursos dos eixos recomendados).
+    - Municípios ausentes da RAIS recebem tabelas vazias e nenhum eixo recomendado.
+    """
+    codigo6 = int(linha_ive.codigo_ibge) // 10
+    alinhamento, matrizes = dados['alinhamento'], dados['matrizes']
+    posicao = dados['posicao'].get(codigo6)
+    tem_rais = posicao is not None
+
+    setores = pd.DataFrame(columns=['setor', 'vagas', 'participacao'])
+    eixos = pd.DataFrame(columns=['eixo', 'demanda', 'oferta', 'recomendado', 'cursos'])
+    eixos_recomendados = []
+    if tem_rais:
+        vagas = dados['vagas'][posicao]
+        total = vagas.sum()
+        setores = pd.DataFrame({'setor': COLUNAS_SETORES, 'vagas': vagas.astype(int),
+                                'participacao': vagas / total if total > 0 else np.zeros_like(vagas)})
+        setores = setores.sort_values('vagas', ascending=False, kind='stable')
+
+        eixos = pd.DataFrame({
+            'eixo': dados['eixos'],
+            'demanda': matrizes['demanda'][posicao],
+            'oferta': matrizes['oferta'][posicao],
+            'recomendado': matrizes['recomendado'][posicao],
+        })
+        eixos_recomendados = eixos.loc[eixos['recomendado'], 'eixo'].tolist()
+
+    df_cursos, idx_cursos = dados['cursos']
+    cursos_mun = fatia_municipio(df_cursos, idx_cursos, (codigo6,))
+    if not eixos.empty:
+        eixos['cursos'] = eixos['eixo'].map(cursos_mun['EIXO TECNOLÓGICO'].value_counts()).fillna(0).astype(int)
+    cursos = cursos_mun.loc[cursos_mun['EIXO TECNOLÓGICO'].isin(eixos_recomendados), COLUNAS_CURSOS]
+
+    linha_alinhamento = alinhamento.iloc[posicao] if tem_rais else None
+    resumo = {
+        'codigo_ibge': int(linha_ive.codigo_ibge),
+        'municipio': linha_ive.municipio,
+        'uf': str(linha_ive.uf),
+        'ive': float(linha_ive.ive),
+        'taxa_analfabetismo': float(linha_ive.taxa_analfabetismo),
+        'taxa_cobertura_eja': float(linha_ive.taxa_cobertura_eja),
+        'perfil_cluster': linha_ive.perfil_cluster,
+        'aderente_politica': bool(linha_ive.aderente_politica),
+        'atuacao_ia': bool(linha_ive.atuacao_ia),
+        'total_vagas': int(linha_alinhamento['total_vagas']) if tem_rais else 0,
+        'setores_principais': ', '.join(setores_principais(linha_alinhamento)) if tem_rais else '',
+        'eixos_recomendados': '; '.join(eixos_recomendados),
+        'cursos_total': len(cursos_mun),
+        'cursos_alinhados': len(cursos),
+        'descompasso': float(linha_alinhamento['descompasso']) if tem_rais else np.nan,
+        'desalinhado': bool(linha_alinhamento['desalinhado']) if tem_rais else False,
+    }
+    return {'resumo': resumo, 'setores': setores, 'eixos': eixos, 'cursos': cursos}
+
+
+def renderizar_html(relatorio):
+    """Gera o HTML autocontido do relatório de um município."""
+    resumo = relatorio['resumo']
+    titulo = html.escape(f"{resumo['municipio']} ({resumo['uf']})")
+
+    indicadores = pd.DataFrame({
+        'Indicador': ['Código IBGE', 'IVE', 'Taxa de analfabetismo', 'Cobertura da EJA',
+                      'Perfil de analfabetismo', 'Aderente à política', 'Atuação do IA'],
+        'Valor': [resumo['codigo_ibge'], f"{resumo['ive']:.4f}", f"{resumo['taxa_analfabetismo']:.2%}",
+                  f"{resumo['taxa_cobertura_eja']:.2%}", resumo['perfil_cluster'],
+                  'Sim' if resumo['aderente_politica'] else 'Não', 'Sim' if resumo['atuacao_ia'] else 'Não'],
+    })
+
+    if not resumo['eixos_recomendados']:
+        situacao = '<p>Não foi possível gerar recomendações automáticas de eixos tecnológicos para este município.</p>'
+    elif resumo['desalinhado']:
+        situacao = ('<p class="alerta">⚠️ Alerta de Desalinhamento: nenhum curso técnico ofertado corresponde '
+                    'aos eixos tecnológicos demandados pela economia local.</p>')
+    else:
+        situacao = f'<p class="ok">✅ {resumo["cursos_alinhados"]} cursos com alto alinhamento estratégico.</p>'
+
+    formatos = {'participacao': '{:.1%}'.format, 'demanda': '{:.1%}'.format, 'oferta': '{:.1%}'.format}
+    partes = [
+        f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>{titulo}</title>'
+        f'<style>{ESTILO_HTML}</style></head><body>',
+        f'<h1>Relatório de Alinhamento Estratégico: {titulo}</h1>',
+        '<h2>Indicadores (Fases 1 a 3)</h2>', _tabela_html(indicadores),
+        '<h2>Matriz Econômica Local</h2>', _tabela_html(relatorio['setores'], formatters=formatos),
+        '<h2>Eixos Tecnológicos</h2>',
+        f'<p>Setores principais: <b>{html.escape(resumo["setores_principais"] or "-")}</b>. '
+        f'Descompasso entre demanda e oferta: <b>{resumo["descompasso"]:.2f}</b>.</p>',
+        _tabela_html(relatorio['eixos'], formatters=formatos),
+        '<h2>Cursos Alinhados</h2>', situacao,
+    ]
+    if not relatorio['cursos'].empty:
+        partes.append(_tabela_html(relatorio['cursos']))
+    partes.append('</body></html>')
+    return '\n'.join(partes)
+
+
+def _caminho_relativo(resumo):
+    return os.path.join(resumo['uf'], str(resumo['codigo_ibge']))
+
+
+def _gerar_lote(codigos, diretorio_saida, formatos):
+    """Gera os relatórios de um lote de municípios e devolve as linhas do resumo consolidado."""
+    df_ive = _DADOS['ive']
+    linhas = []
+    for linha_ive in df_ive[df_ive['codigo_ibge'].isin(codigos)].itertuples(index=False):
+        relatorio = montar_relatorio(linha_ive, _DADOS)
+        resumo = relatorio['resumo']
+        base = os.path.join(diretorio_saida, _caminho_relativo(resumo))
+        os.makedirs(os.path.dirname(base), exist_ok=True)
+
+        if 'html' in formatos:
+            with open(base + '.html', 'w', encoding='utf-8') as arquivo:
+                arquivo.write(renderizar_html(relatorio))
+        if 'csv' in formatos:
+            # Um CSV por tabela do relatório: eixos, setores e cursos alinhados.
+            for tabela in ['eixos', 'setores', 'cursos']:
+                relatorio[tabela].to_csv(f"{base}_{tabela}.csv", sep=';', index=False)
+        linhas.append(dict(resumo, relatorio=_caminho_relativo(resumo)))
+    return linhas
+
+
+def _html_indice(df_resumo):
+    linhas = df_resumo.assign(municipio=[
+        f'<a href="{html.escape(caminho)}.html">{html.escape(nome)}</a>'
+        for caminho, nome in zip(df_resumo['relatorio'], df_resumo['municipio'])])
+    colunas = ['municipio', 'uf', 'ive', 'setores_principais', 'cursos_total', 'cursos_alinhados',
+               'descompasso', 'desalinhado']
+    return (f'<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8"><title>Relatórios de Alinhamento</title>'
+            f'<style>{ESTILO_HTML}</style></head><body><h1>Relatórios de Alinhamento Estratégico</h1>'
+            f'<p>{len(df_resumo)} municípios, {int(df_resumo["desalinhado"].sum())} com alerta de desalinhamento.</p>'
+            f'{_tabela_html(linhas[colunas], escape=False, float_format="{:.3f}".format)}</body></html>')
+
+
+def gerar_relatorios(diretorio_saida=DIRETORIO_SAIDA, ufs=None, apenas_atuacao_ia=False,
+                     processos=None, formatos=('html', 'csv'), arquivos=None):
+    """
+    Objetivo: Gerar os relatórios de todos os municípios selecionados, em paralelo.
+
+    Detalhes:
+    - As bases são carregadas primeiro no processo principal, o que também cria ou
+      atualiza os snapshots em disco; os processos do pool só leem os snapshots.
+    - Os municípios são divididos em lotes (LOTES_POR_PROCESSO por processo), e cada
+      processo grava os arquivos dos seus lotes.
+    - Grava o resumo consolidado em 'resumo.csv' e 'index.html' e o devolve como DataFrame,
+      ordenado do maior para o menor descompasso.
+    """
+    arquivos = arquivos or {}
+    processos = processos or os.cpu_count() or 1
+    df_ive = carregar_dados(**arquivos)['ive']
+    if ufs:
+        df_ive = df_ive[df_ive['uf'].isin(ufs)]
+    if apenas_atuacao_ia:
+        df_ive = df_ive[df_ive['atuacao_ia']]
+
+    os.makedirs(diretorio_saida, exist_ok=True)
+    lotes = [lote for lote in np.array_split(df_ive['codigo_ibge'].to_numpy(), processos * LOTES_POR_PROCESSO)
+             if len(lote)]
+    with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo,
+                             initargs=(arquivos,)) as executor:
+        resultados = executor.map(_gerar_lote, lotes, [diretorio_saida] * len(lotes), [formatos] * len(lotes))
+        linhas = [linha for lote in resultados for linha in lote]
+
+    df_resumo = pd.DataFrame(linhas)
+    if not df_resumo.empty:
+        df_resumo = df_resumo.sort_values(['descompasso', 'ive'], ascending=False, kind='stable')
+        df_resumo.to_csv(os.path.join(diretorio_saida, 'resumo.csv'), sep=';', index=False)
+        with open(os.path.join(diretorio_saida, 'index.html'), 'w', encoding='utf-8') as arquivo:
+            arquivo.write(_html_indice(df_resumo))
+    return df_resumo
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Gera os relatórios de alinhamento de todos os municípios.")
+    parser.add_argument('--saida', default=DIRETORIO_SAIDA, help="Pasta dos relatórios (padrão: relatorios).")
+    parser.add_argument('--uf', nargs='+', default=None, help="Gera apenas os municípios das UFs indicadas.")
+    parser.add_argument('--apenas-atuacao-ia', action='store_true', help="Gera apenas os municípios de atuação do IA.")
+    parser.add_argument('--processos', type=int, default=None, help="Número de processos (padrão: número de CPUs).")
+    parser.add_argument('--formatos', nargs='+', choices=['html', 'csv'], default=['html', 'csv'])
+    parser.add_argument('--ive', default=ARQUIVO_IVE)
+    parser.add_argument('--rais', default=ARQUIVO_RAIS)
+    parser.add_argument('--cursos', default=ARQUIVO_CURSOS)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    resumo = gerar_relatorios(args.saida, [uf.upper() for uf in args.uf] if args.uf else None,
+                              args.apenas_atuacao_ia, args.processos, tuple(args.formatos),
+                              {'arquivo_ive': args.ive, 'arquivo_rais': args.rais, 'arquivo_cursos': args.cursos})
+    print(f"✅ {len(resumo)} relatórios gerados em '{args.saida}' em {time.perf_counter() - inicio:.1f}s "
+          f"({int(resumo['desalinhado'].sum()) if not resumo.empty else 0} com alerta de desalinhamento).")
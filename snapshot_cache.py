@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+# --- Visão Geral do Módulo ---
+# Camada de snapshots colunares (Parquet) em disco para as bases que hoje são lidas
+# de planilhas Excel. A leitura via openpyxl é a etapa mais lenta da inicialização
+# do dashboard e dos scripts; com o snapshot, a planilha só é processada novamente
+# quando o arquivo de origem muda.
+
+DIRETORIO_SNAPSHOTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'snapshots')
+
+
+def hash_arquivo(file_path, tamanho_bloco=1 << 20):
+    """
+    Objetivo: Calcular o hash SHA-256 do conteúdo de um arquivo.
+
+    Detalhes:
+    - Lê o arquivo em blocos para não carregar planilhas grandes inteiras na memória.
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def fingerprint_arquivo(file_path, calcular_hash=True):
+    """
+    Objetivo: Gerar a "impressão digital" de um arquivo de origem.
+
+    Detalhes:
+    - Combina data de modificação (mtime) e tamanho, que são baratos de obter, com o
+      hash do conteúdo, que só é calculado quando `calcular_hash` é verdadeiro.
+    - Lança FileNotFoundError se o arquivo não existir, como o pd.read_excel faria.
+    """
+    info = os.stat(file_path)
+    fingerprint = {'mtime_ns': info.st_mtime_ns, 'tamanho': info.st_size}
+    if calcular_hash:
+        fingerprint['sha256'] = hash_arquivo(file_path)
+    return fingerprint
+
+
+def _caminhos_snapshot(file_path, nome, diretorio):
+    """Arquivos do snapshot; o caminho de origem entra no nome para que fontes diferentes não colidam."""
+    diretorio = diretorio or DIRETORIO_SNAPSHOTS
+    origem = hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:10]
+    base = os.path.join(diretorio, f"{nome}-{origem}")
+    return f"{base}.parquet", f"{base}.json"
+
+
+def ler_metadados(caminho_meta):
+    """Lê um arquivo JSON de metadados; devolve None se ele não existir ou estiver corrompido."""
+    try:
+        with open(caminho_meta, 'r', encoding='utf-8') as arquivo:
+            return json.load(arquivo)
+    except (OSError, ValueError):
+        return None
+
+
+def gravar_atomico(caminho, escrever):
+    """
+    Objetivo: Gravar um arquivo de forma atômica.
+
+    Detalhes:
+    - `escrever(temporario)` grava o conteúdo em um arquivo temporário ao lado do
+      destino, que depois o substitui de uma só vez (os.replace); quem lê o destino
+      nunca vê um arquivo pela metade.
+    - Se a escrita falhar, o temporário é removido e o destino fica como estava.
+    """
+    temporario = f"{caminho}.{os.getpid()}.tmp"
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def escrever_json(destino, conteudo):
+    """Grava `conteudo` em JSON legível (UTF-8, indentado); combine com `gravar_atomico`."""
+    with open(destino, 'w', encoding='utf-8') as arquivo:
+        json.dump(conteudo, arquivo, ensure_ascii=False, indent=2)
+
+
+def snapshot_valido(file_path, nome, versao=1, diretorio=None):
+    """
+    Objetivo: Verificar se existe um snapshot válido de `nome` para o arquivo de origem.
+
+    Detalhes:
+    - Se mtime e tamanho coincidem com os metadados, o snapshot é aceito sem reler o arquivo.
+    - Se mudaram, o hash do conteúdo decide: um arquivo apenas "tocado" (copiado, baixado
+      de novo) continua válido e os metadados são atualizados com o novo mtime.
+    """
+    caminho_parquet, caminho_meta = _caminhos_snapshot(file_path, nome, diretorio)
+    meta = ler_metadados(caminho_meta)
+    if meta is None or meta.get('versao') != versao or not os.path.exists(caminho_parquet):
+        return False
+
+    atual = fingerprint_arquivo(file_path, calcular_hash=False)
+    if atual['mtime_ns'] == meta.get('mtime_ns') and atual['tamanho'] == meta.get('tamanho'):
+        return True
+
+    if atual['tamanho'] != meta.get('tamanho') or hash_arquivo(file_path) != meta.get('sha256'):
+        return False
+
+    meta.update(atual)
+    try:
+        gravar_atomico(caminho_meta, lambda destino: escrever_json(destino, meta))
+    except OSError:
+        pass
+    return True
+
+
+def carregar_snapshot(file_path, nome, construtor, versao=1, diretorio=None):
+    """
+    Objetivo: Devolver o DataFrame derivado de `file_path`, lendo o snapshot Parquet
+    quando ele é válido e reconstruindo-o apenas quando o arquivo de origem muda.
+
+    Detalhes:
+    - `construtor(file_path)` é a função que faz a leitura "cara" (ex.: pd.read_excel)
+      e a limpeza; só é chamada quando não há snapshot válido.
+    - `nome` identifica o snapshot; bases diferentes derivadas do mesmo arquivo usam
+      nomes diferentes. `versao` deve ser incrementada quando a lógica do construtor
+      muda, para invalidar snapshots antigos.
+    - Se o snapshot não puder ser gravado (ex.: sem pyarrow ou sem permissão de
+      escrita), o DataFrame construído é devolvido normalmente, apenas sem cache.
+    - Sem `diretorio`, usa DIRETORIO_SNAPSHOTS, lido a cada chamada (os benchmarks o
+      apontam para uma pasta temporária).
+    """
+    caminho_parquet, caminho_meta = _caminhos_snapshot(file_path, nome, diretorio)
+
+    if snapshot_valido(file_path, nome, versao=versao, diretorio=diretorio):
+        try:
+            return pd.read_parquet(caminho_parquet)
+        except (ImportError, OSError, ValueError):
+            pass
+
+    # O fingerprint é tirado antes da leitura: se o arquivo mudar durante a
+    # construção, o próximo acesso detecta a diferença e reconstrói.
+    fingerprint = fingerprint_arquivo(file_path)
+    df = construtor(file_path)
+
+    try:
+        os.makedirs(os.path.dirname(caminho_parquet), exist_ok=True)
+        gravar_atomico(caminho_parquet, lambda destino: df.to_parquet(destino, index=False))
+        meta = dict(fingerprint, origem=os.path.abspath(file_path), versao=versao)
+        gravar_atomico(caminho_meta, lambda destino: escrever_json(destino, meta))
+    except (ImportError, OSError, TypeError, ValueError):
+        pass
+
+    return df